@@ -0,0 +1,72 @@
+"""
+Compares the VLM response parsing path against the per-pattern regex loop and the standard library JSON decoder
+it replaced, and checks both state extractors agree.
+
+Usage (from src/):
+    python -m benchmarks.nlp_parsing --number 20000
+
+Each case is timed with timeit (best of --repeat runs) and reported in microseconds per call.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import re
+import timeit
+
+from inference.ollama_inference import nlp_response_mappings, nlp_response_matcher, parse_json_response
+from utilities.nlp import decode_json
+
+TEXTS = [
+    "The game is currently in the main menu",
+    "Selecting opponent in squad battles",
+    "Half-time menu",
+    "The match in progress",
+    "Full-time menu",
+    "Nothing recognisable in this response at all, so every pattern is tried",
+]
+
+BODY = '{"match-status": "IN-MATCH", "score": "ABC:0 - XYZ:0", "in-match-status": "LIVE-MATCH", "ball-active": "YES", "minimap": "YES"}'
+RESPONSE = f"```json\n{BODY}\n```"
+
+def per_pattern_search(text: str) -> str:
+    """The extraction loop the compiled matcher replaced."""
+    for pattern, state in nlp_response_mappings.items():
+        if re.search(pattern, text, re.IGNORECASE):
+            return state
+    return "UNKNOWN"
+
+def time_per_call(function, number: int, repeat: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per case, the best is reported")
+    args = parser.parse_args()
+
+    disagreements = [text for text in TEXTS if nlp_response_matcher.match(text) != per_pattern_search(text)]
+    print(f"State extraction agrees on {len(TEXTS) - len(disagreements)}/{len(TEXTS)} texts")
+    for text in disagreements:
+        print(f"  differs: {text!r}")
+
+    def extract_all(extract):
+        return lambda: [extract(text) for text in TEXTS]
+
+    logger = logging.getLogger("benchmark")
+    logger.disabled = True
+    loop = asyncio.new_event_loop()
+    fast_decoder = "orjson" if decode_json is not json.loads else "json.loads (orjson is not installed)"
+    cases = [
+        ("state extraction, per-pattern re.search", extract_all(per_pattern_search), len(TEXTS)),
+        ("state extraction, compiled StateMatcher", extract_all(nlp_response_matcher.match), len(TEXTS)),
+        ("JSON decode, json.loads", lambda: json.loads(BODY), 1),
+        (f"JSON decode, {fast_decoder}", lambda: decode_json(BODY), 1),
+        ("parse_json_response", lambda: loop.run_until_complete(parse_json_response(logger, RESPONSE)), 1),
+    ]
+    for name, function, calls in cases:
+        print(f"{name:45s} {time_per_call(function, args.number, args.repeat) / calls:8.2f} us/call")
+    loop.close()
+
+if __name__ == "__main__":
+    main()
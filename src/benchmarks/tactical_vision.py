@@ -0,0 +1,75 @@
+"""
+Compares TacticalVisionNet inference latency on the CPU: the plain eager model against TacticalVisionRuntime
+configurations (channels_last, shared backbone, dynamic INT8 quantization, TorchScript).
+
+Usage (from src/):
+    python -m benchmarks.tactical_vision --batch-size 1 --iterations 50
+
+Weights are random, so only latency is measured. Latency includes preprocessing from uint8 crops.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from inference.tactical_vision_net import TacticalVisionNet
+from inference.tactical_vision_runtime import TacticalVisionRuntime
+
+def eager_predict(model, main_crops, minimap_crops):
+    """The unoptimized path: float conversion and normalization per call, autograd enabled, contiguous NCHW."""
+    def to_input(crops):
+        tensor = torch.from_numpy(crops).permute(0, 3, 1, 2).float() / 255
+        mean = torch.tensor([0.485, 0.456, 0.406]).view(1, 3, 1, 1)
+        std = torch.tensor([0.229, 0.224, 0.225]).view(1, 3, 1, 1)
+        return ((tensor - mean) / std).contiguous()
+    return model(to_input(main_crops), to_input(minimap_crops))
+
+def measure(predict, iterations: int) -> tuple:
+    for _ in range(3):
+        predict()
+    latencies = []
+    for _ in range(iterations):
+        before_call = time.perf_counter()
+        predict()
+        latencies.append(time.perf_counter() - before_call)
+    latencies = np.array(latencies) * 1000
+    return latencies.mean(), np.percentile(latencies, 95)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=0, help="torch CPU threads (0 keeps torch's default)")
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    rng = np.random.default_rng(0)
+    main_crops = rng.integers(0, 255, (args.batch_size, 224, 224, 3), dtype=np.uint8)
+    minimap_crops = rng.integers(0, 255, (args.batch_size, 224, 224, 3), dtype=np.uint8)
+
+    dual = TacticalVisionNet(pretrained=False).eval()
+    shared = TacticalVisionNet(pretrained=False, shared_backbone=True).eval()
+    cases = [("eager, dual backbone", lambda: eager_predict(dual, main_crops, minimap_crops))]
+    runtimes = [
+        ("runtime, dual backbone, contiguous", TacticalVisionRuntime(dual, channels_last=False)),
+        ("runtime, dual backbone, channels_last", TacticalVisionRuntime(dual)),
+        ("runtime, shared backbone, channels_last", TacticalVisionRuntime(shared)),
+        ("runtime, shared backbone, int8 linear", TacticalVisionRuntime(shared, quantize=True)),
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = runtimes[2][1].export_torchscript(os.path.join(directory, "tactical_vision.pt"))
+        runtimes.append(("runtime, shared backbone, torchscript", TacticalVisionRuntime.from_torchscript(path)))
+    for name, runtime in runtimes:
+        cases.append((name, lambda runtime=runtime: runtime.predict(main_crops, minimap_crops)))
+
+    print(f"batch size {args.batch_size}, {torch.get_num_threads()} threads")
+    for name, predict in cases:
+        mean, p95 = measure(predict, args.iterations)
+        print(f"{name:42s} mean {mean:7.2f} ms  p95 {p95:7.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compares the latency and detections of the Rush YOLO model on the torch backend against exported backends.
+
+Usage (from src/):
+    python -m benchmarks.yolo_backends ../static_screenshots --backends onnx onnx-int8 openvino
+
+Frames can be anything ReplayApplication reads: an image, a directory of screenshots, or a recorded segment.
+Detections are parsed with parse_rush_model_results. Agreement is the fraction of detections matched between
+a backend and torch (same class, IoU >= --iou), relative to the larger of the two detection counts.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from inference.rush_inference import parse_rush_model_results
+from inference.yolo_object_detector import ONNX, TORCH, YoloObjectDetector
+from utilities import config
+from utilities.replay_app import ReplayApplication
+
+def detection_iou(a: dict, b: dict) -> float:
+    ax1, ay1 = a["points"]["x"], a["points"]["y"]
+    ax2, ay2 = ax1 + a["points"]["width"], ay1 + a["points"]["height"]
+    bx1, by1 = b["points"]["x"], b["points"]["y"]
+    bx2, by2 = bx1 + b["points"]["width"], by1 + b["points"]["height"]
+    intersection = max(0, min(ax2, bx2) - max(ax1, bx1)) * max(0, min(ay2, by2) - max(ay1, by1))
+    union = (ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - intersection
+    return intersection / union if union > 0 else 0.0
+
+def agreement(reference: list, candidate: list, iou_threshold: float) -> float:
+    """Greedily matches candidate detections to reference detections of the same class."""
+    if not reference and not candidate:
+        return 1.0
+    unmatched = list(candidate)
+    matches = 0
+    for detection in reference:
+        best = max(
+            (other for other in unmatched if other["class_name"] == detection["class_name"]),
+            key=lambda other: detection_iou(detection, other),
+            default=None
+        )
+        if best is not None and detection_iou(detection, best) >= iou_threshold:
+            unmatched.remove(best)
+            matches += 1
+    return matches / max(len(reference), len(candidate))
+
+def run_backend(detector: YoloObjectDetector, frames: list, repeats: int):
+    detector.warmup()
+    latencies = []
+    detections = []
+    for _ in range(repeats):
+        detections = []
+        for frame in frames:
+            before = time.perf_counter()
+            results = detector.model.predict(source=frame, conf=detector.conf_threshold, verbose=False)
+            latencies.append(time.perf_counter() - before)
+            detections.append(parse_rush_model_results(results))
+    return np.array(latencies), detections
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("frames", help="Image, directory of screenshots or recorded segment")
+    parser.add_argument("--backends", nargs="+", default=[ONNX, f"{ONNX}-int8"],
+                        help="Backends to compare with torch: onnx, onnx-int8, openvino")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes over the frames per backend")
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU needed for two detections to agree")
+    args = parser.parse_args()
+
+    replay = ReplayApplication.from_path(args.frames, pacing="fast", loop=False)
+    frames = [replay.capture_window()[..., :3] for _ in range(len(replay.frames))]
+    print(f"Benchmarking on {len(frames)} frames, {args.repeats} passes each")
+
+    reference_detector = YoloObjectDetector(config.HF_RUSH_DETECTION_PATH, config.HF_RUSH_DETECTION_FILENAME, backend=TORCH)
+    reference_latencies, reference_detections = run_backend(reference_detector, frames, args.repeats)
+
+    print(f"{'backend':<12} {'mean ms':>8} {'p95 ms':>8} {'speedup':>8} {'agreement':>10}")
+    print(f"{TORCH:<12} {reference_latencies.mean() * 1000:8.1f} {np.percentile(reference_latencies, 95) * 1000:8.1f} {1.0:8.2f} {1.0:10.1%}")
+    for name in args.backends:
+        backend, _, precision = name.partition("-")
+        detector = YoloObjectDetector(config.HF_RUSH_DETECTION_PATH, config.HF_RUSH_DETECTION_FILENAME,
+                                      backend=backend, quantize=precision == "int8")
+        latencies, detections = run_backend(detector, frames, args.repeats)
+        frame_agreement = np.mean([
+            agreement(reference, candidate, args.iou) for reference, candidate in zip(reference_detections, detections)
+        ])
+        print(f"{name:<12} {latencies.mean() * 1000:8.1f} {np.percentile(latencies, 95) * 1000:8.1f} "
+              f"{reference_latencies.mean() / latencies.mean():8.2f} {frame_agreement:10.1%}")
+
+if __name__ == "__main__":
+    main()
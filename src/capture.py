@@ -1,22 +1,39 @@
 import asyncio
+import sys
 import utilities.config as config
 
 from handlers.capture_image_handler import capture_image_handler
 from utilities.input_capture import on_press, on_release, on_click
-from utilities.macos_app import RunningApplication
+if sys.platform == "darwin":
+    from utilities.macos_app import RunningApplication
+else:
+    from utilities.linux_app import RunningApplication
+from utilities.replay_app import ReplayApplication
 from utilities.shared_thread_resources import SharedProgramData
 
-# Instantiate shared program data
-shared_data = SharedProgramData()
+def create_app():
+    if config.CAPTURE_IMAGE_USE_STATIC_IMAGE:
+        # Replay recorded frames instead of capturing the game window
+        return ReplayApplication.from_path(
+            config.CAPTURE_IMAGE_STATIC_IMAGE_PATH,
+            pacing=config.CAPTURE_REPLAY_PACING,
+            fps=config.CAPTURE_REPLAY_FPS,
+            loop=config.CAPTURE_REPLAY_LOOP,
+            preload=config.CAPTURE_REPLAY_PRELOAD
+        )
+    return RunningApplication(config.APP_NAME)
 
-# Start application
-app = RunningApplication(config.APP_NAME)
-
-async def main():
+async def run(app, shared_data):
     await capture_image_handler(app, shared_data)
 
-if __name__ == "__main__":
+def main():
+    # Set up here rather than at import, so importing this module (e.g. as a spawned process's __mp_main__) is safe
+    shared_data = SharedProgramData()
+    app = create_app()
     try:
-        asyncio.run(main())
+        asyncio.run(run(app, shared_data))
     except KeyboardInterrupt:
-        shared_data.exit_event.set()
\ No newline at end of file
+        shared_data.exit_event.set()
+
+if __name__ == "__main__":
+    main()
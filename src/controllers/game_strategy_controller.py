@@ -2,6 +2,7 @@ import time
 
 from game_state.game_state import GameState
 from game_state.game_state_tracker import GameStateTracker
+from inference.detection_set import DetectionSet
 from typing import Optional
 from utilities.image import ImageWrapper
 
@@ -31,18 +32,26 @@ class GameStrategyController():
         return self.game_state_tracker.current_game_state == GameState.IN_MATCH
 
     # New methods for Fast Path
-    async def update_strategy(self, detections: list, image_width: int):
+    async def update_strategy(self, detections, image_width: int):
         """
         Updates the current strategic intent based on object detections.
+        Detections are a DetectionSet, or a list of detection dicts in the `parse_rush_model_results` format.
         """
         self.strategic_intent = None # Reset
         
         # Simple Ball Chasing Logic
-        ball = next((d for d in detections if d['class_name'] == 'ball'), None)
+        ball_center = None
+        if isinstance(detections, DetectionSet):
+            balls = detections.by_class('ball').points()
+            if len(balls):
+                ball_x, _, ball_width, _ = balls[0].tolist()
+                ball_center = ball_x + (ball_width / 2)
+        else:
+            ball = next((d for d in detections if d['class_name'] == 'ball'), None)
+            if ball:
+                ball_center = ball['points']['x'] + (ball['points']['width'] / 2)
         
-        if ball:
-            ball_x = ball['points']['x']
-            ball_center = ball_x + (ball['points']['width'] / 2)
+        if ball_center is not None:
             screen_center = image_width / 2
             
             # Tolerance to avoid jitter
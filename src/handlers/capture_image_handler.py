@@ -1,55 +1,100 @@
-import asyncio
 import logging
-from concurrent.futures import Future
+import weakref
 from time import time
+from typing import TYPE_CHECKING
 
 import utilities.config as config
+from utilities.capture_worker import CaptureWorker
 from utilities.image import ImageWrapper
-from utilities.macos_app import RunningApplication
+from utilities.screenshot_archiver import ScreenshotArchiver, create_encoder
 import utilities.monitoring as monitoring
 from utilities.shared_thread_resources import SharedProgramData
+from utilities.video_recorder import SegmentedVideoRecorder
+
+if TYPE_CHECKING:
+    # Only needed for the annotation; importing it at runtime would pull in Quartz on Linux
+    from utilities.macos_app import RunningApplication
 
 capture_image_thread_statistics = monitoring.Statistics()
 
-async def capture_image_handler(app: RunningApplication, shared_data: SharedProgramData):
+async def capture_image_handler(app: 'RunningApplication', shared_data: SharedProgramData):
     """
     In this thread we will capture a screenshot of the desired application and stores it in a global variable for later use.
-    It uses the `get_window` and `ImageWrapper` functions from the `app_io` module to grab the window and create an image object.
-    The image is then locked with the `latest_screenshot_mutex` lock, ensuring that only one thread can access it at a time.
+    The blocking capture itself runs on a CaptureWorker thread, which writes frames into a shared-memory ring buffer.
+    This handler wraps the newest frame in an `ImageWrapper` (without copying the pixels) and hands it to
+    `shared_data.latest_screenshot`.
     """
     logger = logging.getLogger(__name__)
 
-    while(not shared_data.exit_event.is_set()):
-        logger.debug(f"capture_image_handler: Has looped {capture_image_thread_statistics.count} times. Elapsed time is {capture_image_thread_statistics.get_time()}")
-        capture_image_thread_statistics.count += 1
-        try:
-            if config.CAPTURE_IMAGE_USE_STATIC_IMAGE:
-                logger.debug("capture_image_handler: Serving a static image instead of live capturing.")
-                static_image_path = config.CAPTURE_IMAGE_STATIC_IMAGE_PATH
-                image = ImageWrapper.load_image_from_file(static_image_path)
-            else:
-                app.activate()
-                
-                logger.debug("capture_image_handler: Grabbing a screenshot")
-                
-                before_image_capture = time()
-                # Capture the image on the main thread
-                image = ImageWrapper(app.capture_window())
-                logger.debug(f"capture_image_handler: capture_window() took {time() - before_image_capture} seconds to complete.")
-                
-                screenshot_filename = f"{config.SCREENSHOTS_DIR}new-screenshot{time()}.png"
-                asyncio.create_task(image.async_save_image(screenshot_filename))  # Run the save operation in the background
-
-            # If the collection is full, attempt to remove images from the collection to free space.
-            # This needs to be a loop in case there are multiple threads adding screenshots to this
-            # collection at once.
-            while (shared_data.latest_screenshot.full()):
-                await shared_data.latest_screenshot.get()
-            await shared_data.latest_screenshot.put(image)
-
-            logger.debug(f"capture_image_handler: Finished grabbing a screenshot. Image is {image.compare_timestamp(time())} seconds stale.")
-                
-            # Even if the value is 0, we need to yield control back to the event loop
-            await asyncio.sleep(config.CAPTURE_IMAGE_THREAD_DELAY_SECONDS) 
-        except Exception as argument:
-            logger.error(argument)
\ No newline at end of file
+    # `app` is a RunningApplication, or a ReplayApplication when CAPTURE_IMAGE_USE_STATIC_IMAGE is set
+    governor = shared_data.capture_rate_governor
+    # Replayed frames keep their original capture timestamps
+    timestamp_func = (lambda: app.last_source_timestamp) if config.CAPTURE_IMAGE_USE_STATIC_IMAGE else None
+    worker = CaptureWorker(app.capture_window, app.activate, config.CAPTURE_RING_BUFFER_SLOTS, config.CAPTURE_IMAGE_THREAD_DELAY_SECONDS, governor,
+                           timestamp_func)
+    worker.start()
+
+    archiver = None
+    recorder = None
+    if config.SAVE_SCREENSHOTS and not config.CAPTURE_IMAGE_USE_STATIC_IMAGE and config.SCREENSHOT_RECORDING_MODE == "video":
+        recorder = SegmentedVideoRecorder(
+            config.SCREENSHOTS_DIR,
+            segment_seconds=config.VIDEO_SEGMENT_SECONDS,
+            container=config.VIDEO_CONTAINER,
+            fps=config.VIDEO_FPS,
+            quality=config.SCREENSHOT_QUALITY,
+            max_queue_size=config.SCREENSHOT_ARCHIVER_QUEUE_SIZE,
+            drop_policy=config.SCREENSHOT_ARCHIVER_DROP_POLICY
+        )
+    elif config.SAVE_SCREENSHOTS and not config.CAPTURE_IMAGE_USE_STATIC_IMAGE:
+        archiver = ScreenshotArchiver(
+            config.SCREENSHOTS_DIR,
+            create_encoder(config.SCREENSHOT_ENCODER, config.SCREENSHOT_QUALITY),
+            max_queue_size=config.SCREENSHOT_ARCHIVER_QUEUE_SIZE,
+            workers=config.SCREENSHOT_ARCHIVER_WORKERS,
+            drop_policy=config.SCREENSHOT_ARCHIVER_DROP_POLICY
+        )
+
+    try:
+        while(not shared_data.exit_event.is_set()):
+            logger.debug(f"capture_image_handler: Has looped {capture_image_thread_statistics.count} times. Elapsed time is {capture_image_thread_statistics.get_time()}")
+            try:
+                # Wake up periodically so the exit event is honoured even if capture stalls
+                frame = await worker.wait_for_frame(timeout=1.0)
+                if frame is None:
+                    continue
+                capture_image_thread_statistics.count += 1
+
+                image = ImageWrapper(frame.image, timestamp=frame.capture_time)
+                # Keep the ring buffer slot pinned for as long as anything references the image
+                weakref.finalize(image, frame.release)
+
+                if archiver:
+                    # Encoding and writing happen on the archiver's worker threads
+                    archiver.submit(frame.image, f"new-screenshot{frame.capture_time}")
+                    logger.debug(f"capture_image_handler: Screenshot archiver queue depth is {archiver.queue_depth()}, "
+                                 f"{archiver.frames_written} written ({archiver.bytes_written} bytes), {archiver.frames_dropped} dropped.")
+                elif recorder:
+                    recorder.submit(frame.image, capture_time=frame.capture_time)
+
+                # If the collection is full, attempt to remove images from the collection to free space.
+                # This needs to be a loop in case there are multiple threads adding screenshots to this
+                # collection at once.
+                dropped = shared_data.latest_screenshot.full()
+                while (shared_data.latest_screenshot.full()):
+                    await shared_data.latest_screenshot.get()
+                await shared_data.latest_screenshot.put(image)
+
+                logger.debug(f"capture_image_handler: Published frame {frame.sequence}. Image is {image.compare_timestamp(time())} seconds stale.")
+                if governor:
+                    governor.record_published(dropped)
+                    logger.debug(f"capture_image_handler: Capture rate target {governor.target_fps():.1f} fps, "
+                                 f"achieved {governor.achieved_fps():.1f} fps, drop rate {governor.drop_rate:.1%}.")
+            except Exception as argument:
+                logger.error(argument)
+    finally:
+        worker.stop()
+        if archiver:
+            archiver.close()
+        if recorder:
+            recorder.close()
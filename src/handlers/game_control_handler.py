@@ -1,13 +1,17 @@
 import asyncio
 import logging
+from typing import TYPE_CHECKING
 from controllers.game_flow_controller import GameFlowController
 from utilities import config
 import utilities.monitoring as monitoring
 
 from controllers.game_strategy_controller import GameStrategyController
-from utilities.macos_app import RunningApplication
 from utilities.shared_thread_resources import SharedProgramData
 
+if TYPE_CHECKING:
+    # Only needed for the annotation; importing it at runtime would pull in Quartz on Linux
+    from utilities.macos_app import RunningApplication
+
 controller_input_thread_statistics = monitoring.Statistics()
 
 # TODO: Consider controller_input_handler as a class with better dependency injection
@@ -19,7 +23,7 @@ def create_ongoing_action(coro):
     return asyncio.create_task(coro)
 
 # TODO: Check for active application before sending
-async def controller_input_handler(app: RunningApplication, game_flow: GameFlowController, game_strategy: GameStrategyController, shared_data: SharedProgramData):
+async def controller_input_handler(app: 'RunningApplication', game_flow: GameFlowController, game_strategy: GameStrategyController, shared_data: SharedProgramData):
     """
     In this thread we will read input from a controller (a Playstation Controller, but could be any other type of controller) and perform actions based on that input.
     It uses the `controller` module to grab the latest input data for each button on the controller and performs actions based on those inputs.
@@ -15,5 +15,9 @@ async def infer_image_handler(game: GameStrategyController, shared_data: SharedP
     """
     logger = logging.getLogger(__name__)
 
+    # Models load in the background while capture starts
+    await shared_data.wait_for_models()
+    logger.info(f"infer_image_handler: Models ready after {infer_image_thread_statistics.get_time():.2f} seconds.")
+
     pipeline = ImageInferencePipeline(game, shared_data)
     await pipeline.start()
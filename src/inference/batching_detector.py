@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+
+from inference.yolo_object_detector import YoloObjectDetector, to_rgb_array
+
+logger = logging.getLogger(__name__)
+
+class _Request:
+    __slots__ = ("image", "parse_results_delegate", "future")
+
+    def __init__(self, image: np.ndarray, parse_results_delegate: Optional[Callable], future: asyncio.Future):
+        self.image = image
+        self.parse_results_delegate = parse_results_delegate
+        self.future = future
+
+class BatchingObjectDetector:
+    """
+    A micro-batching front-end for a YoloObjectDetector.
+
+    Callers use `detect_objects()` exactly as they would on the detector. Requests are queued, and a background
+    task groups them into one `model.predict` call once `max_batch_size` requests are waiting or the oldest has
+    waited `max_wait_ms`. Requests that arrive while a batch is running form the next batch. Each caller gets back
+    only its own detections, parsed by its own delegate (or the detector's default parser).
+
+    The background task belongs to the event loop of the first caller.
+
+    Metrics: `batches_run`, `images_processed`, `mean_batch_size()`, `queue_depth()`, `in_flight` (images in the running
+    batch) and `batch_seconds` (the latency of the most recent batches).
+    """
+    def __init__(self, detector: YoloObjectDetector, max_batch_size: int = 8, max_wait_ms: float = 5.0):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000
+
+        self.batches_run = 0
+        self.images_processed = 0
+        self.in_flight = 0
+        self.batch_seconds = deque(maxlen=256)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def mean_batch_size(self) -> float:
+        return self.images_processed / self.batches_run if self.batches_run else 0.0
+
+    def queue_depth(self) -> int:
+        """Requests waiting for a batch, not counting the batch that is running."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def detect_objects(self, image, parse_results_delegate=None):
+        """
+        Queues the image for the next batch and waits for its detections.
+
+        Args:
+            image (ImageWrapper | PILImage | np.ndarray): The image.
+            parse_results_delegate (Callable): Parses this image's results, given as a single element list.
+
+        Returns:
+            List[dict]: The detections for this image.
+        """
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Request(to_rgb_array(image), parse_results_delegate, future))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            self.in_flight = len(batch)
+            before_batch = time.perf_counter()
+            try:
+                results = await asyncio.to_thread(
+                    self.detector.model.predict,
+                    source=[request.image for request in batch],
+                    conf=self.detector.conf_threshold,
+                    verbose=False
+                )
+            except Exception as argument:
+                logger.error(f"Batched object detection failed: {argument}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(argument)
+                continue
+            finally:
+                self.in_flight = 0
+
+            self.batch_seconds.append(time.perf_counter() - before_batch)
+            self.batches_run += 1
+            self.images_processed += len(batch)
+            logger.debug(f"Ran a batch of {len(batch)} images. Mean batch size is {self.mean_batch_size():.2f}.")
+
+            for request, result in zip(batch, results):
+                if request.future.done():
+                    # The caller was cancelled
+                    continue
+                try:
+                    parse = request.parse_results_delegate or self.detector.parse_results
+                    request.future.set_result(parse([result]))
+                except Exception as argument:
+                    request.future.set_exception(argument)
+
+    async def close(self):
+        """Stops the background task. Requests still queued are cancelled."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait().future.cancel()
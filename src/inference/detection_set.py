@@ -0,0 +1,114 @@
+import numpy as np
+
+class DetectionSet:
+    """
+    Object detections stored as columns instead of one dict per detection.
+
+    `xyxy` is an (N, 4) float32 array of box corners, `conf` an (N,) float32 array and `class_id` an (N,) int32 array.
+    `names` maps class ids to class names and is shared (not copied) by every view derived from the set.
+
+    Views (`filter`, `by_class`, `top_k`) return new sets without building Python objects per detection. For code
+    that expects the dict format of `parse_rush_model_results` (the webservice JSON, older callers), indexing and
+    iterating yield those dicts, and `to_dicts()` converts the whole set.
+    """
+    __slots__ = ("xyxy", "conf", "class_id", "names")
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, class_id: np.ndarray, names):
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        self.class_id = np.asarray(class_id, dtype=np.int32).reshape(-1)
+        self.names = names
+
+    @classmethod
+    def empty(cls, names=None):
+        return cls(np.empty((0, 4)), np.empty(0), np.empty(0), names if names is not None else {})
+
+    @classmethod
+    def from_results(cls, result):
+        """Builds a set from one ultralytics Results object, with a single copy of its boxes tensor."""
+        data = result.boxes.data
+        if hasattr(data, "cpu"):
+            data = data.cpu().numpy()
+        data = np.asarray(data)
+        return cls(data[:, :4], data[:, 4], data[:, 5], result.names)
+
+    @classmethod
+    def from_dicts(cls, detections: list, names=None):
+        """Builds a set from detections in the `parse_rush_model_results` dict format, e.g. webservice JSON."""
+        names = dict(names) if names is not None else {}
+        if not detections:
+            return cls.empty(names)
+        xyxy = np.empty((len(detections), 4), dtype=np.float32)
+        conf = np.empty(len(detections), dtype=np.float32)
+        class_id = np.empty(len(detections), dtype=np.int32)
+        for index, detection in enumerate(detections):
+            points = detection["points"]
+            xyxy[index] = (points["x"], points["y"], points["x"] + points["width"], points["y"] + points["height"])
+            conf[index] = detection.get("confidence", 0.0)
+            class_id[index] = detection["class_id"]
+            names.setdefault(int(detection["class_id"]), detection["class_name"])
+        return cls(xyxy, conf, class_id, names)
+
+    def __len__(self):
+        return len(self.conf)
+
+    def __repr__(self):
+        counts = {}
+        for class_id in self.class_id.tolist():
+            name = self.class_name(class_id)
+            counts[name] = counts.get(name, 0) + 1
+        return f"DetectionSet({len(self)} detections: {counts})"
+
+    def class_name(self, class_id: int) -> str:
+        return self.names[int(class_id)]
+
+    def class_ids_for(self, *class_names: str) -> list:
+        """The ids of the given class names in this set's name table. Unknown names are ignored."""
+        items = self.names.items() if isinstance(self.names, dict) else enumerate(self.names)
+        return [class_id for class_id, name in items if name in class_names]
+
+    def mask_for(self, *class_names: str) -> np.ndarray:
+        return np.isin(self.class_id, self.class_ids_for(*class_names))
+
+    def filter(self, mask: np.ndarray):
+        """A new set with the detections selected by a boolean mask or index array."""
+        return DetectionSet(self.xyxy[mask], self.conf[mask], self.class_id[mask], self.names)
+
+    def by_class(self, *class_names: str):
+        """The detections of the given classes, in their original order."""
+        return self.filter(self.mask_for(*class_names))
+
+    def top_k(self, k: int):
+        """The k most confident detections, most confident first."""
+        return self.filter(np.argsort(-self.conf, kind="stable")[:k])
+
+    def points(self) -> np.ndarray:
+        """(N, 4) int array of x, y, width, height, with corners truncated to ints as in `parse_rush_model_results`."""
+        corners = self.xyxy.astype(np.int64)
+        return np.column_stack((corners[:, 0], corners[:, 1], corners[:, 2] - corners[:, 0], corners[:, 3] - corners[:, 1]))
+
+    def _to_dict(self, index: int, points: np.ndarray) -> dict:
+        class_id = int(self.class_id[index])
+        x, y, width, height = points.tolist()
+        return {
+            "class_name": self.class_name(class_id),
+            "class_id": class_id,
+            "points": {"x": x, "y": y, "width": width, "height": height},
+            "confidence": float(self.conf[index])
+        }
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Detection index {index} out of range")
+        return self._to_dict(index, self.points()[index])
+
+    def __iter__(self):
+        points = self.points()
+        for index in range(len(self)):
+            yield self._to_dict(index, points[index])
+
+    def to_dicts(self) -> list:
+        """All detections in the `parse_rush_model_results` dict format."""
+        return list(self)
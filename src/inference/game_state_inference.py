@@ -1,20 +1,20 @@
 from controllers.game_strategy_controller import GameStrategyController
 from game_state.game_state import GameState, get_game_states
 from game_state.game_system_state import GameSystemState
-from inference.image_classification_inference import ImageClassifier
 from inference.inference_step import InferenceStep
+from inference.model_registry import image_classifier
 from utilities import config
 from utilities.image import ImageWrapper
 
 class GameStateInference(InferenceStep):
     async def infer(self, image: ImageWrapper, game: GameStrategyController):
         menu_vs_match_classes = get_game_states()
-        game_status_image_classifier = ImageClassifier(
-            config.HF_MENU_VS_MATCH_PATH, 
-            config.MENU_VS_MATCH_FILENAME, 
+        with image_classifier(
+            config.HF_MENU_VS_MATCH_PATH,
+            config.MENU_VS_MATCH_FILENAME,
             menu_vs_match_classes
-        )
-        game_status_response, _ = await game_status_image_classifier.classify_image(image)
+        ) as game_status_image_classifier:
+            game_status_response, _ = await game_status_image_classifier.classify_image(image)
 
         game.game_state_tracker.set_game_state(game_status_response)
 
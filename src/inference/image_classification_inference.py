@@ -1,49 +1,144 @@
 import asyncio
 import logging
+import os
+import threading
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from huggingface_hub import hf_hub_download
+from huggingface_hub.utils import EntryNotFoundError
 import utilities.config as config
+from inference.yolo_object_detector import export_directory
 
 logger = logging.getLogger(__name__)
 
+KERAS = "keras"
+TFLITE = "tflite"
+ONNX = "onnx"
+BACKENDS = (KERAS, TFLITE, ONNX)
+
+def default_device(backend: str = KERAS) -> str:
+    # Converted backends run on the CPU; Keras uses a GPU (CUDA, or Metal on Apple silicon) when TensorFlow sees one
+    if backend != KERAS:
+        return "cpu"
+    import tensorflow as tf
+    return "gpu" if tf.config.list_physical_devices("GPU") else "cpu"
+
+def converted_model_path(keras_path: str, backend: str, export_dir: str = None) -> str:
+    """Where the conversion of `keras_path` for a backend is written, in the same export directory as YOLO exports."""
+    stem = os.path.splitext(os.path.basename(keras_path))[0]
+    return os.path.join(export_directory(keras_path, export_dir), f"{stem}.{backend}")
+
+def convert_keras_model(keras_path: str, backend: str, export_dir: str = None) -> str:
+    """
+    Converts a Keras .h5 model to TFLite or ONNX in the export directory, reusing a previous conversion.
+    This is the only place the converted backends need TensorFlow, and it only runs once per model.
+    """
+    output_path = converted_model_path(keras_path, backend, export_dir)
+    if os.path.exists(output_path):
+        return output_path
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    logger.info(f"Converting {keras_path} to {backend}. This only happens once.")
+    import tensorflow as tf
+    model = tf.keras.models.load_model(keras_path, compile=False)
+    if backend == TFLITE:
+        with open(output_path, 'wb') as out_file:
+            out_file.write(tf.lite.TFLiteConverter.from_keras_model(model).convert())
+    elif backend == ONNX:
+        import tf2onnx
+        tf2onnx.convert.from_keras(model, output_path=output_path)
+    else:
+        raise ValueError(f"Unsupported conversion backend: {backend}, expected {TFLITE} or {ONNX}")
+    return output_path
+
+def _load_tflite_interpreter(path: str):
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError as error:
+            raise ImportError("The tflite classifier backend requires ai-edge-litert (poetry install --extras tflite) "
+                              "or tflite-runtime") from error
+    interpreter = Interpreter(model_path=path)
+    interpreter.allocate_tensors()
+    return interpreter
+
 class ImageClassifier:
+    """
+    Classifies frames with a model trained in Keras.
 
-    def __init__(self, modelpath, filename, class_labels, target_resolution=(480, 270)):
-        self.modelpath = hf_hub_download(modelpath, filename)
-        self.model = tf.keras.models.load_model(self.modelpath)
-        # Compile the loaded model specifying metrics
-        self.model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+    The "keras" backend loads the original .h5 model with TensorFlow. The "tflite" and "onnx" backends run a converted
+    copy of the model (downloaded from the same HuggingFace repo if it is published there, otherwise converted locally
+    once), and never import TensorFlow at inference time. All backends share the same preprocessing: the frame's
+    cached resize is scaled to [0, 1] into a float32 input buffer that is reused for every frame.
+    """
 
+    def __init__(self, modelpath, filename, class_labels, target_resolution=(480, 270), backend=KERAS):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported image classifier backend: {backend}, expected one of: {', '.join(BACKENDS)}")
+        self.backend = backend
         self.class_labels = class_labels
         self.target_resolution = target_resolution
-        self.datagen = ImageDataGenerator(rescale=1./255)
+
+        if backend == KERAS:
+            import tensorflow as tf
+            self.modelpath = hf_hub_download(modelpath, filename)
+            # The model is only used for predictions, so it doesn't need compiling with an optimizer
+            self.model = tf.keras.models.load_model(self.modelpath, compile=False)
+        else:
+            try:
+                self.modelpath = hf_hub_download(modelpath, os.path.basename(converted_model_path(filename, backend)))
+            except EntryNotFoundError:
+                self.modelpath = convert_keras_model(hf_hub_download(modelpath, filename), backend)
+            if backend == TFLITE:
+                self.model = _load_tflite_interpreter(self.modelpath)
+            else:
+                import onnxruntime
+                self.model = onnxruntime.InferenceSession(self.modelpath, providers=["CPUExecutionProvider"])
+
+        height, width = self.target_resolution
+        # Reused for every frame. The lock keeps concurrent callers from overwriting each other's input.
+        self._input = np.empty((1, height, width, 3), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def _predict(self, batch: np.ndarray) -> np.ndarray:
+        if self.backend == KERAS:
+            return self.model.predict(batch, verbose=0)
+        if self.backend == TFLITE:
+            self.model.set_tensor(self.model.get_input_details()[0]["index"], batch)
+            self.model.invoke()
+            return self.model.get_tensor(self.model.get_output_details()[0]["index"])
+        return self.model.run(None, {self.model.get_inputs()[0].name: batch})[0]
+
+    def warmup(self):
+        """Runs one prediction on a blank image, so the first real frame doesn't pay for graph tracing."""
+        with self._lock:
+            self._input.fill(0)
+            self._predict(self._input)
+
+    def memory_bytes(self) -> int:
+        """Size of the model's weights (the converted model's size for converted backends)."""
+        if self.backend == KERAS:
+            return sum(weight.nbytes for weight in self.model.get_weights())
+        return os.path.getsize(self.modelpath)
 
     async def classify_image(self, image_wrapper):
         logger.debug(f"Classifying image from latest screenshot using {self.modelpath}")
-        img = await self.load_and_preprocess_image(image_wrapper)
-        predictions = await asyncio.to_thread(self.model.predict, img)
+        resized = self.preprocess(image_wrapper)
+        predictions = await asyncio.to_thread(self._classify, resized)
 
         predicted_class = self.class_labels[np.argmax(predictions)]
 
         return predicted_class, predictions
 
-    async def load_and_preprocess_image(self, image_wrapper):
-        img_array = image_wrapper._imageArray
-        
-        # Check the number of channels; if 4, drop the alpha channel
-        if img_array.shape[-1] == 4:
-            img_array = img_array[..., :3]
-        
-        # Resize image if needed
-        if img_array.shape[:2] != self.target_resolution:
-            img_array = tf.image.resize(img_array, self.target_resolution).numpy()
-
-        # Convert the image array to float32 for preprocessing
-        img_array = img_array.astype(np.float32)
-
-        img_array = np.expand_dims(img_array, axis=0)
-        img_processed = await asyncio.to_thread(self.datagen.standardize, img_array)
-        
-        return img_processed
+    def preprocess(self, image_wrapper) -> np.ndarray:
+        # target_resolution is (height, width). The RGB view and resize are cached on the frame,
+        # so classifiers sharing a resolution reuse a single conversion.
+        height, width = self.target_resolution
+        return image_wrapper.resized(width, height)
+
+    def _classify(self, resized: np.ndarray) -> np.ndarray:
+        with self._lock:
+            # Same scaling as the ImageDataGenerator(rescale=1./255) the models were trained with
+            np.multiply(resized, np.float32(1. / 255), out=self._input[0])
+            return np.array(self._predict(self._input))
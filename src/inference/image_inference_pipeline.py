@@ -2,13 +2,36 @@ import asyncio
 import logging
 
 from controllers.game_strategy_controller import GameStrategyController
+from game_state.game_state import GameState
+from game_state.menu_state import MenuState
 from inference.game_state_inference import GameStateInference
+from inference.inference_graph import InferenceGraph
 from inference.menu_state_inference import MenuStateInference
 from inference.rush_inference import RushInference
 from inference.squad_selection_inference import SquadSelectionInference
 from utilities import config
+from utilities.frame_change_detector import FrameChangeDetector
 from utilities.image import ImageWrapper
 
+def build_inference_graph() -> InferenceGraph:
+    """
+    Declares the inference steps run for each frame.
+
+    Rush detection always runs; detections mean we are in a match. Without detections, the game state classifier
+    decides between match and menu. The menu lane (menu state, then squad selection) only runs in menus, and is
+    disabled unless INFERENCE_MENU_LANE_ENABLED is set, because its models are slow and rarely needed.
+    """
+    graph = InferenceGraph()
+    graph.add("rush", RushInference())
+    graph.add("game_state", GameStateInference(), depends_on=["rush"],
+              gate=lambda context: len(context.results["rush"]) == 0)
+    if config.INFERENCE_MENU_LANE_ENABLED:
+        graph.add("menu_state", MenuStateInference(), depends_on=["game_state"],
+                  gate=lambda context: context.game_state == GameState.IN_MENU)
+        graph.add("squad_selection", SquadSelectionInference(), depends_on=["menu_state"],
+                  gate=lambda context: context.results["menu_state"] == MenuState.SQUAD_BATTLES_OPPONENT_SELECTION)
+    return graph.compile()
+
 class ImageInferencePipeline:
     def __init__(self, game: GameStrategyController, shared_data: 'SharedProgramData'):
         self.game = game
@@ -16,6 +39,18 @@ class ImageInferencePipeline:
         self.stop_event = shared_data.exit_event
         self.shared_data = shared_data
         self.logger = logging.getLogger(__name__)
+        # Built once and reused for every frame
+        self.graph = build_inference_graph()
+
+        # Menu frames that are practically identical to the last inferred frame reuse the previous inference
+        # results instead of running the models again. See `frame_unchanged`.
+        self.change_detector = None
+        if config.INFERENCE_SKIP_UNCHANGED_FRAMES:
+            self.change_detector = FrameChangeDetector(
+                threshold=config.INFERENCE_UNCHANGED_FRAME_THRESHOLD,
+                method=config.INFERENCE_UNCHANGED_FRAME_METHOD,
+                max_consecutive_unchanged=config.INFERENCE_UNCHANGED_FRAME_MAX_SKIPS
+            )
 
     async def start(self):
         """Starts the inference pipeline."""
@@ -25,29 +60,58 @@ class ImageInferencePipeline:
             try:
                 # This will block until an image is available
                 image = await self.latest_screenshot_queue.get()
-                if image:
-                    await self.process_image(image)
-                    await self.game.set_last_image(image)
-                    inference_timestamp = await self.game.update_inference_timestamp()
-                    # Signal that inference is complete
-                    self.shared_data.inference_completed_event.set()
-                    elapsed_time = image.compare_timestamp(inference_timestamp)
-                    self.logger.debug(f"Time elapsed for image inference: {elapsed_time}")
-                else:
-                    self.logger.warning("No image available for inference.")
-                    # If we somehow get a None image, sleep briefly to prevent a tight loop
-                    await asyncio.sleep(0.1)
+                governor = self.shared_data.capture_rate_governor
+                if governor:
+                    governor.inference_started()
+                try:
+                    await self.infer_frame(image)
+                finally:
+                    # Also on failure, so the governor never paces against a frame that is no longer being inferred
+                    if governor:
+                        governor.inference_finished()
             except Exception as e:
                 self.logger.error(f"Inference pipeline error: {e}")
 
+    async def infer_frame(self, image: ImageWrapper):
+        """Runs inference on one frame from the queue, unless it is unchanged, and records it as the last image."""
+        if not image:
+            self.logger.warning("No image available for inference.")
+            # If we somehow get a None image, sleep briefly to prevent a tight loop
+            await asyncio.sleep(0.1)
+            return
+        if self.frame_unchanged(image):
+            self.logger.debug(f"Frame unchanged, reusing previous inference results. "
+                              f"Skipped {self.change_detector.frames_unchanged}/{self.change_detector.frames_checked} "
+                              f"frames ({self.change_detector.skipped_ratio():.1%}).")
+        else:
+            await self.process_image(image)
+        await self.game.set_last_image(image)
+        inference_timestamp = await self.game.update_inference_timestamp()
+        # Signal that inference is complete
+        self.shared_data.inference_completed_event.set()
+        elapsed_time = image.compare_timestamp(inference_timestamp)
+        self.logger.debug(f"Time elapsed for image inference: {elapsed_time}")
+
+    def frame_unchanged(self, image: ImageWrapper) -> bool:
+        """
+        Whether inference can be skipped because the frame matches the last inferred frame.
+        Never true in a match: the ball and players moving barely change the thumbnail, but the strategy needs them.
+        """
+        if self.change_detector is None:
+            return False
+        if self.game.game_state_tracker.current_game_state == GameState.IN_MATCH:
+            # Start from a fresh reference once the match ends
+            self.change_detector.reset()
+            return False
+        return self.change_detector.is_unchanged(image.grayscale())
+
     async def process_image(self, image: ImageWrapper):
-        """Processes an image through the inference pipeline."""
-        first_inference = RushInference()
-        first_inference.set_next(GameStateInference())
-        # TODO: Similar to the todo in GameStateInference, the inference pipeline needs to be refactored. 
-        # The current approach is too slow and requires too many different models to be loaded. 
-        # Please see notes in IDEAS.md for more details on the new idea.
-        #first_inference.set_next(GameStateInference()).set_next(MenuStateInference()).set_next(SquadSelectionInference())
-
-        await first_inference.execute(image, self.game)
+        """Processes an image through the inference graph, then updates the strategy from the joined results."""
+        report = await self.graph.run(image, self.game)
+        self.logger.debug(f"Inference steps run: {', '.join(report.steps_run)}. {report}")
+
+        rush_detections = report.results.get("rush")
+        if rush_detections:
+            await self.game.update_strategy(rush_detections, image.width)
+        return report
         
\ No newline at end of file
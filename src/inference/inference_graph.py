@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Callable, Optional
+
+from controllers.game_strategy_controller import GameStrategyController
+from inference.inference_step import InferenceStep
+from utilities.image import ImageWrapper
+
+logger = logging.getLogger(__name__)
+
+class FrameContext:
+    """What gates can see while a frame runs through the graph: the game controller and the results so far."""
+    def __init__(self, game: GameStrategyController):
+        self.game = game
+        self.results = {}
+
+    @property
+    def game_state(self):
+        return self.game.game_state_tracker.current_game_state
+
+class FrameReport:
+    """Which steps ran for a frame, which were skipped, and how long each step took."""
+    def __init__(self):
+        self.steps_run = []
+        self.steps_skipped = []
+        self.timings = {}
+        self.results = {}
+        self.total_seconds = 0.0
+
+    def __str__(self):
+        timings = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.timings.items())
+        skipped = f", skipped: {', '.join(self.steps_skipped)}" if self.steps_skipped else ""
+        return f"{self.total_seconds * 1000:.1f}ms total ({timings}{skipped})"
+
+class _Node:
+    __slots__ = ("name", "step", "depends_on", "gate")
+
+    def __init__(self, name: str, step: InferenceStep, depends_on: tuple, gate: Optional[Callable]):
+        self.name = name
+        self.step = step
+        self.depends_on = depends_on
+        self.gate = gate
+
+class InferenceGraph:
+    """
+    A directed acyclic graph of InferenceSteps, declared once at startup and reused for every frame.
+
+    A node runs after every node it depends on has run, and only if its gate (a callable taking the frame's
+    FrameContext) returns True. Nodes whose gate is closed are skipped, and so is everything that depends on
+    them, so a gate at the top of a lane (e.g. "in a menu") switches off the whole lane.
+    The value returned by each step's `infer()` is stored in `FrameContext.results` under the node's name.
+
+    Nodes run in waves: every node whose dependencies are settled runs concurrently with the others in its wave,
+    so independent steps reading the same frame take as long as the slowest of them rather than their sum.
+    Async steps are awaited (their model calls already run on threads through `asyncio.to_thread`), and steps
+    with a synchronous `infer()` run on `executor` (the event loop's default executor if None).
+    """
+    def __init__(self, executor: Optional[Executor] = None):
+        self.executor = executor
+        self._nodes = {}
+        self._order = None
+
+    def add(self, name: str, step: InferenceStep, depends_on=(), gate: Optional[Callable] = None):
+        """Adds a step to the graph. Returns the graph, so declarations can be chained."""
+        if name in self._nodes:
+            raise ValueError(f"Inference graph already has a step named {name}")
+        self._nodes[name] = _Node(name, step, tuple(depends_on), gate)
+        self._order = None
+        return self
+
+    def compile(self):
+        """Validates the graph and fixes the execution order. Called automatically on the first run."""
+        for node in self._nodes.values():
+            for dependency in node.depends_on:
+                if dependency not in self._nodes:
+                    raise ValueError(f"Inference step {node.name} depends on unknown step {dependency}")
+
+        order = []
+        visiting = set()
+        visited = set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Inference graph has a cycle through {name}")
+            visiting.add(name)
+            for dependency in self._nodes[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+            order.append(self._nodes[name])
+
+        for name in self._nodes:
+            visit(name)
+        self._order = order
+        return self
+
+    def _should_run(self, node: _Node, context: FrameContext, report: FrameReport) -> bool:
+        if any(dependency not in report.timings for dependency in node.depends_on):
+            return False
+        return node.gate is None or node.gate(context)
+
+    async def _run_step(self, node: _Node, image: ImageWrapper, game: GameStrategyController):
+        before_step = time.perf_counter()
+        if asyncio.iscoroutinefunction(node.step.infer):
+            result = await node.step.infer(image, game)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, node.step.infer, image, game)
+        return result, time.perf_counter() - before_step
+
+    async def run(self, image: ImageWrapper, game: GameStrategyController) -> FrameReport:
+        """Runs the frame through the graph and reports which steps ran and how long each took."""
+        if self._order is None:
+            self.compile()
+
+        context = FrameContext(game)
+        report = FrameReport()
+        settled = set()
+        pending = list(self._order)
+        before_frame = time.perf_counter()
+        while pending:
+            wave = [node for node in pending if all(dependency in settled for dependency in node.depends_on)]
+            pending = [node for node in pending if node not in wave]
+
+            runnable = []
+            for node in wave:
+                if self._should_run(node, context, report):
+                    runnable.append(node)
+                else:
+                    report.steps_skipped.append(node.name)
+
+            # Wait for every step in the wave, even if one fails, so no step is left running in the background
+            outcomes = await asyncio.gather(*(self._run_step(node, image, game) for node in runnable), return_exceptions=True)
+            for node, outcome in zip(runnable, outcomes):
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                context.results[node.name], report.timings[node.name] = outcome
+                report.steps_run.append(node.name)
+            settled.update(node.name for node in wave)
+
+        report.results = context.results
+        report.total_seconds = time.perf_counter() - before_frame
+        return report
@@ -0,0 +1,231 @@
+import asyncio
+import atexit
+import logging
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Optional
+
+import numpy as np
+
+from inference.detection_set import DetectionSet
+from inference.yolo_object_detector import to_rgb_array
+from utilities import config
+
+logger = logging.getLogger(__name__)
+
+def load_rush_worker_model():
+    """Loads and warms up the Rush detector in a worker process, limiting torch to the configured threads per worker."""
+    if config.INFERENCE_WORKER_THREADS > 0:
+        import torch
+        torch.set_num_threads(config.INFERENCE_WORKER_THREADS)
+    from inference.model_registry import create_yolo_detector
+    detector = create_yolo_detector(config.HF_RUSH_DETECTION_PATH, config.HF_RUSH_DETECTION_FILENAME)
+    detector.warmup()
+    return detector
+
+def detections_array(detector, image: np.ndarray) -> np.ndarray:
+    """Runs the detector on one frame and returns its boxes as an (N, 6) float32 array of x1, y1, x2, y2, conf, class id."""
+    results = detector.model.predict(source=image, conf=detector.conf_threshold, verbose=False)
+    data = results[0].boxes.data
+    if hasattr(data, "cpu"):
+        data = data.cpu().numpy()
+    return np.asarray(data, dtype=np.float32).reshape(-1, 6)
+
+def _worker_main(connection, model_factory: Callable):
+    """
+    Worker process loop. Sends ("ready", class names) once the model is loaded, then answers each
+    (shared memory name, shape) request with ("ok", detections array) or ("error", message), until it receives None.
+    """
+    try:
+        detector = model_factory()
+    except Exception as argument:
+        connection.send(("error", f"Model loading failed: {argument}"))
+        return
+    connection.send(("ready", dict(detector.model.names)))
+
+    shm = None
+    try:
+        while True:
+            request = connection.recv()
+            if request is None:
+                break
+            shm_name, shape = request
+            try:
+                if shm is None or shm.name != shm_name:
+                    if shm is not None:
+                        shm.close()
+                    shm = SharedMemory(name=shm_name)
+                image = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+                try:
+                    connection.send(("ok", detections_array(detector, image)))
+                finally:
+                    # The view exports the segment's buffer, which must be released before the segment can be closed
+                    del image
+            except Exception as argument:
+                connection.send(("error", str(argument)))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        if shm is not None:
+            shm.close()
+
+class _Worker:
+    __slots__ = ("process", "connection", "shm")
+
+    def __init__(self, process, connection):
+        self.process = process
+        self.connection = connection
+        self.shm: Optional[SharedMemory] = None
+
+    def frame_buffer(self, image: np.ndarray) -> np.ndarray:
+        """This worker's shared memory as an array shaped like `image`, growing the segment if the frame is larger."""
+        if self.shm is None or self.shm.size < image.nbytes:
+            self.release_frame_buffer()
+            self.shm = SharedMemory(create=True, size=image.nbytes)
+        return np.ndarray(image.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    def release_frame_buffer(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+class InferenceWorkerPool:
+    """
+    A pool of long-lived worker processes that run the Rush detector, so inference can use several CPU cores
+    without contending for the main process's GIL.
+
+    Each worker loads its model once when the pool starts. A frame is handed to a worker by copying its pixels into
+    shared memory owned by that worker, and only the segment name and frame shape go through the worker's pipe.
+    Detections come back as an (N, 6) float32 array and are returned as an unfiltered DetectionSet.
+    Each worker handles one frame at a time. When every worker is busy, callers wait for the first free one.
+
+    `model_factory` runs in the worker processes, so it must be a module-level function. It returns an object with
+    `model` (an ultralytics YOLO model) and `conf_threshold`, like YoloObjectDetector.
+
+    Metrics: `frames_processed`, `busy_workers()`.
+    """
+    def __init__(self, workers: int, model_factory: Callable = load_rush_worker_model, start_method: str = "spawn"):
+        if workers < 1:
+            raise ValueError(f"An inference worker pool needs at least one worker, got {workers}")
+        self.worker_count = workers
+        self.model_factory = model_factory
+        # Spawned rather than forked, so workers don't inherit the parent's CUDA context or capture threads
+        self._context = multiprocessing.get_context(start_method)
+        self._workers = []
+        self._idle: Optional[asyncio.Queue] = None
+        self.names = {}
+        self.frames_processed = 0
+
+    def _start_worker(self) -> _Worker:
+        parent_connection, child_connection = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child_connection, self.model_factory), daemon=True)
+        process.start()
+        child_connection.close()
+        worker = _Worker(process, parent_connection)
+        status, payload = worker.connection.recv()
+        if status != "ready":
+            process.join()
+            raise RuntimeError(payload)
+        self.names = payload
+        return worker
+
+    def start(self):
+        """Starts the workers and waits until every worker has loaded its model."""
+        if self._workers:
+            return self
+        try:
+            for _ in range(self.worker_count):
+                self._workers.append(self._start_worker())
+        except Exception:
+            self.close()
+            raise
+        atexit.register(self.close)
+        logger.info(f"Started {self.worker_count} inference worker processes.")
+        return self
+
+    def busy_workers(self) -> int:
+        return len(self._workers) - (self._idle.qsize() if self._idle is not None else len(self._workers))
+
+    def _predict(self, worker: _Worker, image: np.ndarray) -> np.ndarray:
+        np.copyto(worker.frame_buffer(image), image)
+        worker.connection.send((worker.shm.name, image.shape))
+        status, payload = worker.connection.recv()
+        if status != "ok":
+            raise RuntimeError(f"Inference worker failed: {payload}")
+        return payload
+
+    async def _replace_worker(self, worker: _Worker):
+        """Replaces a worker whose process died, so the pool keeps its size."""
+        logger.error("Inference worker process exited unexpectedly, restarting it.")
+        worker.connection.close()
+        worker.release_frame_buffer()
+        self._workers.remove(worker)
+        replacement = await asyncio.to_thread(self._start_worker)
+        self._workers.append(replacement)
+        self._idle.put_nowait(replacement)
+
+    def _return_worker(self, worker: _Worker, prediction: asyncio.Future):
+        """Puts a worker back in the idle queue once its current prediction, if any, has finished."""
+        def put_back(prediction):
+            if not prediction.cancelled():
+                # Already raised to the caller, or discarded because the caller was cancelled
+                prediction.exception()
+            if self._idle is not None and worker in self._workers:
+                self._idle.put_nowait(worker)
+        if prediction.done():
+            put_back(prediction)
+        else:
+            # The caller was cancelled, but the worker is still answering. Reusing it now would hand this
+            # frame's reply to the next caller.
+            prediction.add_done_callback(put_back)
+
+    async def detect(self, image) -> DetectionSet:
+        """
+        Runs the detector on a frame in the next free worker.
+
+        Args:
+            image (ImageWrapper | PILImage | np.ndarray): The frame.
+
+        Returns:
+            DetectionSet: Every detection the model returned, before any filtering.
+        """
+        if not self._workers:
+            raise RuntimeError("The inference worker pool is not started")
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for worker in self._workers:
+                self._idle.put_nowait(worker)
+
+        image = to_rgb_array(image)
+        worker = await self._idle.get()
+        prediction = asyncio.ensure_future(asyncio.to_thread(self._predict, worker, image))
+        try:
+            # Shielded, so a cancelled caller doesn't abandon the worker mid-reply
+            data = await asyncio.shield(prediction)
+        except (EOFError, OSError) as argument:
+            await self._replace_worker(worker)
+            worker = None
+            raise RuntimeError("Inference worker process exited unexpectedly") from argument
+        finally:
+            if worker is not None:
+                self._return_worker(worker, prediction)
+        self.frames_processed += 1
+        return DetectionSet(data[:, :4], data[:, 4], data[:, 5], self.names)
+
+    def close(self):
+        """Stops the workers and frees their shared memory."""
+        for worker in self._workers:
+            try:
+                worker.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.connection.close()
+            worker.release_frame_buffer()
+        self._workers = []
+        self._idle = None
+        atexit.unregister(self.close)
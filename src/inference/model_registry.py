@@ -0,0 +1,168 @@
+import gc
+import logging
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import utilities.config as config
+
+logger = logging.getLogger(__name__)
+
+# Identifies a loaded model. `backend` is the runtime that executes it (e.g. "torch", "onnx-int8", "keras")
+# and `device` where it runs, so the same weights on two backends or devices are separate entries.
+ModelKey = namedtuple("ModelKey", ["repo", "filename", "backend", "device"])
+
+class _Entry:
+    __slots__ = ("model", "size_bytes", "references", "last_used", "lock")
+
+    def __init__(self):
+        self.model = None
+        self.size_bytes = 0
+        self.references = 0
+        self.last_used = 0.0
+        # Held while loading, so concurrent requests for the same model wait for a single load
+        self.lock = threading.Lock()
+
+def estimate_model_bytes(model) -> int:
+    """Returns `model.memory_bytes()` if the model reports its size, otherwise 0 (never counted against the budget)."""
+    memory_bytes = getattr(model, "memory_bytes", None)
+    return int(memory_bytes()) if callable(memory_bytes) else 0
+
+class ModelRegistry:
+    """
+    Loads each model once per process and hands out the shared instance.
+
+    Models are loaded on first use, warmed up with a dummy inference, and then leased: `lease()` keeps a model
+    referenced while it is in use. When the total size of loaded models exceeds the memory budget, the least
+    recently used models that nobody references are unloaded (e.g. the menu classifiers during a match), and
+    loaded again the next time they are needed. A budget of 0 disables eviction.
+    """
+    def __init__(self, memory_budget_bytes: int = 0):
+        self.memory_budget_bytes = memory_budget_bytes
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def acquire(self, key: ModelKey, loader: Callable, warmup: Optional[Callable] = None):
+        """
+        Returns the model for `key`, loading and warming it up with `loader()` and `warmup(model)` if needed.
+        The model stays referenced (and can't be evicted) until `release(key)` is called.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            entry.references += 1
+            entry.last_used = time.monotonic()
+
+        try:
+            with entry.lock:
+                if entry.model is None:
+                    before_load = time.perf_counter()
+                    model = loader()
+                    if warmup:
+                        warmup(model)
+                    entry.size_bytes = estimate_model_bytes(model)
+                    entry.model = model
+                    self.loads += 1
+                    logger.info(f"Loaded model {key} ({entry.size_bytes / 2**20:.1f} MB) in {time.perf_counter() - before_load:.2f} seconds.")
+        except Exception:
+            with self._lock:
+                entry.references -= 1
+                if entry.model is None and entry.references == 0:
+                    self._entries.pop(key, None)
+            raise
+
+        self._evict()
+        return entry.model
+
+    def release(self, key: ModelKey):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.references == 0:
+                raise KeyError(f"Model {key} is not acquired")
+            entry.references -= 1
+            entry.last_used = time.monotonic()
+        self._evict()
+
+    @contextmanager
+    def lease(self, key: ModelKey, loader: Callable, warmup: Optional[Callable] = None):
+        """Context manager that acquires the model for the duration of the block."""
+        model = self.acquire(key, loader, warmup)
+        try:
+            yield model
+        finally:
+            self.release(key)
+
+    def loaded_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values() if entry.model is not None)
+
+    def is_loaded(self, key: ModelKey) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.model is not None
+
+    def _evict(self):
+        if not self.memory_budget_bytes:
+            return
+        evicted = []
+        with self._lock:
+            loaded = sum(entry.size_bytes for entry in self._entries.values() if entry.model is not None)
+            idle = sorted(
+                ((key, entry) for key, entry in self._entries.items() if entry.references == 0 and entry.model is not None),
+                key=lambda item: item[1].last_used
+            )
+            for key, entry in idle:
+                if loaded <= self.memory_budget_bytes:
+                    break
+                del self._entries[key]
+                loaded -= entry.size_bytes
+                evicted.append((key, entry))
+                self.evictions += 1
+
+        for key, entry in evicted:
+            logger.info(f"Unloaded model {key} to stay within the {self.memory_budget_bytes / 2**20:.0f} MB model memory budget.")
+            entry.model = None
+        if evicted:
+            gc.collect()
+
+model_registry = ModelRegistry(int(config.MODEL_REGISTRY_MEMORY_BUDGET_MB * 2**20))
+
+def yolo_backend() -> str:
+    """The configured YOLO backend name, with an -int8 suffix for quantized models."""
+    return f"{config.YOLO_BACKEND}-int8" if config.YOLO_QUANTIZE_INT8 else config.YOLO_BACKEND
+
+def yolo_detector_key(repo: str, filename: str) -> ModelKey:
+    from inference.yolo_object_detector import default_device
+    return ModelKey(repo, filename, yolo_backend(), default_device(config.YOLO_BACKEND))
+
+def create_yolo_detector(repo: str, filename: str, conf_threshold: float = 0.25):
+    """Builds a YoloObjectDetector on the configured backend."""
+    from inference.yolo_object_detector import YoloObjectDetector
+    return YoloObjectDetector(repo, filename, conf_threshold, backend=config.YOLO_BACKEND, quantize=config.YOLO_QUANTIZE_INT8)
+
+def image_classifier_key(repo: str, filename: str) -> ModelKey:
+    from inference.image_classification_inference import default_device
+    return ModelKey(repo, filename, config.IMAGE_CLASSIFIER_BACKEND, default_device(config.IMAGE_CLASSIFIER_BACKEND))
+
+def yolo_detector(repo: str, filename: str, conf_threshold: float = 0.25):
+    """Leases the shared YoloObjectDetector for a HuggingFace model, loading it on first use."""
+    from inference.yolo_object_detector import YoloObjectDetector
+    return model_registry.lease(
+        yolo_detector_key(repo, filename),
+        lambda: create_yolo_detector(repo, filename, conf_threshold),
+        YoloObjectDetector.warmup
+    )
+
+def image_classifier(repo: str, filename: str, class_labels):
+    """Leases the shared ImageClassifier for a HuggingFace model, loading it on first use."""
+    from inference.image_classification_inference import ImageClassifier
+    return model_registry.lease(
+        image_classifier_key(repo, filename),
+        lambda: ImageClassifier(repo, filename, class_labels, backend=config.IMAGE_CLASSIFIER_BACKEND),
+        ImageClassifier.warmup
+    )
@@ -1,10 +1,15 @@
+import asyncio
 import logging
+from collections import OrderedDict
 from typing import Optional
 import aiohttp
 import json
 import re
 
 from utilities import config
+from utilities.app_io import get_prompt
+from utilities.frame_change_detector import difference_hash
+from utilities.nlp import StateMatcher, decode_json
 from game_state.menu_state import MenuState
 from game_state.game_state import get_game_states_str
 from game_state.match_state import get_match_states_str
@@ -22,10 +27,158 @@ nlp_response_mappings = {
     r'.*"match-status": "IN-MENU".*': "IN-MENU",
     r'.*"in-menu-status": "SQUAD-BATTLES-OPPONENT-SELECTION".*': "IN-MENU-SQUAD-BATTLES-OPPONENT-SELECT"
 }
+# All the mappings compiled into one matcher, checked in the order above
+nlp_response_matcher = StateMatcher(nlp_response_mappings, default="UNKNOWN")
+
+# Valid values of each response field, built once rather than for every response
+GAME_STATES = get_game_states_str()
+MATCH_STATES = get_match_states_str()
+MENU_STATES = get_menu_states_str()
+GAME_STATE_NAMES = frozenset(GAME_STATES)
+MATCH_STATE_NAMES = frozenset(MATCH_STATES)
+MENU_STATE_NAMES = frozenset(MENU_STATES)
+MINIMAP_VALUES = frozenset({"YES", "NO"})
+
+# Padding such as ```json and ```
+_CODE_FENCE = re.compile(r'^```json\s*|\s*```$')
+# An `in-menu-status` field with two alternatives, e.g. "A" | "B", which is rewritten to a list
+_IN_MENU_STATUS_ALTERNATIVES = re.compile(r'("in-menu-status":\s*)"([^"]+)"\s*\|\s*"([^"]+)"')
+
+class OllamaClient:
+    """
+    A long-lived client for an Ollama vision-language model.
+
+    Requests share one pooled aiohttp session (created on first use, for the running event loop), and at most
+    `max_concurrency` of them are in flight at once, so a burst of frames queues here instead of on the model server.
+
+    `infer()` answers a prompt about a frame, or about a region of it when the prompt only needs that region (a smaller
+    image is faster to encode, upload and run). Responses are cached by the frame's perceptual hash (dHash) together
+    with the prompt and region, so a static screen such as a menu is only sent to the model once. Concurrent requests
+    for the same key share one model call.
+
+    Metrics: `requests`, `cache_hits`.
+    """
+    def __init__(self, url: str, model: str, max_concurrency: int = 2, cache_size: int = 256, timeout: float = 120.0,
+                 hash_size: int = 16):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.url = url
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.hash_size = hash_size
+
+        self.requests = 0
+        self.cache_hits = 0
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions and asyncio semaphores belong to the event loop that created them
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
+
+    async def generate(self, prompt: str, image_base64: str) -> dict:
+        """Sends a prompt and a base64 encoded image to the model and returns its response object."""
+        # Construct the payload with model, prompt and image
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "images": [image_base64]
+        }
+        session = self._get_session()
+        async with self._semaphore:
+            self.requests += 1
+            async with session.post(self.url, json=payload) as response:
+                response_text = await response.text()
+                if response.status != 200:
+                    raise Exception(f"Ollama error: {response.status}, {response_text}")
+        return decode_json(response_text)
+
+    def cache_key(self, image, prompt: str, region: Optional[tuple] = None) -> tuple:
+        """The response cache key: the perceptual hash of the frame (or region), the prompt, and the region."""
+        pixels = image.crop(region[0], region[1], region[0] + region[2], region[1] + region[3]) if region else image.rgb()
+        return difference_hash(pixels, self.hash_size), prompt, region
+
+    @staticmethod
+    def encode(image, region: Optional[tuple] = None) -> str:
+        return image.return_region_as_base64(*region) if region else image.scaled_as_base64()
+
+    async def infer(self, image, prompt: str, region: Optional[tuple] = None) -> dict:
+        """
+        Asks the model about a frame, answering from the cache when the same screen was already asked about.
+
+        Args:
+            image (ImageWrapper): The frame.
+            prompt (str): Text prompt for the model.
+            region (tuple): Optional (x, y, width, height) region. Only that region is sent to the model.
+
+        Returns:
+            dict: The model's response object.
+        """
+        key = self.cache_key(image, prompt, region)
+        if key in self._cache:
+            self.cache_hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        if key in self._pending:
+            self.cache_hits += 1
+            return await asyncio.shield(self._pending[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            image_base64 = await asyncio.to_thread(self.encode, image, region)
+            response = await self.generate(prompt, image_base64)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as argument:
+            future.set_exception(argument)
+            # Retrieve the exception, so it isn't reported as unhandled when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+        future.set_result(response)
+        self._cache[key] = response
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return response
+
+    async def infer_prompt_file(self, image, filename: str, region: Optional[tuple] = None) -> dict:
+        """`infer()` with a prompt from the prompts directory."""
+        return await self.infer(image, get_prompt(filename), region)
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._loop = None
+
+ollama_client = OllamaClient(
+    config.OLLAMA_URL,
+    config.OLLAMA_MODEL,
+    max_concurrency=config.OLLAMA_MAX_CONCURRENCY,
+    cache_size=config.OLLAMA_RESPONSE_CACHE_SIZE,
+    timeout=config.OLLAMA_TIMEOUT
+)
 
 async def infer_image_from_ollama(prompt: str, image_base64: str) -> str: 
     """
-    Function to send a prompt and image to an Ollama model for inference
+    Function to send a prompt and image to an Ollama model for inference, over the shared OllamaClient's session.
+    Prefer `ollama_client.infer()`, which also caches responses for unchanged frames.
     
     Args:
       prompt (str): Text prompt for the model
@@ -34,22 +187,7 @@ async def infer_image_from_ollama(prompt: str, image_base64: str) -> str:
     Returns:
       responseObj (str): raw response text from the model
     """
-      
-    # Construct the payload with model, prompt and image
-    payload = {
-        "model": config.OLLAMA_MODEL,
-        "prompt": prompt,
-        "stream": False,
-        "images": [f"{image_base64}"]
-    }
-
-    # Send a POST request to the Ollama URL with the payload
-    async with aiohttp.ClientSession() as session:
-        async with session.post(config.OLLAMA_URL, json=payload) as response:
-            response_text = await response.text()
-            responseObj = json.loads(response_text)
-
-    return responseObj
+    return await ollama_client.generate(prompt, image_base64)
 
 async def preprocess_json_string(json_str: str) -> str:
     """
@@ -65,16 +203,14 @@ async def preprocess_json_string(json_str: str) -> str:
     # Remove padding whitespace
     json_str = json_str.strip()
     # Remove padding such as ```json and ```
-    json_str = re.sub(r'^```json\s*|\s*```$', '', json_str).strip()
+    if json_str.startswith("```") or json_str.endswith("```"):
+        json_str = _CODE_FENCE.sub('', json_str).strip()
 
-    # Regular expression pattern to capture the `in-menu-status` field
-    pattern = r'("in-menu-status":\s*)"([^"]+)"\s*\|\s*"([^"]+)"'
-    replacement = r'\1["\2", "\3"]'
+    # Rewrite alternatives in the `in-menu-status` field to a list. Only responses with a | can have them.
+    if "|" in json_str:
+        json_str = _IN_MENU_STATUS_ALTERNATIVES.sub(r'\1["\2", "\3"]', json_str)
 
-    # Apply the regular expression substitution
-    output_string = re.sub(pattern, replacement, json_str)
-    
-    return output_string
+    return json_str
 
 async def parse_json_response(logger: logging.Logger, json_str: str) -> Optional[dict]:
     """
@@ -99,7 +235,7 @@ async def parse_json_response(logger: logging.Logger, json_str: str) -> Optional
     """
     json_str = await preprocess_json_string(json_str)
     try:
-        json_obj = json.loads(json_str)
+        json_obj = decode_json(json_str)
         json_obj_keys = {key.lower(): value for key, value in json_obj.items()}
 
         parsed_json = {}
@@ -107,8 +243,8 @@ async def parse_json_response(logger: logging.Logger, json_str: str) -> Optional
         # match-status
         if "match-status" in json_obj_keys:
             match_status = json_obj.get("match-status", "").upper()
-            if match_status not in get_game_states_str():
-                logger.warn(f"Invalid match-status: {match_status}, 'match-status' is expected to be one of: {get_game_states_str()}")
+            if match_status not in GAME_STATE_NAMES:
+                logger.warn(f"Invalid match-status: {match_status}, 'match-status' is expected to be one of: {GAME_STATES}")
             parsed_json["match-status"] = match_status
         else:
             parsed_json["match-status"] = None
@@ -116,16 +252,16 @@ async def parse_json_response(logger: logging.Logger, json_str: str) -> Optional
         # in-match-status
         if "in-match-status" in json_obj_keys:
             in_match_status = json_obj.get("in-match-status", "").upper()
-            if in_match_status and in_match_status not in get_match_states_str():
-                logger.warn(f"Invalid in-match-status: {in_match_status}, 'in-match-status' is expected to be one of: {get_match_states_str()}")
+            if in_match_status and in_match_status not in MATCH_STATE_NAMES:
+                logger.warn(f"Invalid in-match-status: {in_match_status}, 'in-match-status' is expected to be one of: {MATCH_STATES}")
             parsed_json["in-match-status"] = in_match_status
         else:
             parsed_json["in-match-status"] = None
 
         if "in-menu-status" in json_obj_keys:
             in_menu_status = json_obj.get("in-menu-status", "").upper()
-            if in_menu_status and in_menu_status not in get_menu_states_str():
-                logger.warn(f"Invalid in-menu-status: {in_menu_status}, 'in-menu-status' is expected to be one of: {get_menu_states_str()}")
+            if in_menu_status and in_menu_status not in MENU_STATE_NAMES:
+                logger.warn(f"Invalid in-menu-status: {in_menu_status}, 'in-menu-status' is expected to be one of: {MENU_STATES}")
             parsed_json["in-menu-status"] = in_menu_status
         else:
             parsed_json["in-menu-status"] = MenuState.UNKNOWN.name
@@ -133,7 +269,7 @@ async def parse_json_response(logger: logging.Logger, json_str: str) -> Optional
         # minimap
         if "minimap" in json_obj_keys:
             minimap = json_obj.get("minimap", "").upper()
-            if minimap and minimap not in {"YES", "NO"}:
+            if minimap and minimap not in MINIMAP_VALUES:
                 logger.warn(f"Invalid minimap: {minimap}, 'minimap' is expected to be one of: YES, NO")
             parsed_json["minimap"] = minimap
         else:
@@ -169,21 +305,13 @@ async def get_dict_value_nlp_fallback(logger: logging.Logger, json_obj: dict, ke
         the function attempts to extract a state from the text response based on predefined patterns. 
         If no matching pattern is found, it returns "UNKNOWN".
     """
-    def extract_state_from_text(text):
-        # Iterate through predefined patterns to find a matching state
-        for pattern, state in nlp_response_mappings.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                return state
-        # Default state if no matching pattern is found
-        return "UNKNOWN"
-    
     # If the object is empty, attempt to extract a value from the response
     if json_obj is None:
-        return extract_state_from_text(response_str)
+        return nlp_response_matcher.match(response_str)
     # TODO: Im not sure if this could happen since valid json is needed to parse the object. Nor am I confident
     # that the pattern search will work as expected. Try testing some generated edge cases.
     elif json_obj.get(key) is None:
-        return extract_state_from_text(response_str)
+        return nlp_response_matcher.match(response_str)
     
     # Return the value corresponding to the specified key in the object
     return json_obj.get(key)
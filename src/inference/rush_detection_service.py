@@ -0,0 +1,173 @@
+"""
+The Rush detection web service that `RUSH_INFERENCE_WEBSERVICE_URL` points at, so one inference box can serve several
+capture clients (replaces notebooks/old/rush-detection-service.ipynb).
+
+Usage (from src/):
+    python -m inference.rush_detection_service --port 8000 --workers 2
+
+POST /predict takes a frame as the multipart field "file" (JPEG, PNG, or a .npy array sent as application/x-npy) and
+returns the detections in the `parse_rush_model_results` JSON format. GET /metrics reports queue depth and batch
+latency, and GET /health whether the service is up.
+"""
+import argparse
+import asyncio
+import io
+import logging
+import time
+from collections import deque
+from typing import Callable, Sequence
+
+import cv2
+import numpy as np
+from aiohttp import web
+
+from inference.batching_detector import BatchingObjectDetector
+from inference.rush_inference import parse_rush_model_results
+from utilities import config
+
+logger = logging.getLogger(__name__)
+
+NPY_CONTENT_TYPE = "application/x-npy"
+
+def decode_upload(contents: bytes, content_type: str) -> np.ndarray:
+    """Decodes an uploaded frame into an RGB array."""
+    if content_type == NPY_CONTENT_TYPE:
+        array = np.load(io.BytesIO(contents), allow_pickle=False)
+        if array.dtype != np.uint8 or array.ndim != 3 or array.shape[-1] not in (3, 4):
+            raise ValueError(f"Expected an (H, W, 3) uint8 array, got {array.dtype} {array.shape}")
+        return array[..., :3]
+    bgr = cv2.imdecode(np.frombuffer(contents, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise ValueError(f"Could not decode the uploaded {content_type or 'file'} as an image")
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+def _latency_stats(samples) -> dict:
+    samples = np.fromiter(samples, dtype=np.float64)
+    if not len(samples):
+        return {}
+    return {"mean": float(samples.mean()), "p95": float(np.percentile(samples, 95)), "max": float(samples.max())}
+
+class RushDetectionService:
+    """
+    Serves Rush detections from a pool of model workers.
+
+    Each worker is a BatchingObjectDetector around its own model replica, so concurrent requests from several clients
+    are batched into one `model.predict` call per worker, and the workers' batches run in parallel on their own threads.
+    A request goes to the worker with the fewest waiting and running images.
+
+    Metrics: `metrics()`, also served as JSON on GET /metrics.
+    """
+    def __init__(self, workers: Sequence[BatchingObjectDetector], parse_results_delegate: Callable = parse_rush_model_results):
+        if not workers:
+            raise ValueError("The rush detection service needs at least one worker")
+        self.workers = list(workers)
+        self.parse_results_delegate = parse_results_delegate
+        self.requests = 0
+        self.errors = 0
+        self.request_seconds = deque(maxlen=1024)
+
+    @classmethod
+    def from_config(cls, workers: int = None, max_batch_size: int = None, max_wait_ms: float = None):
+        """Loads and warms up one Rush model replica per worker, on the configured YOLO backend."""
+        from inference.model_registry import create_yolo_detector
+        workers = workers or config.RUSH_SERVICE_WORKERS
+        detectors = []
+        for index in range(workers):
+            detector = create_yolo_detector(config.HF_RUSH_DETECTION_PATH, config.HF_RUSH_DETECTION_FILENAME)
+            detector.warmup()
+            logger.info(f"Rush detection worker {index + 1} of {workers} is ready.")
+            detectors.append(BatchingObjectDetector(
+                detector,
+                max_batch_size=max_batch_size or config.RUSH_SERVICE_MAX_BATCH_SIZE,
+                max_wait_ms=max_wait_ms if max_wait_ms is not None else config.RUSH_SERVICE_MAX_WAIT_MS
+            ))
+        return cls(detectors)
+
+    def _pick_worker(self) -> BatchingObjectDetector:
+        return min(self.workers, key=lambda worker: worker.queue_depth() + worker.in_flight)
+
+    async def detect(self, image: np.ndarray):
+        return await self._pick_worker().detect_objects(image, self.parse_results_delegate)
+
+    def metrics(self) -> dict:
+        workers = [{
+            "queue_depth": worker.queue_depth(),
+            "in_flight": worker.in_flight,
+            "batches_run": worker.batches_run,
+            "images_processed": worker.images_processed,
+            "mean_batch_size": worker.mean_batch_size(),
+            "batch_seconds": _latency_stats(worker.batch_seconds)
+        } for worker in self.workers]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "queue_depth": sum(worker["queue_depth"] for worker in workers),
+            "in_flight": sum(worker["in_flight"] for worker in workers),
+            "batch_seconds": _latency_stats(seconds for worker in self.workers for seconds in worker.batch_seconds),
+            "request_seconds": _latency_stats(self.request_seconds),
+            "workers": workers
+        }
+
+    async def handle_predict(self, request: web.Request) -> web.Response:
+        before_request = time.perf_counter()
+        self.requests += 1
+        try:
+            field = (await request.post()).get("file")
+            if not isinstance(field, web.FileField):
+                raise ValueError("Expected the frame as the multipart field 'file'")
+            image = await asyncio.to_thread(decode_upload, field.file.read(), field.content_type)
+        except ValueError as argument:
+            self.errors += 1
+            return web.json_response({"error": str(argument)}, status=400)
+
+        try:
+            detections = await self.detect(image)
+        except Exception as argument:
+            self.errors += 1
+            logger.error(f"Rush detection failed: {argument}")
+            return web.json_response({"error": str(argument)}, status=500)
+
+        self.request_seconds.append(time.perf_counter() - before_request)
+        return web.json_response(detections)
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.json_response(self.metrics())
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "workers": len(self.workers)})
+
+    async def close(self):
+        for worker in self.workers:
+            await worker.close()
+
+    def create_app(self, max_upload_mb: float = None) -> web.Application:
+        """
+        Builds the aiohttp application. Uploads of up to `max_upload_mb` (config.RUSH_SERVICE_MAX_UPLOAD_MB by default)
+        are accepted; aiohttp's 1 MiB default is smaller than a raw or PNG frame.
+        """
+        max_upload_mb = max_upload_mb if max_upload_mb is not None else config.RUSH_SERVICE_MAX_UPLOAD_MB
+        app = web.Application(client_max_size=int(max_upload_mb * 2**20))
+        app.router.add_post("/predict", self.handle_predict)
+        # The route the notebook version of the service used
+        app.router.add_post("/detect", self.handle_predict)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.router.add_get("/health", self.handle_health)
+        app.on_cleanup.append(lambda app: self.close())
+        return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=config.RUSH_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=config.RUSH_SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=config.RUSH_SERVICE_WORKERS)
+    parser.add_argument("--max-batch-size", type=int, default=config.RUSH_SERVICE_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=config.RUSH_SERVICE_MAX_WAIT_MS)
+    parser.add_argument("--max-upload-mb", type=float, default=config.RUSH_SERVICE_MAX_UPLOAD_MB)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    service = RushDetectionService.from_config(args.workers, args.max_batch_size, args.max_wait_ms)
+    web.run_app(service.create_app(args.max_upload_mb), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
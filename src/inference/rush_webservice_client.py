@@ -0,0 +1,218 @@
+import asyncio
+import importlib.util
+import io
+import logging
+import time
+from collections import deque
+from typing import Optional, Sequence
+
+import cv2
+import httpx
+import numpy as np
+
+from inference.detection_set import DetectionSet
+from utilities import config
+
+logger = logging.getLogger(__name__)
+
+RAW = "raw"
+PNG = "png"
+JPEG_PREFIX = "jpeg-"
+AUTO = "auto"
+
+def _content_type(encoding: str) -> tuple:
+    if encoding == RAW:
+        return "frame.npy", "application/x-npy"
+    if encoding == PNG:
+        return "frame.png", "image/png"
+    return "frame.jpg", "image/jpeg"
+
+def encode_frame(rgb: np.ndarray, encoding: str) -> bytes:
+    """
+    Encodes an RGB frame for upload.
+
+    "raw" is the array in .npy format (no compression, read with `np.load`), "png" is lossless, and "jpeg-<quality>"
+    (e.g. "jpeg-85") is lossy. PNG and JPEG can be opened with PIL, as the original service does.
+    """
+    if encoding == RAW:
+        buffer = io.BytesIO()
+        np.save(buffer, np.ascontiguousarray(rgb), allow_pickle=False)
+        return buffer.getvalue()
+    bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+    if encoding == PNG:
+        # Fastest zlib level: frames are uploaded over a local link, where encode time matters more than size
+        success, encoded = cv2.imencode(".png", bgr, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+    elif encoding.startswith(JPEG_PREFIX):
+        quality = int(encoding[len(JPEG_PREFIX):])
+        success, encoded = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    else:
+        raise ValueError(f"Unsupported frame encoding: {encoding}, expected {RAW}, {PNG} or {JPEG_PREFIX}<quality>")
+    if not success:
+        raise ValueError(f"Could not encode the frame as {encoding}")
+    return encoded.tobytes()
+
+class _EncodingCost:
+    __slots__ = ("encode_seconds", "request_seconds", "size_bytes", "last_used")
+
+    def __init__(self):
+        self.encode_seconds = None
+        self.request_seconds = None
+        self.size_bytes = None
+        self.last_used = 0
+
+    def total(self) -> float:
+        return self.encode_seconds + self.request_seconds
+
+class RushWebserviceClient:
+    """
+    Sends frames to the remote Rush detection service over a long-lived, pooled HTTP connection.
+
+    The underlying httpx client is created on first use and kept for the life of the event loop, so connections
+    are reused (HTTP keep-alive, or HTTP/2 when the h2 package is installed and the service supports it) instead of
+    being opened for every frame. Every request has its own timeout.
+
+    Frames are encoded on a worker thread. With `encoding="auto"`, the client picks whichever of `encodings` has the
+    lowest measured cost: the exponentially weighted average of its encode time plus its request time, which covers
+    both the upload over the link and the service's decoding. Each candidate is tried once up front, and the least
+    recently used one is tried again every `probe_interval` requests, so the choice follows changes in the link.
+    A failed request charges its encoding the full request timeout, so an encoding the service rejects is only
+    retried when it is probed.
+    The frames are uploaded as the multipart field "file", like the original service expects.
+
+    Metrics: `requests`, `failures`, `current_encoding()`, `latency_stats()`.
+    """
+    def __init__(self, url: str, timeout: float = 5.0, pool_size: int = 4, encoding: str = AUTO,
+                 encodings: Sequence[str] = (PNG, "jpeg-95", "jpeg-85"), probe_interval: int = 50,
+                 smoothing: float = 0.2, latency_window: int = 500):
+        self.url = url
+        self.timeout = httpx.Timeout(timeout)
+        self.failure_penalty = timeout
+        self.limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=60.0)
+        self.http2 = importlib.util.find_spec("h2") is not None
+        self.encoding = encoding
+        self.encodings = tuple(encodings) if encoding == AUTO else (encoding,)
+        if not self.encodings:
+            raise ValueError("At least one frame encoding is needed")
+        self.probe_interval = probe_interval
+        self.smoothing = smoothing
+
+        self.requests = 0
+        self.failures = 0
+        self._costs = {name: _EncodingCost() for name in self.encodings}
+        self._latencies = deque(maxlen=latency_window)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop = None
+
+    def _average(self, current, sample: float) -> float:
+        return sample if current is None else current + self.smoothing * (sample - current)
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # An httpx client's connections belong to the event loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            await self._close_stale_client()
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2)
+            self._loop = loop
+        return self._client
+
+    async def _close_stale_client(self):
+        """Closes the client of a previous event loop, on that loop if it is still running."""
+        client, loop = self._client, self._loop
+        self._client = None
+        self._loop = None
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        try:
+            await client.aclose()
+        except Exception as error:
+            # The transports of a closed loop can't be shut down cleanly, but the client is closed regardless
+            logger.debug(f"Error closing the previous webservice client: {error}")
+
+    def current_encoding(self) -> str:
+        """The encoding the next frame would be sent with, outside of probing."""
+        measured = [(cost.total(), name) for name, cost in self._costs.items() if cost.request_seconds is not None]
+        return min(measured)[1] if measured else self.encodings[0]
+
+    def _choose_encoding(self) -> str:
+        for name, cost in self._costs.items():
+            if cost.request_seconds is None:
+                return name
+        if len(self.encodings) > 1 and self.probe_interval and self.requests % self.probe_interval == 0:
+            return min(self._costs, key=lambda name: self._costs[name].last_used)
+        return self.current_encoding()
+
+    def _record_failure(self, cost: _EncodingCost, encode_seconds: float):
+        self.failures += 1
+        cost.encode_seconds = self._average(cost.encode_seconds, encode_seconds)
+        cost.request_seconds = self._average(cost.request_seconds, self.failure_penalty)
+
+    def latency_stats(self) -> dict:
+        """Request latency over the recent window, in seconds, and the measured cost of each encoding."""
+        latencies = np.fromiter(self._latencies, dtype=np.float64)
+        stats = {"requests": self.requests, "failures": self.failures, "encoding": self.current_encoding()}
+        if len(latencies):
+            stats.update(mean=float(latencies.mean()), p50=float(np.percentile(latencies, 50)),
+                         p95=float(np.percentile(latencies, 95)), max=float(latencies.max()))
+        stats["encodings"] = {
+            name: {"encode_seconds": cost.encode_seconds, "request_seconds": cost.request_seconds, "size_bytes": cost.size_bytes}
+            for name, cost in self._costs.items()
+        }
+        return stats
+
+    async def detect(self, image) -> DetectionSet:
+        """
+        Sends the frame to the service and returns its detections.
+
+        Args:
+            image (ImageWrapper): The frame.
+
+        Returns:
+            DetectionSet: The detections, parsed from the service's JSON.
+        """
+        encoding = self._choose_encoding()
+        cost = self._costs[encoding]
+
+        before_encode = time.perf_counter()
+        # The conversion to RGB runs on the worker thread along with the encoding
+        payload = await asyncio.to_thread(lambda: encode_frame(image.rgb(), encoding))
+        client = await self._get_client()
+        before_request = time.perf_counter()
+        filename, content_type = _content_type(encoding)
+        try:
+            response = await client.post(self.url, files={"file": (filename, payload, content_type)})
+        except httpx.HTTPError:
+            self._record_failure(cost, before_request - before_encode)
+            raise
+        finally:
+            self.requests += 1
+            cost.last_used = self.requests
+        after_request = time.perf_counter()
+
+        if response.status_code != 200:
+            self._record_failure(cost, before_request - before_encode)
+            raise Exception(f"Web service error: {response.status_code}, {response.text}")
+
+        cost.encode_seconds = self._average(cost.encode_seconds, before_request - before_encode)
+        cost.request_seconds = self._average(cost.request_seconds, after_request - before_request)
+        cost.size_bytes = self._average(cost.size_bytes, len(payload))
+        self._latencies.append(after_request - before_encode)
+        logger.debug(f"Rush webservice request took {after_request - before_encode:.4f} seconds "
+                     f"({encoding}, {len(payload)} bytes, encoded in {before_request - before_encode:.4f} seconds)")
+        return DetectionSet.from_dicts(response.json())
+
+    async def aclose(self):
+        """Closes the pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+rush_webservice_client = RushWebserviceClient(
+    config.RUSH_INFERENCE_WEBSERVICE_URL,
+    timeout=config.RUSH_INFERENCE_WEBSERVICE_TIMEOUT,
+    pool_size=config.RUSH_INFERENCE_WEBSERVICE_POOL_SIZE,
+    encoding=config.RUSH_INFERENCE_WEBSERVICE_ENCODING,
+    encodings=config.RUSH_INFERENCE_WEBSERVICE_ENCODINGS
+)
@@ -18,19 +18,29 @@ class TacticalVisionNet(nn.Module):
     1. possession: 3-class classification (0: User, 1: Opponent, 2: Contested/Loose)
     2. zone: 3-class classification (0: Defensive, 1: Middle, 2: Attacking Third)
     3. ball: 2-class continuous regression (pitch_x, pitch_y) in range [0, 1]
+
+    With shared_backbone=True, both images go through a single ResNet18 as one batch of 2 x Batch images, which halves
+    the backbone weights and runs one larger convolution pass instead of two. It is a different model from the
+    dual-branch one, and needs training as such.
     """
-    def __init__(self, pretrained=False):
+    def __init__(self, pretrained=False, shared_backbone=False):
         super().__init__()
+        self.shared_backbone = shared_backbone
 
         # Determine weights parameter based on pretrained flag and torchvision compatibility
         weights = models.ResNet18_Weights.DEFAULT if pretrained else None
 
-        # Dual-branch feature extractors
-        self.main_backbone = models.resnet18(weights=weights)
-        self.main_backbone.fc = nn.Identity()
+        if shared_backbone:
+            # One feature extractor for both images
+            self.backbone = models.resnet18(weights=weights)
+            self.backbone.fc = nn.Identity()
+        else:
+            # Dual-branch feature extractors
+            self.main_backbone = models.resnet18(weights=weights)
+            self.main_backbone.fc = nn.Identity()
 
-        self.minimap_backbone = models.resnet18(weights=weights)
-        self.minimap_backbone.fc = nn.Identity()
+            self.minimap_backbone = models.resnet18(weights=weights)
+            self.minimap_backbone.fc = nn.Identity()
 
         # Fusion layer
         self.fusion = nn.Sequential(
@@ -62,8 +72,12 @@ class TacticalVisionNet(nn.Module):
                 'ball': Tensor of shape (Batch, 2) - normalized ball coordinates [0, 1]
             }
         """
-        main_feats = self.main_backbone(main_image)       # (Batch, 512)
-        minimap_feats = self.minimap_backbone(minimap_image) # (Batch, 512)
+        if self.shared_backbone:
+            feats = self.backbone(torch.cat([main_image, minimap_image], dim=0)) # (2 x Batch, 512)
+            main_feats, minimap_feats = feats.split(main_image.shape[0], dim=0)
+        else:
+            main_feats = self.main_backbone(main_image)       # (Batch, 512)
+            minimap_feats = self.minimap_backbone(minimap_image) # (Batch, 512)
 
         # Concatenate features along dimension 1
         fused_feats = torch.cat([main_feats, minimap_feats], dim=1) # (Batch, 1024)
@@ -0,0 +1,158 @@
+"""
+Inference runtime for TacticalVisionNet: the trained network wrapped for frame-rate inference on the CPU.
+"""
+import inspect
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import torch
+from torch import nn
+
+from inference.tactical_vision_net import TacticalVisionNet
+
+logger = logging.getLogger(__name__)
+
+# The normalization the network was trained with (notebooks/03_train_tactical_vision.ipynb)
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+INPUT_SIZE = 224
+INPUT_NAMES = ("main_image", "minimap_image")
+OUTPUT_NAMES = ("possession", "zone", "ball")
+
+class TacticalVisionRuntime:
+    """
+    Runs a TacticalVisionNet (or a TorchScript export of one) for inference.
+
+    Every call runs under `torch.inference_mode()`. The model and its inputs use the channels_last memory format,
+    which is the layout the CPU convolution kernels are fastest with, and the layout uint8 crops already have: an
+    (B, 224, 224, 3) crop array becomes an NCHW channels_last tensor without copying, and a single fused multiply-add
+    converts it to the normalized float input.
+
+    With `quantize=True`, the Linear layers (fusion and task heads) are dynamically quantized to INT8. Dynamic
+    quantization does not apply to the convolutions, so the ResNet backbones stay in float32.
+
+    Metrics: `calls`, `latency_stats()`.
+    """
+    def __init__(self, model: nn.Module, device: str = "cpu", channels_last: bool = True, quantize: bool = False,
+                 latency_window: int = 500):
+        self.device = torch.device(device)
+        self.channels_last = channels_last
+        self.memory_format = torch.channels_last if channels_last else torch.contiguous_format
+
+        model = model.eval()
+        if quantize:
+            if self.device.type != "cpu":
+                raise ValueError("Dynamic INT8 quantization only runs on the CPU")
+            model = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        if isinstance(model, torch.jit.ScriptModule):
+            model = model.to(self.device)
+        else:
+            model = model.to(self.device, memory_format=self.memory_format)
+        self.model = model
+
+        # x / 255 then (x - mean) / std, folded into a single scale and offset per channel
+        std = torch.tensor(IMAGENET_STD, dtype=torch.float32, device=self.device).view(1, 3, 1, 1)
+        mean = torch.tensor(IMAGENET_MEAN, dtype=torch.float32, device=self.device).view(1, 3, 1, 1)
+        self._scale = 1.0 / (255.0 * std)
+        self._offset = mean / std
+
+        self.calls = 0
+        self._latencies = deque(maxlen=latency_window)
+
+    @classmethod
+    def from_checkpoint(cls, path: str, shared_backbone: bool = False, **kwargs):
+        """Loads a TacticalVisionNet state dict saved with `torch.save(model.state_dict(), path)`."""
+        model = TacticalVisionNet(pretrained=False, shared_backbone=shared_backbone)
+        model.load_state_dict(torch.load(path, map_location="cpu", weights_only=True))
+        return cls(model, **kwargs)
+
+    @classmethod
+    def from_torchscript(cls, path: str, **kwargs):
+        """Loads a model saved with `export_torchscript`."""
+        return cls(torch.jit.load(path, map_location="cpu"), **kwargs)
+
+    def preprocess(self, crops) -> torch.Tensor:
+        """
+        Converts uint8 RGB crops, (224, 224, 3) or (B, 224, 224, 3), to the normalized float input tensor.
+        """
+        crops = np.asarray(crops)
+        if crops.ndim == 3:
+            crops = crops[None]
+        if crops.dtype != np.uint8 or crops.shape[1:] != (INPUT_SIZE, INPUT_SIZE, 3):
+            raise ValueError(f"Expected uint8 crops of shape (B, {INPUT_SIZE}, {INPUT_SIZE}, 3), got {crops.dtype} {crops.shape}")
+        # NHWC memory seen as NCHW is channels_last, so permuting doesn't copy
+        tensor = torch.from_numpy(np.ascontiguousarray(crops)).to(self.device).permute(0, 3, 1, 2)
+        tensor = tensor.to(torch.float32, memory_format=self.memory_format)
+        return tensor.mul_(self._scale).sub_(self._offset)
+
+    def forward(self, main_image: torch.Tensor, minimap_image: torch.Tensor) -> dict:
+        """Runs already normalized input tensors through the model."""
+        with torch.inference_mode():
+            return self.model(main_image, minimap_image)
+
+    def predict(self, main_crops, minimap_crops) -> dict:
+        """
+        Predicts possession, zone and ball position from uint8 crops of the main view and the minimap.
+
+        Args:
+            main_crops (np.ndarray): (224, 224, 3) or (B, 224, 224, 3) uint8 RGB crops of the main view.
+            minimap_crops (np.ndarray): Crops of the minimap, in the same shape.
+
+        Returns:
+            dict: {'possession': (B, 3) logits, 'zone': (B, 3) logits, 'ball': (B, 2) coordinates in [0, 1]}
+            as float32 numpy arrays.
+        """
+        before_call = time.perf_counter()
+        with torch.inference_mode():
+            outputs = self.model(self.preprocess(main_crops), self.preprocess(minimap_crops))
+            outputs = {name: value.float().cpu().numpy() for name, value in outputs.items()}
+        self.calls += 1
+        self._latencies.append(time.perf_counter() - before_call)
+        return outputs
+
+    def warmup(self, batch_size: int = 1):
+        """Runs one prediction on blank crops, so the first frame doesn't pay for kernel selection."""
+        blank = np.zeros((batch_size, INPUT_SIZE, INPUT_SIZE, 3), dtype=np.uint8)
+        with torch.inference_mode():
+            self.model(self.preprocess(blank), self.preprocess(blank))
+
+    def latency_stats(self) -> dict:
+        """Latency of the recent `predict()` calls in seconds, preprocessing included."""
+        latencies = np.fromiter(self._latencies, dtype=np.float64)
+        if not len(latencies):
+            return {"calls": self.calls}
+        return {"calls": self.calls, "mean": float(latencies.mean()), "p50": float(np.percentile(latencies, 50)),
+                "p95": float(np.percentile(latencies, 95)), "max": float(latencies.max())}
+
+    def _example_inputs(self, batch_size: int = 1) -> tuple:
+        blank = np.zeros((batch_size, INPUT_SIZE, INPUT_SIZE, 3), dtype=np.uint8)
+        return self.preprocess(blank), self.preprocess(blank)
+
+    def export_torchscript(self, path: str) -> str:
+        """Traces the model (quantized layers included) and saves it as TorchScript, loadable without this module."""
+        with torch.inference_mode(False), torch.no_grad():
+            # The model returns a dict, which tracing only accepts in non-strict mode
+            traced = torch.jit.trace(self.model, self._example_inputs(), strict=False)
+        traced.save(path)
+        logger.info(f"Saved TorchScript model to {path}")
+        return path
+
+    def export_onnx(self, path: str, opset_version: Optional[int] = 17) -> str:
+        """Exports the float model to ONNX with a dynamic batch size. Needs the onnx package."""
+        if isinstance(self.model, torch.jit.ScriptModule):
+            raise ValueError("Export to ONNX from the original model, not a TorchScript export")
+        dynamic_axes = {name: {0: "batch"} for name in INPUT_NAMES + OUTPUT_NAMES}
+        options = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            # Newer torch defaults to the dynamo exporter, which needs onnxscript. The TorchScript-based exporter
+            # handles the dict output and dynamic batch axis, and is the only one older torch has.
+            options["dynamo"] = False
+        with torch.no_grad():
+            torch.onnx.export(self.model, self._example_inputs(), path, input_names=list(INPUT_NAMES),
+                              output_names=list(OUTPUT_NAMES), dynamic_axes=dynamic_axes, opset_version=opset_version,
+                              **options)
+        logger.info(f"Saved ONNX model to {path}")
+        return path
@@ -1,21 +1,110 @@
 import asyncio
+import hashlib
+import os
+import shutil
 import utilities.config as config
 import logging
 import numpy as np
-import torch
 
 from PIL import Image as PILImage
-from ultralytics import YOLO
 from huggingface_hub import hf_hub_download
 
 logger = logging.getLogger(__name__)
 
+TORCH = "torch"
+ONNX = "onnx"
+OPENVINO = "openvino"
+BACKENDS = (TORCH, ONNX, OPENVINO)
+
+# torch and ultralytics take seconds to import, so they are imported on first use rather than at startup
+
+def default_device(backend: str = TORCH) -> str:
+    # Exported backends run on the CPU; they exist for the GPU-less inference boxes
+    if backend != TORCH:
+        return "cpu"
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def export_directory(weights_path: str, export_dir: str = None) -> str:
+    """
+    The project cache directory for exports of `weights_path` (config.MODEL_EXPORT_DIR by default). Weights downloaded
+    from HuggingFace are symlinks into its blob store, so keying on the resolved path gives each revision its own exports.
+    """
+    stem = os.path.splitext(os.path.basename(weights_path))[0]
+    digest = hashlib.sha1(os.path.realpath(weights_path).encode()).hexdigest()[:12]
+    return os.path.join(export_dir or config.MODEL_EXPORT_DIR, f"{stem}-{digest}")
+
+def exported_model_path(weights_path: str, backend: str, quantize: bool = False, export_dir: str = None) -> str:
+    """Where the export of `weights_path` for a backend is written, inside its export directory."""
+    stem = os.path.join(export_directory(weights_path, export_dir), os.path.splitext(os.path.basename(weights_path))[0])
+    if backend == ONNX:
+        return f"{stem}-int8.onnx" if quantize else f"{stem}.onnx"
+    return f"{stem}_openvino_model"
+
+def export_model(weights_path: str, backend: str, quantize: bool = False, image_size: int = 640, export_dir: str = None) -> str:
+    """
+    Exports YOLO weights for an ONNX Runtime or OpenVINO backend, reusing a previous export if there is one.
+    INT8 quantization is dynamic (weights only, no calibration data), applied to the ONNX graph with ONNX Runtime.
+
+    ultralytics writes exports next to the weights it loads, so the weights are linked into the export directory first
+    and the HuggingFace cache is left untouched.
+
+    Returns:
+        str: Path of the exported model, loadable with `YOLO(path, task="detect")`.
+    """
+    if backend not in (ONNX, OPENVINO):
+        raise ValueError(f"Unsupported export backend: {backend}, expected {ONNX} or {OPENVINO}")
+    if quantize and backend != ONNX:
+        raise ValueError("INT8 quantization is only supported for the onnx backend")
+
+    export_path = exported_model_path(weights_path, backend, quantize, export_dir)
+    if os.path.exists(export_path):
+        return export_path
+
+    directory = export_directory(weights_path, export_dir)
+    os.makedirs(directory, exist_ok=True)
+    local_weights = os.path.join(directory, os.path.basename(weights_path))
+    if not os.path.exists(local_weights):
+        try:
+            os.symlink(os.path.realpath(weights_path), local_weights)
+        except OSError:
+            # Symlinks need extra privileges on Windows
+            shutil.copyfile(weights_path, local_weights)
+
+    logger.info(f"Exporting {weights_path} for {backend}{' (INT8)' if quantize else ''}. This only happens once.")
+    from ultralytics import YOLO
+    exported = YOLO(local_weights).export(format=backend, imgsz=image_size)
+    if quantize:
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError as error:
+            raise ImportError("INT8 quantization requires onnxruntime to be installed") from error
+        quantize_dynamic(exported, export_path, weight_type=QuantType.QUInt8)
+        return export_path
+    return exported
+
+def model_size_bytes(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path)
+
+def to_rgb_array(image) -> np.ndarray:
+    """Returns an RGB array for an ImageWrapper, PIL image or RGB(A) array, converting only when needed."""
+    if isinstance(image, np.ndarray):
+        return image[..., :3] if image.ndim == 3 and image.shape[-1] == 4 else image
+    if isinstance(image, PILImage.Image):
+        # Ensure the image is in RGB mode
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return np.asarray(image)
+    return image.rgb()
+
 class YoloObjectDetector:
     """
     A wrapper class for running YOLO model inference to detect objects and bounding boxes.
     """
 
-    def __init__(self, modelpath, filename, conf_threshold=0.25):
+    def __init__(self, modelpath, filename, conf_threshold=0.25, backend=TORCH, quantize=False):
         """
         Initialize the YOLO object detector.
 
@@ -23,49 +112,68 @@ class YoloObjectDetector:
             modelpath (str): Path to the model on HuggingFace Hub.
             filename (str): Model file name.
             conf_threshold (float): Confidence threshold for detections.
+            backend (str): "torch", or "onnx"/"openvino" to run an exported graph on the CPU with ONNX Runtime or OpenVINO.
+            quantize (bool): Use an INT8 dynamically quantized graph (onnx backend only).
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported YOLO backend: {backend}, expected one of: {', '.join(BACKENDS)}")
+        from ultralytics import YOLO
+        self.backend = backend
         self.modelpath = hf_hub_download(modelpath, filename)
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model = YOLO(self.modelpath).to(device)
+        device = default_device(backend)
+        if backend == TORCH:
+            self.model = YOLO(self.modelpath).to(device)
+        else:
+            # Exported models run through ultralytics as well, so pre/post-processing (letterboxing, NMS)
+            # and the Results objects are the same as the torch path, and the result parsers work unchanged.
+            self.modelpath = export_model(self.modelpath, backend, quantize)
+            self.model = YOLO(self.modelpath, task="detect")
         logger.debug(f"Using device: {device}")
         self.conf_threshold = conf_threshold
         logger.info(f"YOLO model loaded from {self.modelpath}")
 
-    async def detect_objects(self, image: PILImage, parse_results_delegate=None):
+    def warmup(self, image_size=(640, 640)):
+        """Runs one inference on a blank image, so the first real frame doesn't pay for lazy initialisation."""
+        self.model.predict(source=np.zeros((*image_size, 3), dtype=np.uint8), conf=self.conf_threshold, verbose=False)
+
+    def memory_bytes(self) -> int:
+        """Size of the model's parameters and buffers (the exported model's size for exported backends)."""
+        if self.backend != TORCH:
+            return model_size_bytes(self.modelpath)
+        module = self.model.model
+        return sum(tensor.numel() * tensor.element_size() for tensor in list(module.parameters()) + list(module.buffers()))
+
+    async def detect_objects(self, image, parse_results_delegate=None):
         """
         Run the YOLO model to detect objects in the input image.
 
         Args:
-            image_wrapper (PILImage): An instance of Pillow.Image
+            image (ImageWrapper | PILImage | np.ndarray): The image. An ImageWrapper shares its cached RGB view,
+                so no conversion is repeated for a frame that was already converted by another step.
 
         Returns:
             List[dict]: List of detections with class names, confidence scores, and bounding boxes.
         """
         logger.debug("Starting object detection on the provided image.")
-
-        # Ensure the image is in RGB mode
-        if image.mode == "RGBA" or image.mode == "P":
-            image = image.convert("RGB")
-
-        # Convert the image to a NumPy array
-        image_array = np.array(image) 
+        image_array = to_rgb_array(image)
 
         # Run prediction in an executor thread to make it async-compatible
         results = await asyncio.to_thread(
             self.model.predict,
             source=image_array,
-            conf=self.conf_threshold
+            conf=self.conf_threshold,
+            verbose=False
         )
 
         # If a delegate is provided, use it to process detections
         if parse_results_delegate:
             detections = parse_results_delegate(results)
         else:
-            detections = self._parse_results(results)
+            detections = self.parse_results(results)
         
         return detections
 
-    def _parse_results(self, results):
+    def parse_results(self, results):
         """
         Parse YOLO results into a user-friendly format.
 
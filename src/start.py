@@ -2,53 +2,92 @@ import asyncio
 import datetime
 import logging
 import signal
+import sys
 
+# Imported first, so the startup report measures every import that follows
+from utilities.monitoring import startup_report
 from controllers.game_strategy_controller import GameStrategyController
 from utilities.shared_thread_resources import SharedProgramData
 from handlers.capture_image_handler import capture_image_handler
 from handlers.game_control_handler import controller_input_handler
 from handlers.infer_image_handler import infer_image_handler
+from inference.rush_webservice_client import rush_webservice_client
 
-from utilities.macos_app import RunningApplication
+if sys.platform == "darwin":
+    from utilities.macos_app import RunningApplication
+else:
+    from utilities.linux_app import RunningApplication
+from utilities.replay_app import ReplayApplication
 from controllers.game_flow_controller import GameFlowController
 import utilities.config as config
 
-# Configure logging for the application
-# Create a unique filename with a timestamp
-timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-log_filename = f'start_{timestamp}.log'
-logging.basicConfig(level=config.LOG_LEVEL, format='%(asctime)s - %(levelname)s - %(message)s', filename=log_filename, filemode='w')
-
-# Instantiate shared program data
-shared_data = SharedProgramData()
-
-# Begin Program
-app = RunningApplication(config.APP_NAME)
-game_flow = GameFlowController() 
-game_strategy = GameStrategyController()
-
-# Define sigint/sigterm handler
-def exit_handler(signum, frame):
-    signal_names = {signal.SIGINT: "SIGINT", signal.SIGTERM: "SIGTERM", signal.SIGSTOP: "SIGSTOP"}
-    logging.critical(f"[{signal_names[signum]}] received. Application attempting to close gracefully.")
-    
-    # During exit these keys can become stuck.
-    # The workaround is to press the stuck keys during an exit event.
-    game_flow.io.press(game_flow.io.L2)
-    game_flow.io.press(game_flow.io.Lstick.Up)
-    game_flow.io.press(game_flow.io.Lstick.Left)
-    shared_data.exit_event.set()
-    
-# Activate the handlers
-signal.signal(signal.SIGINT, exit_handler)
-signal.signal(signal.SIGTERM, exit_handler)
-
-async def main():
-    await asyncio.gather(
-        capture_image_handler(app, shared_data),
-        infer_image_handler(game_strategy, shared_data),
-        controller_input_handler(app, game_flow, game_strategy, shared_data)
-    )
+# Spawned worker processes (INFERENCE_WORKER_PROCESSES) import this module again as __mp_main__, so everything with
+# side effects (the log file, the game window, the signal handlers) happens in main(), not at import.
+
+def configure_logging():
+    # Create a unique filename with a timestamp
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_filename = f'start_{timestamp}.log'
+    logging.basicConfig(level=config.LOG_LEVEL, format='%(asctime)s - %(levelname)s - %(message)s', filename=log_filename, filemode='w')
+
+def create_app():
+    if config.CAPTURE_IMAGE_USE_STATIC_IMAGE:
+        # Replay recorded frames instead of capturing the game window
+        return ReplayApplication.from_path(
+            config.CAPTURE_IMAGE_STATIC_IMAGE_PATH,
+            pacing=config.CAPTURE_REPLAY_PACING,
+            fps=config.CAPTURE_REPLAY_FPS,
+            loop=config.CAPTURE_REPLAY_LOOP,
+            preload=config.CAPTURE_REPLAY_PRELOAD
+        )
+    return RunningApplication(config.APP_NAME)
+
+def install_exit_handlers(game_flow, shared_data):
+    # Define sigint/sigterm handler
+    def exit_handler(signum, frame):
+        signal_names = {signal.SIGINT: "SIGINT", signal.SIGTERM: "SIGTERM", signal.SIGSTOP: "SIGSTOP"}
+        logging.critical(f"[{signal_names[signum]}] received. Application attempting to close gracefully.")
+
+        # During exit these keys can become stuck.
+        # The workaround is to press the stuck keys during an exit event.
+        game_flow.io.press(game_flow.io.L2)
+        game_flow.io.press(game_flow.io.Lstick.Up)
+        game_flow.io.press(game_flow.io.Lstick.Left)
+        shared_data.exit_event.set()
+
+    # Activate the handlers
+    signal.signal(signal.SIGINT, exit_handler)
+    signal.signal(signal.SIGTERM, exit_handler)
+
+async def run(app, game_flow, game_strategy, shared_data):
+    # Capture starts straight away, while the models load. The inference handler waits for them.
+    shared_data.start_model_loading()
+    logging.info(startup_report.report())
+    try:
+        await asyncio.gather(
+            capture_image_handler(app, shared_data),
+            infer_image_handler(game_strategy, shared_data),
+            controller_input_handler(app, game_flow, game_strategy, shared_data)
+        )
+    finally:
+        # Close the pooled web service connections while their event loop is still running
+        await rush_webservice_client.aclose()
+
+def main():
+    configure_logging()
+    startup_report.mark("imports")
+
+    # Instantiate shared program data. Models are loaded in the background once the event loop is running.
+    shared_data = SharedProgramData()
+
+    # Begin Program
+    app = create_app()
+    game_flow = GameFlowController()
+    game_strategy = GameStrategyController()
+    startup_report.mark("initialisation")
+
+    install_exit_handlers(game_flow, shared_data)
+    asyncio.run(run(app, game_flow, game_strategy, shared_data))
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
@@ -1,9 +1,12 @@
 import os
+from functools import lru_cache
 
+@lru_cache(maxsize=None)
 def get_prompt(filename):
     """
     Reads the text from a prompt file and returns it as a string. 
     The prompt file should be located in the "prompts" directory of the current working directory.
+    Each prompt is read once, and later calls return the cached text.
     
     Args:
         filename (str): The name of the prompt file to read.
@@ -15,4 +18,5 @@ def get_prompt(filename):
     prompt_file = os.path.join(os.getcwd(), "prompts", filename)
 
     # Read the text from the prompt file
-    return open(prompt_file, "r").read()
\ No newline at end of file
+    with open(prompt_file, "r") as file:
+        return file.read()
@@ -1,7 +1,98 @@
+import numpy as np
+
+# Boxes are (left, upper, right, lower) corners, the order PIL's crop and the YOLO xyxy output use.
+# The vectorized functions take an (N, 4) array (or anything np.asarray turns into one) and points as (P, 2) x, y.
 
-# TODO: Unit Test is_point_in_bbox()
 # Function to check if a point is within a bounding box
 def is_point_in_bbox(point, bbox):
     x, y = point
     left, upper, right, lower = bbox
-    return left <= x <= right and upper <= y <= lower
\ No newline at end of file
+    return left <= x <= right and upper <= y <= lower
+
+def as_boxes(boxes) -> np.ndarray:
+    """An (N, 4) float array of boxes. An empty input gives a (0, 4) array."""
+    return np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+def as_points(points) -> np.ndarray:
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+def xywh_to_xyxy(boxes) -> np.ndarray:
+    """Converts (x, y, width, height) boxes, e.g. `DetectionSet.points()`, to corners."""
+    boxes = as_boxes(boxes)
+    return np.concatenate((boxes[:, :2], boxes[:, :2] + boxes[:, 2:]), axis=1)
+
+def points_in_boxes(points, boxes) -> np.ndarray:
+    """(P, N) bool mask of which points fall within which boxes, edges included, like `is_point_in_bbox`."""
+    points = as_points(points)[:, None, :]
+    boxes = as_boxes(boxes)[None, :, :]
+    return ((points >= boxes[..., :2]) & (points <= boxes[..., 2:])).all(axis=-1)
+
+def box_areas(boxes) -> np.ndarray:
+    boxes = as_boxes(boxes)
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+def box_centers(boxes) -> np.ndarray:
+    """(N, 2) array of box centres."""
+    boxes = as_boxes(boxes)
+    return (boxes[:, :2] + boxes[:, 2:]) / 2
+
+def box_intersections(boxes_a, boxes_b) -> np.ndarray:
+    """(N, M) matrix of the intersection areas of every pair of boxes."""
+    boxes_a = as_boxes(boxes_a)[:, None, :]
+    boxes_b = as_boxes(boxes_b)[None, :, :]
+    top_left = np.maximum(boxes_a[..., :2], boxes_b[..., :2])
+    bottom_right = np.minimum(boxes_a[..., 2:], boxes_b[..., 2:])
+    return np.clip(bottom_right - top_left, 0, None).prod(axis=-1)
+
+def _ratio(intersections: np.ndarray, denominators: np.ndarray) -> np.ndarray:
+    ratio = np.zeros_like(intersections)
+    np.divide(intersections, denominators, out=ratio, where=denominators > 0)
+    return ratio
+
+def box_iou(boxes_a, boxes_b) -> np.ndarray:
+    """(N, M) matrix of the Intersection-over-Union of every pair of boxes."""
+    intersections = box_intersections(boxes_a, boxes_b)
+    unions = box_areas(boxes_a)[:, None] + box_areas(boxes_b)[None, :] - intersections
+    return _ratio(intersections, unions)
+
+def box_iom(boxes_a, boxes_b) -> np.ndarray:
+    """
+    (N, M) matrix of the Intersection-over-Minimum of every pair of boxes: the intersection divided by the
+    smaller box's area. A box nested inside another scores 1, however small it is, where its IoU would be low.
+    """
+    intersections = box_intersections(boxes_a, boxes_b)
+    minimums = np.minimum(box_areas(boxes_a)[:, None], box_areas(boxes_b)[None, :])
+    return _ratio(intersections, minimums)
+
+def nms(boxes, scores, threshold: float = 0.5, overlap=box_iou, class_ids=None) -> np.ndarray:
+    """
+    Greedy non-maximum suppression. Returns the indices of the kept boxes, highest score first.
+
+    A box is dropped when its `overlap` with a higher scoring kept box exceeds `threshold`. With `class_ids`,
+    boxes only suppress boxes of the same class.
+    """
+    boxes = as_boxes(boxes)
+    order = np.argsort(-np.asarray(scores, dtype=np.float64).reshape(-1), kind="stable")
+    overlaps = overlap(boxes, boxes) > threshold
+    if class_ids is not None:
+        class_ids = np.asarray(class_ids).reshape(-1)
+        overlaps &= class_ids[:, None] == class_ids[None, :]
+
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    kept = []
+    for index in order:
+        if suppressed[index]:
+            continue
+        kept.append(index)
+        suppressed |= overlaps[index]
+    return np.asarray(kept, dtype=np.intp)
+
+def nms_iom(boxes, scores, threshold: float = 0.5, class_ids=None) -> np.ndarray:
+    """NMS on Intersection-over-Minimum, for nested boxes (SPEC.md 4.1): a box inside a higher scoring box is dropped."""
+    return nms(boxes, scores, threshold, box_iom, class_ids)
+
+def pairwise_distances(points_a, points_b) -> np.ndarray:
+    """(N, M) matrix of Euclidean distances between every pair of points, e.g. box centres."""
+    points_a = as_points(points_a)
+    points_b = as_points(points_b)
+    return np.sqrt(((points_a[:, None, :] - points_b[None, :, :]) ** 2).sum(axis=-1))
@@ -0,0 +1,115 @@
+import threading
+import time
+
+class CaptureRateGovernor:
+    """
+    Paces the capture worker from the inference pipeline's measured throughput, replacing a static delay.
+
+    The pipeline reports when it starts and finishes a frame, the capture worker reports how long a capture
+    takes, and the capture handler reports whether publishing a frame displaced one that was never inferred.
+    From exponentially weighted averages of those, the governor schedules the next capture so it completes
+    just as inference is expected to become free. If frames are still being dropped, the inference estimate
+    is stretched by the drop rate until they stop.
+
+    The capture rate always stays between `min_fps` and `max_fps`.
+
+    Metrics: `target_fps()`, `achieved_fps()`, `inference_latency`, `capture_latency`, `drop_rate`.
+    """
+    def __init__(self, min_fps: float = 2.0, max_fps: float = 60.0, smoothing: float = 0.2):
+        if min_fps <= 0 or max_fps < min_fps:
+            raise ValueError(f"Invalid capture rate bounds: min_fps={min_fps}, max_fps={max_fps}")
+        self.min_interval = 1.0 / max_fps
+        self.max_interval = 1.0 / min_fps
+        self.smoothing = smoothing
+
+        self.inference_latency = None
+        self.capture_latency = 0.0
+        self.capture_interval = None
+        self.drop_rate = 0.0
+
+        self._lock = threading.Lock()
+        self._inference_started = None
+        self._last_capture_started = None
+        # Set when inference finishes, so a sleeping capture worker can start its next capture early
+        self._inference_free = threading.Event()
+
+    def _average(self, current, sample: float) -> float:
+        return sample if current is None else current + self.smoothing * (sample - current)
+
+    def record_capture(self, started: float, finished: float):
+        """Called by the capture worker after each capture, with `time.monotonic()` timestamps."""
+        with self._lock:
+            self.capture_latency = self._average(self.capture_latency, finished - started)
+            if self._last_capture_started is not None:
+                self.capture_interval = self._average(self.capture_interval, started - self._last_capture_started)
+            self._last_capture_started = started
+
+    def record_published(self, dropped: bool):
+        """Called by the capture handler for each published frame. `dropped` means it replaced an uninferred frame."""
+        with self._lock:
+            self.drop_rate = self._average(self.drop_rate, 1.0 if dropped else 0.0)
+
+    def inference_started(self):
+        with self._lock:
+            self._inference_started = time.monotonic()
+            self._inference_free.clear()
+
+    def inference_finished(self):
+        with self._lock:
+            if self._inference_started is not None:
+                self.inference_latency = self._average(self.inference_latency, time.monotonic() - self._inference_started)
+            self._inference_started = None
+        self._inference_free.set()
+
+    def _target_interval(self) -> float:
+        if self.inference_latency is None:
+            return self.min_interval
+        interval = self.inference_latency * (1.0 + self.drop_rate)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def target_fps(self) -> float:
+        with self._lock:
+            return 1.0 / self._target_interval()
+
+    def achieved_fps(self) -> float:
+        with self._lock:
+            return 1.0 / self.capture_interval if self.capture_interval else 0.0
+
+    def next_delay(self, now: float = None) -> float:
+        """Returns how long the capture worker should wait before starting its next capture."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._last_capture_started is None:
+                return 0.0
+            earliest = self._last_capture_started + self.min_interval
+            latest = self._last_capture_started + self.max_interval
+
+            due = earliest
+            if self._inference_started is not None and self.inference_latency is not None:
+                # Inference is busy: finish the next capture as it becomes free
+                expected_free = self._inference_started + self.inference_latency * (1.0 + self.drop_rate)
+                due = max(due, expected_free - self.capture_latency)
+            elif self.drop_rate > 0 and self.inference_latency is not None:
+                # Inference is idle, but recent frames were still dropped: hold back to the target rate
+                due = max(due, self._last_capture_started + self._target_interval())
+            return max(0.0, min(due, latest) - now)
+
+    def wait(self, stop_event: threading.Event):
+        """
+        Blocks the capture worker until the next capture is due. Returns early if inference finishes
+        sooner than expected, or if `stop_event` is set.
+        """
+        while not stop_event.is_set():
+            delay = self.next_delay()
+            if delay <= 0:
+                return
+            # Bounded by max_interval, so the stop event is rechecked regularly
+            if self._inference_free.wait(delay):
+                self._inference_free.clear()
+                # Never exceed max_fps, even when inference is very fast
+                with self._lock:
+                    remaining = self._last_capture_started + self.min_interval - time.monotonic() \
+                        if self._last_capture_started is not None else 0
+                if remaining > 0:
+                    stop_event.wait(remaining)
+                return
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+import utilities.monitoring as monitoring
+from utilities.capture_rate_governor import CaptureRateGovernor
+from utilities.frame_ring_buffer import Frame, FrameRingBuffer
+
+logger = logging.getLogger(__name__)
+
+class CaptureWorker(threading.Thread):
+    """
+    Runs blocking window captures on a dedicated thread and publishes frames into a FrameRingBuffer.
+
+    The asyncio side never touches the capture call. It awaits `wait_for_frame()`, which resolves once the
+    worker signals (through `loop.call_soon_threadsafe`) that a newer frame sequence number is ready.
+
+    Frames are stamped with the wall-clock time the capture finished, unless `timestamp_func` is given: it is called
+    after each capture and returns the frame's own timestamp (e.g. the original capture time of a replayed frame),
+    or None to fall back to the wall clock.
+    """
+    def __init__(self, capture_func: Callable, activate_func: Optional[Callable] = None, slots: int = 8, delay_seconds: float = 0,
+                 governor: Optional[CaptureRateGovernor] = None, timestamp_func: Optional[Callable[[], Optional[float]]] = None):
+        super().__init__(name="CaptureWorker", daemon=True)
+        self.capture_func = capture_func
+        self.activate_func = activate_func
+        self.slots = slots
+        self.delay_seconds = delay_seconds
+        # When set, the governor paces captures and `delay_seconds` is ignored
+        self.governor = governor
+        self.timestamp_func = timestamp_func
+
+        self.ring_buffer: Optional[FrameRingBuffer] = None
+        # Buffers replaced after a resolution change. Readers may still hold views into them.
+        self._retired_buffers = []
+        self.statistics = monitoring.Statistics()
+        self.latest_sequence = -1
+        self._stop_event = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._frame_ready: Optional[asyncio.Event] = None
+
+    def start(self):
+        """Starts the worker. Must be called from the event loop that will await frames."""
+        self._loop = asyncio.get_running_loop()
+        self._frame_ready = asyncio.Event()
+        super().start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        for ring_buffer in self._retired_buffers + [self.ring_buffer]:
+            if ring_buffer is not None:
+                ring_buffer.close()
+        self._retired_buffers = []
+        self.ring_buffer = None
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.statistics.count += 1
+            try:
+                if self.activate_func:
+                    self.activate_func()
+
+                before_image_capture = time.time()
+                capture_started = time.monotonic()
+                image = np.asarray(self.capture_func())
+                capture_time = time.time()
+                if self.governor:
+                    self.governor.record_capture(capture_started, time.monotonic())
+                logger.debug(f"CaptureWorker: capture took {capture_time - before_image_capture} seconds to complete.")
+
+                if self.timestamp_func:
+                    source_time = self.timestamp_func()
+                    if source_time is not None:
+                        capture_time = source_time
+                self._publish(image, capture_time)
+            except EOFError:
+                logger.info("CaptureWorker: the capture source is exhausted, stopping.")
+                break
+            except Exception as argument:
+                logger.error(argument)
+
+            if self.governor:
+                self.governor.wait(self._stop_event)
+            else:
+                self._stop_event.wait(self.delay_seconds)
+
+    def _publish(self, image: np.ndarray, capture_time: float):
+        if self.ring_buffer is None or self.ring_buffer.frame_shape != image.shape:
+            if self.ring_buffer is not None:
+                logger.info(f"CaptureWorker: frame shape changed to {image.shape}, reallocating the ring buffer.")
+                self._retired_buffers.append(self.ring_buffer)
+            self.ring_buffer = FrameRingBuffer(self.slots, image.shape, image.dtype)
+
+        sequence = self.ring_buffer.write(image, capture_time)
+        if sequence is None:
+            logger.warning("CaptureWorker: every ring buffer slot is pinned, dropping frame.")
+            return
+
+        self._loop.call_soon_threadsafe(self._notify_frame_ready, sequence)
+
+    def _notify_frame_ready(self, sequence: int):
+        self.latest_sequence = sequence
+        self._frame_ready.set()
+
+    async def wait_for_frame(self, timeout: Optional[float] = None) -> Optional[Frame]:
+        """
+        Waits until a frame newer than the last one returned is ready, then pins and returns the newest frame.
+
+        Returns:
+            Frame: The newest frame, or None if the timeout expired first. The caller must `release()` it.
+        """
+        try:
+            await asyncio.wait_for(self._frame_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._frame_ready.clear()
+        return self.ring_buffer.acquire_latest()
@@ -16,21 +16,63 @@ APP_HEADER_HEIGHT = int(os.getenv("APP_HEADER_HEIGHT", 0))
 # TODO: Test this assumption on different hardware.
 APP_RESIZE_REQUIRED = os.getenv("APP_RESIZE_REQUIRED", "True").lower() == "true"
 
-# Flag - use a static image for testing
+# Flag - replay recorded frames instead of capturing the game window, for testing without the game running
 CAPTURE_IMAGE_USE_STATIC_IMAGE = os.getenv("CAPTURE_IMAGE_USE_STATIC_IMAGE", "False").lower() == "true"
-# Path to the static image to use if CAPTURE_IMAGE_USE_STATIC_IMAGE is True
+# Path to replay if CAPTURE_IMAGE_USE_STATIC_IMAGE is True. This can be a single image, a directory of
+# screenshots (.png/.jpg/.webp/.npy), or recorded video segments (.mjpeg/.mp4 with their .idx sidecars).
 CAPTURE_IMAGE_STATIC_IMAGE_PATH = os.getenv("CAPTURE_IMAGE_STATIC_IMAGE_PATH", "./screenshots/static/static_image.png")
+# Replay pacing: "realtime" (original capture timestamps), "fixed" (CAPTURE_REPLAY_FPS) or "fast" (as fast as possible)
+CAPTURE_REPLAY_PACING = os.getenv("CAPTURE_REPLAY_PACING", "realtime")
+CAPTURE_REPLAY_FPS = float(os.getenv("CAPTURE_REPLAY_FPS", 30))
+# Flag - restart the replay from the first frame once it is exhausted
+CAPTURE_REPLAY_LOOP = os.getenv("CAPTURE_REPLAY_LOOP", "True").lower() == "true"
+# Flag - decode every replayed frame into memory up front. Otherwise frames are decoded as they are replayed,
+# since a long session (about 1.5 MB per 960x540 frame) may not fit in memory.
+CAPTURE_REPLAY_PRELOAD = os.getenv("CAPTURE_REPLAY_PRELOAD", "False").lower() == "true"
+
+# Flag - on Linux, capture the window through the MIT-SHM extension instead of pyscreenshot.
+# Falls back to pyscreenshot automatically if the X server does not support it.
+CAPTURE_USE_XSHM = os.getenv("CAPTURE_USE_XSHM", "True").lower() == "true"
 
 # Delay in seconds between loops of capture_image_handler. This allows the user to throttle
 # the window focus and image capturing rate.
 CAPTURE_IMAGE_THREAD_DELAY_SECONDS = float(os.getenv("CAPTURE_IMAGE_THREAD_DELAY_SECONDS", 0))
 
+# Flag - pace captures from the inference pipeline's measured latency and drop rate instead of the static
+# CAPTURE_IMAGE_THREAD_DELAY_SECONDS (which is then ignored), so a fresh frame is ready just as inference becomes free.
+CAPTURE_RATE_GOVERNOR_ENABLED = os.getenv("CAPTURE_RATE_GOVERNOR_ENABLED", "False").lower() == "true"
+# Bounds for the governed capture rate, in frames per second
+CAPTURE_MIN_FPS = float(os.getenv("CAPTURE_MIN_FPS", 2))
+CAPTURE_MAX_FPS = float(os.getenv("CAPTURE_MAX_FPS", 60))
+
+# Number of frames held in the shared-memory ring buffer written by the capture worker thread.
+# Frames still referenced by the inference pipeline are pinned, so this must comfortably exceed
+# the number of images in flight (queued, being inferred, and the last inferred image).
+CAPTURE_RING_BUFFER_SLOTS = int(os.getenv("CAPTURE_RING_BUFFER_SLOTS", 8))
+
 # Flag - will screenshots be saved
 SAVE_SCREENSHOTS = os.getenv("SAVE_SCREENSHOTS", "True").lower() == "true"
 
 # Directory to save screenshots
 SCREENSHOTS_DIR = os.getenv("SCREENSHOTS_DIR", "./screenshots/")
 
+# Screenshots are encoded and written by a background archiver with a bounded queue.
+# Encoder is one of: png, jpeg, webp, npy. Quality applies to jpeg and webp (webp above 100 is lossless).
+SCREENSHOT_ENCODER = os.getenv("SCREENSHOT_ENCODER", "png")
+SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", 90))
+SCREENSHOT_ARCHIVER_QUEUE_SIZE = int(os.getenv("SCREENSHOT_ARCHIVER_QUEUE_SIZE", 32))
+SCREENSHOT_ARCHIVER_WORKERS = int(os.getenv("SCREENSHOT_ARCHIVER_WORKERS", 2))
+# What to discard when the disk can't keep up: drop-oldest or drop-newest
+SCREENSHOT_ARCHIVER_DROP_POLICY = os.getenv("SCREENSHOT_ARCHIVER_DROP_POLICY", "drop-oldest")
+
+# How screenshots are saved: "frames" writes one image file per frame, "video" records time-segmented
+# video files (mjpeg or mp4) with a frame index sidecar per segment. See utilities/video_recorder.py.
+SCREENSHOT_RECORDING_MODE = os.getenv("SCREENSHOT_RECORDING_MODE", "frames")
+VIDEO_CONTAINER = os.getenv("VIDEO_CONTAINER", "mjpeg")
+VIDEO_SEGMENT_SECONDS = float(os.getenv("VIDEO_SEGMENT_SECONDS", 60))
+# Nominal frame rate written into mp4 headers; capture timestamps in the index are authoritative
+VIDEO_FPS = float(os.getenv("VIDEO_FPS", 30))
+
 # REMOVED, not used for this variation of the codebase
 SAVE_SCREENSHOT_RESPONSE = os.getenv("SAVE_SCREENSHOT_RESPONSE", "True").lower() == "true"
 
@@ -41,6 +83,11 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
 # REMOVED, not used for this variation of the codebase
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llava")
+# At most this many requests are in flight to Ollama at once. Responses are cached for this many distinct
+# (frame hash, prompt, region) keys, so unchanged screens are not sent to the model again.
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", 2))
+OLLAMA_RESPONSE_CACHE_SIZE = int(os.getenv("OLLAMA_RESPONSE_CACHE_SIZE", 256))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", 120))
 
 # secrets
 AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
@@ -56,11 +103,63 @@ CONTROLLER_INPUT_THREAD_DELAY_SECONDS = float(os.getenv('CONTROLLER_INPUT_THREAD
 
 INFERENCE_THREAD_DELAY_SECONDS = float(os.getenv('INFERENCE_THREAD_DELAY_SECONDS', 0))
 
+# Skip inference for frames that are practically identical to the last inferred frame (menus, paused screens).
+# Frames are never skipped while in a match.
+# The method is "mad" (mean absolute difference of a grayscale thumbnail, 0-255) or "dhash" (Hamming distance
+# of a 64-bit perceptual hash); the threshold is in the method's units.
+INFERENCE_SKIP_UNCHANGED_FRAMES = os.getenv('INFERENCE_SKIP_UNCHANGED_FRAMES', "False").lower() == "true"
+INFERENCE_UNCHANGED_FRAME_METHOD = os.getenv('INFERENCE_UNCHANGED_FRAME_METHOD', "mad")
+INFERENCE_UNCHANGED_FRAME_THRESHOLD = float(os.getenv('INFERENCE_UNCHANGED_FRAME_THRESHOLD', 2.0))
+# Force inference after this many consecutive skipped frames (0 disables the limit)
+INFERENCE_UNCHANGED_FRAME_MAX_SKIPS = int(os.getenv('INFERENCE_UNCHANGED_FRAME_MAX_SKIPS', 30))
+
+# Flag - run the menu lane of the inference graph (menu state classification, then squad selection) while in menus
+INFERENCE_MENU_LANE_ENABLED = os.getenv('INFERENCE_MENU_LANE_ENABLED', "False").lower() == "true"
+
+# Run the Rush detector in this many worker processes (0 runs it in the main process). Each worker loads its own copy
+# of the model, and limits torch to INFERENCE_WORKER_THREADS threads (0 keeps torch's default) so workers don't contend.
+INFERENCE_WORKER_PROCESSES = int(os.getenv('INFERENCE_WORKER_PROCESSES', 0))
+INFERENCE_WORKER_THREADS = int(os.getenv('INFERENCE_WORKER_THREADS', 1))
+
+# Models are loaded once and shared by the inference steps. When the loaded models exceed this many MB,
+# models not currently in use (e.g. the menu classifiers during a match) are unloaded. 0 disables the limit.
+MODEL_REGISTRY_MEMORY_BUDGET_MB = float(os.getenv('MODEL_REGISTRY_MEMORY_BUDGET_MB', 0))
+
+# Backend for the YOLO models: "torch" (ultralytics/PyTorch, on the GPU when available), or "onnx"/"openvino" to run
+# an exported graph on the CPU. Exports are created in MODEL_EXPORT_DIR on first use and reused afterwards.
+YOLO_BACKEND = os.getenv('YOLO_BACKEND', "torch")
+MODEL_EXPORT_DIR = os.getenv('MODEL_EXPORT_DIR', "./models/exports/")
+# Flag - use a dynamically INT8 quantized graph (onnx backend only)
+YOLO_QUANTIZE_INT8 = os.getenv('YOLO_QUANTIZE_INT8', "False").lower() == "true"
+
 # FC25 - Rush YOLO Model
 HF_RUSH_DETECTION_PATH =  os.getenv('HF_RUSH_DETECTION_PATH', "fc25-rush_model")
 HF_RUSH_DETECTION_FILENAME = os.getenv('HF_RUSH_DETECTION_FILENAME', "fc25-rush.pt")
 RUSH_INFERENCE_USE_WEBSERVICE = os.getenv('RUSH_INFERENCE_USE_WEBSERVICE', "False").lower() == "true"
 RUSH_INFERENCE_WEBSERVICE_URL = os.getenv('RUSH_INFERENCE_WEBSERVICE_URL', "http://localhost:8000/predict")
+# The webservice client keeps up to this many pooled keep-alive connections, and fails a request after TIMEOUT seconds
+RUSH_INFERENCE_WEBSERVICE_TIMEOUT = float(os.getenv('RUSH_INFERENCE_WEBSERVICE_TIMEOUT', 5.0))
+RUSH_INFERENCE_WEBSERVICE_POOL_SIZE = int(os.getenv('RUSH_INFERENCE_WEBSERVICE_POOL_SIZE', 4))
+# Frame upload encoding: "raw" (.npy array), "png", "jpeg-<quality>", or "auto" to pick the cheapest of
+# RUSH_INFERENCE_WEBSERVICE_ENCODINGS from measured encode and request times. Only list "raw" if the service accepts it
+# (inference.rush_detection_service does).
+RUSH_INFERENCE_WEBSERVICE_ENCODING = os.getenv('RUSH_INFERENCE_WEBSERVICE_ENCODING', "auto")
+RUSH_INFERENCE_WEBSERVICE_ENCODINGS = os.getenv('RUSH_INFERENCE_WEBSERVICE_ENCODINGS', "png,jpeg-95,jpeg-85").split(",")
+
+# Rush detection web service (python -m inference.rush_detection_service). Each worker holds its own model replica
+# and batches concurrent requests: a batch runs once MAX_BATCH_SIZE frames are waiting or the oldest waited MAX_WAIT_MS.
+RUSH_SERVICE_HOST = os.getenv('RUSH_SERVICE_HOST', "0.0.0.0")
+RUSH_SERVICE_PORT = int(os.getenv('RUSH_SERVICE_PORT', 8000))
+RUSH_SERVICE_WORKERS = int(os.getenv('RUSH_SERVICE_WORKERS', 1))
+RUSH_SERVICE_MAX_BATCH_SIZE = int(os.getenv('RUSH_SERVICE_MAX_BATCH_SIZE', 8))
+RUSH_SERVICE_MAX_WAIT_MS = float(os.getenv('RUSH_SERVICE_MAX_WAIT_MS', 5.0))
+# Largest accepted upload. A raw 1080p frame is about 6 MB, and PNG frames of busy scenes are not much smaller.
+RUSH_SERVICE_MAX_UPLOAD_MB = float(os.getenv('RUSH_SERVICE_MAX_UPLOAD_MB', 32))
+
+# Backend for the menu/match image classifiers: "keras" (TensorFlow), or "tflite"/"onnx" to run a converted model
+# without importing TensorFlow. Converted models are downloaded from the model's repo when published there
+# (same filename with a .tflite/.onnx extension), otherwise converted locally once, which needs TensorFlow.
+IMAGE_CLASSIFIER_BACKEND = os.getenv('IMAGE_CLASSIFIER_BACKEND', "keras")
 
 # Old configs, not sure if still used.
 HF_MENU_CLASSIFICATION_PATH = os.getenv('HF_MENU_CLASSIFICATION_PATH', "fc24-in-menu_classification_model")
@@ -0,0 +1,93 @@
+import cv2
+import numpy as np
+
+# Thumbnails are tiny on purpose: large enough to notice a menu transition or the ball moving,
+# small enough that comparing them costs microseconds.
+DEFAULT_THUMBNAIL_SIZE = (32, 18)
+
+def grayscale_thumbnail(image: np.ndarray, size=DEFAULT_THUMBNAIL_SIZE) -> np.ndarray:
+    """
+    Downsamples an RGB(A) or grayscale frame to a small grayscale thumbnail.
+    The frame is resized before the colour conversion so the conversion only touches the thumbnail.
+    """
+    thumbnail = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    if thumbnail.ndim == 3:
+        code = cv2.COLOR_RGBA2GRAY if thumbnail.shape[-1] == 4 else cv2.COLOR_RGB2GRAY
+        thumbnail = cv2.cvtColor(thumbnail, code)
+    return thumbnail
+
+def difference_hash(image: np.ndarray, hash_size: int = 8) -> int:
+    """
+    Computes a 64-bit perceptual difference hash (dHash) of a frame.
+    Near-identical frames produce hashes with a small Hamming distance.
+    """
+    thumbnail = grayscale_thumbnail(image, (hash_size + 1, hash_size))
+    bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    return bin(hash_a ^ hash_b).count('1')
+
+class FrameChangeDetector:
+    """
+    Decides whether a frame is practically identical to the last frame that was sent to inference.
+
+    Frames are compared against a reference thumbnail rather than the previous frame, so a slow drift still
+    registers as a change once it adds up. The reference only moves when a frame is reported as changed.
+
+    Methods:
+        "mad": mean absolute difference between grayscale thumbnails, on a 0-255 scale.
+        "dhash": Hamming distance between 64-bit difference hashes.
+    """
+    def __init__(self, threshold: float = 2.0, method: str = "mad", max_consecutive_unchanged: int = 0,
+                 thumbnail_size=DEFAULT_THUMBNAIL_SIZE):
+        if method not in ("mad", "dhash"):
+            raise ValueError(f"Unsupported change detection method: {method}")
+        self.threshold = threshold
+        self.method = method
+        # Force a refresh after this many skipped frames (0 disables the limit)
+        self.max_consecutive_unchanged = max_consecutive_unchanged
+        self.thumbnail_size = thumbnail_size
+
+        self._reference = None
+        self._consecutive_unchanged = 0
+        self.frames_checked = 0
+        self.frames_unchanged = 0
+
+    def _signature(self, image: np.ndarray):
+        if self.method == "dhash":
+            return difference_hash(image)
+        return grayscale_thumbnail(image, self.thumbnail_size)
+
+    def _distance(self, signature) -> float:
+        if self.method == "dhash":
+            return hamming_distance(signature, self._reference)
+        return float(cv2.absdiff(signature, self._reference).mean())
+
+    def is_unchanged(self, image: np.ndarray) -> bool:
+        """
+        Returns True if the frame is within the threshold of the reference frame.
+        Otherwise the frame becomes the new reference and False is returned.
+        """
+        self.frames_checked += 1
+        signature = self._signature(image)
+
+        if self._reference is not None \
+            and self._distance(signature) <= self.threshold \
+            and not (self.max_consecutive_unchanged and self._consecutive_unchanged >= self.max_consecutive_unchanged):
+            self._consecutive_unchanged += 1
+            self.frames_unchanged += 1
+            return True
+
+        self._reference = signature
+        self._consecutive_unchanged = 0
+        return False
+
+    def reset(self):
+        """Forgets the reference frame so the next frame is always treated as changed."""
+        self._reference = None
+        self._consecutive_unchanged = 0
+
+    def skipped_ratio(self) -> float:
+        """The fraction of checked frames for which inference was avoided."""
+        return self.frames_unchanged / self.frames_checked if self.frames_checked else 0.0
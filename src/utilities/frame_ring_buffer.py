@@ -0,0 +1,140 @@
+import time
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+from typing import Optional
+
+import numpy as np
+
+# Frames start on a cache-line boundary after the per-slot header arrays
+_FRAME_ALIGNMENT = 64
+
+class Frame:
+    """
+    A frame read from a FrameRingBuffer. `image` is a view into the ring buffer's shared memory, not a copy.
+
+    The slot is pinned while the frame is held, so the writer will not overwrite it. Call `release()`
+    when the frame is no longer needed.
+    """
+    def __init__(self, ring_buffer: 'FrameRingBuffer', slot: int, sequence: int, timestamp: float, capture_time: float, image: np.ndarray):
+        self.ring_buffer = ring_buffer
+        self.slot = slot
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.capture_time = capture_time
+        self.image = image
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.ring_buffer.release(self.slot)
+
+class FrameRingBuffer:
+    """
+    A fixed-size ring of frames in shared memory.
+
+    Each slot carries a frame sequence number, a monotonic timestamp and the wall-clock capture time
+    alongside the pixels. The writer never blocks: it fills the next slot that is not pinned by a reader,
+    and drops the frame if every slot is pinned.
+
+    Pinning is tracked with an in-process lock, so readers in other processes (attached by `name`) must copy
+    frames out rather than pin them.
+    """
+    def __init__(self, slots: int, frame_shape: tuple, dtype=np.uint8, name: Optional[str] = None):
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+
+        header_size = slots * (8 + 8 + 8 + 4)
+        frames_offset = -(-header_size // _FRAME_ALIGNMENT) * _FRAME_ALIGNMENT
+        frame_size = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        create = name is None
+        self.shm = SharedMemory(name=name, create=create, size=frames_offset + slots * frame_size)
+        self.name = self.shm.name
+        self._owner = create
+
+        buf = self.shm.buf
+        self.sequence = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=0)
+        self.timestamp = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=slots * 8)
+        self.capture_time = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=slots * 16)
+        self.pins = np.ndarray((slots,), dtype=np.int32, buffer=buf, offset=slots * 24)
+        self.frames = np.ndarray((slots,) + self.frame_shape, dtype=self.dtype, buffer=buf, offset=frames_offset)
+
+        if create:
+            self.sequence[:] = -1
+            self.pins[:] = 0
+
+        self._lock = Lock()
+        self._last_slot = -1
+        self.next_sequence = int(self.sequence.max()) + 1
+        self.frames_dropped = 0
+
+    def write(self, image: np.ndarray, capture_time: Optional[float] = None) -> Optional[int]:
+        """
+        Copies a frame into the next free slot.
+
+        Args:
+            image (np.ndarray): The frame, which must match the buffer's frame shape.
+            capture_time (float): The wall-clock time the frame was captured. Defaults to now.
+
+        Returns:
+            int: The sequence number of the written frame, or None if every slot was pinned and the frame was dropped.
+        """
+        if image.shape != self.frame_shape:
+            raise ValueError(f"Frame shape {image.shape} does not match ring buffer shape {self.frame_shape}")
+
+        with self._lock:
+            slot = None
+            for offset in range(1, self.slots + 1):
+                candidate = (self._last_slot + offset) % self.slots
+                if self.pins[candidate] == 0:
+                    slot = candidate
+                    break
+            if slot is None:
+                self.frames_dropped += 1
+                return None
+            # Invalidate the slot so no reader can pin it while it is being overwritten
+            self.sequence[slot] = -1
+
+        np.copyto(self.frames[slot], image)
+
+        with self._lock:
+            sequence = self.next_sequence
+            self.next_sequence += 1
+            self.timestamp[slot] = time.monotonic()
+            self.capture_time[slot] = capture_time if capture_time is not None else time.time()
+            self.sequence[slot] = sequence
+            self._last_slot = slot
+        return sequence
+
+    def acquire_latest(self) -> Optional[Frame]:
+        """Pins and returns the newest frame, or None if nothing has been written yet."""
+        with self._lock:
+            slot = int(np.argmax(self.sequence))
+            sequence = int(self.sequence[slot])
+            if sequence < 0:
+                return None
+            self.pins[slot] += 1
+            return Frame(self, slot, sequence, float(self.timestamp[slot]), float(self.capture_time[slot]), self.frames[slot])
+
+    def release(self, slot: int):
+        with self._lock:
+            # Frames can outlive the buffer (e.g. images still queued at shutdown)
+            if self.pins is not None:
+                self.pins[slot] -= 1
+
+    def latest_sequence(self) -> int:
+        return int(self.sequence.max())
+
+    def close(self):
+        """Detaches from (and, for the creating process, unlinks) the shared memory."""
+        # Drop our own views first; SharedMemory refuses to close while buffers are exported
+        self.sequence = self.timestamp = self.capture_time = self.pins = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A reader still holds a frame view. The mapping is released when that view is collected.
+            pass
+        if self._owner:
+            self.shm.unlink()
+            self._owner = False
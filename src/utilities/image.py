@@ -7,34 +7,114 @@ import io
 from PIL.Image import Image as PILImage
 from PIL import Image
 
-
-from skimage.metrics import structural_similarity as ssim
-
 import utilities.config as config
+from utilities.template_store import TemplateStore, ssim
 
 image_format = "PNG"
 
+# Templates are loaded, converted and cropped once, then kept in memory
+template_store = TemplateStore("screenshots")
+
 def load_template_grayscale(template_name):
-    """Load a grayscale template image from disk."""
-    template = cv2.imread("screenshots/{}".format(template_name))
-    return cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+    """Load a grayscale template image (cached after the first load, read-only)."""
+    return template_store.get(template_name)
 
-# TODO: Unit Tests
 class ImageWrapper:
-    """A class to represent an image. Wraps a PIL Image and a MatLike which is used by OpenCV."""
-    def __init__(self, image, saved_path=None):
-        self._timestamp:float = time.time()
+    """
+    A class to represent an image. Wraps a PIL Image and a MatLike which is used by OpenCV.
+
+    Only the representation the image was created from exists up front. The other one is built on first access
+    (`_image` for PIL, `_imageArray` for numpy), and an array passed in is used as-is rather than copied.
+    Derived views (`rgb()`, `grayscale()`, `resized()`, `crop()`, `rgb_image()`) are memoized per frame, so
+    several inference steps on the same frame share one conversion. Cached views are read-only.
+    """
+    __slots__ = ("_pil_image", "_array", "_views", "_timestamp", "saved_path", "__weakref__")
+
+    def __init__(self, image, saved_path=None, timestamp: float = None):
+        self._timestamp:float = timestamp if timestamp is not None else time.time()
 
         if isinstance(image, PILImage):
-            self._image = image
-            self._imageArray = np.array(image)
+            self._pil_image = image
+            self._array = None
         elif isinstance(image, np.ndarray):
-            self._imageArray = image
-            self._image = PILImage.fromarray(image)
+            self._pil_image = None
+            self._array = image
         else:
             raise ValueError("Unsupported image type: must be a PIL.Image.Image or a numpy.ndarray")
+        self._views = {}
         self.saved_path = saved_path
 
+    @property
+    def _image(self) -> PILImage:
+        if self._pil_image is None:
+            self._pil_image = Image.fromarray(self._array)
+        return self._pil_image
+
+    @property
+    def _imageArray(self) -> np.ndarray:
+        if self._array is None:
+            self._array = np.asarray(self._pil_image)
+        return self._array
+
+    @property
+    def width(self) -> int:
+        return self._array.shape[1] if self._array is not None else self._pil_image.width
+
+    @property
+    def height(self) -> int:
+        return self._array.shape[0] if self._array is not None else self._pil_image.height
+
+    def _cached(self, key, build):
+        view = self._views.get(key)
+        if view is None:
+            view = build()
+            if isinstance(view, np.ndarray):
+                view.flags.writeable = False
+            self._views[key] = view
+        return view
+
+    def rgb(self) -> np.ndarray:
+        """The frame as an RGB array. Shares the original buffer when the frame is already RGB."""
+        def build():
+            if self._array is None and self._pil_image.mode not in ("RGB", "RGBA", "L"):
+                # Palette and other PIL modes have no direct array equivalent
+                return np.asarray(self._pil_image.convert("RGB"))
+            array = self._imageArray
+            if array.ndim == 2:
+                return cv2.cvtColor(array, cv2.COLOR_GRAY2RGB)
+            if array.shape[-1] == 4:
+                return cv2.cvtColor(array, cv2.COLOR_RGBA2RGB)
+            return array.view()
+        return self._cached("rgb", build)
+
+    def grayscale(self) -> np.ndarray:
+        """The frame as a single channel grayscale array."""
+        def build():
+            array = self._imageArray
+            if array.ndim == 2:
+                return array.view()
+            return cv2.cvtColor(array, cv2.COLOR_RGBA2GRAY if array.shape[-1] == 4 else cv2.COLOR_RGB2GRAY)
+        return self._cached("grayscale", build)
+
+    def resized(self, width: int, height: int, interpolation=cv2.INTER_LINEAR) -> np.ndarray:
+        """The RGB frame resized to width x height."""
+        rgb = self.rgb()
+        if rgb.shape[:2] == (height, width):
+            return rgb
+        return self._cached(("resized", width, height, interpolation),
+                            lambda: cv2.resize(rgb, (width, height), interpolation=interpolation))
+
+    def crop(self, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+        """A region of the RGB frame, in the same (left, upper, right, lower) order as PIL's crop. No pixels are copied."""
+        return self._cached(("crop", left, top, right, bottom), lambda: self.rgb()[top:bottom, left:right])
+
+    def rgb_image(self) -> PILImage:
+        """The frame as an RGB PIL image, for consumers that need one."""
+        def build():
+            image = self._image
+            return image if image.mode == "RGB" else Image.fromarray(self.rgb())
+        return self._cached("rgb_image", build)
+
     @classmethod
     def load_image_from_file(self, file_path: str):
         """Load an image from a file and return an instance of ImageWrapper."""
@@ -43,7 +123,9 @@ class ImageWrapper:
         return self(image)  # Return an instance of ImageWrapper with PIL Image
 
     def resize(self, width, height):
-        self._image = self._image.resize((width, height), Image.LANCZOS)
+        self._pil_image = self._image.resize((width, height), Image.LANCZOS)
+        self._array = None
+        self._views = {}
 
     # Function to crop and resize the image to new size, while maintain the aspect ratio of 16x9
     def crop_and_resize_to_height(self, width, height):
@@ -82,11 +164,8 @@ class ImageWrapper:
         img_byte_arr = io.BytesIO()
         
         # Convert to RGB if the image has an alpha channel
-        if self._image.mode == 'RGBA':
-            image_rgb = self._image.convert('RGB')
-        else:
-            image_rgb = self._image
-        
+        image_rgb = self.rgb_image() if self._image.mode == 'RGBA' else self._image
+
         image_rgb.save(img_byte_arr, format=image_format, quality=quality)  # Save with compression
         img_byte_arr.seek(0)  # Seek to the beginning of the BytesIO buffer
         return img_byte_arr.getvalue()  # Return the byte array
@@ -122,7 +201,6 @@ class ImageWrapper:
         return image_base64
 
     # SSIM Comparisons
-    # TODO: If SSIM is still needed for this project, consider caching the templates
     def compare_region_ssim(self, template_name:str, x:int, y:int, width:int, height:int):
         """
         Compares an image to a template using structural similarity (SSIM).
@@ -138,10 +216,9 @@ class ImageWrapper:
             A float representing the similarity between the image and the template, with higher values indicating greater similarity.
         """
         # Crop the specified region
-        cropped_img = self._imageArray[y:height+y, x:width+x]
-        cropped_img_grayscale = cv2.cvtColor(cropped_img, cv2.COLOR_BGR2GRAY)
-        cropped_template_grayscale = load_template_grayscale(template_name)[y:height+y, x:width+x]
-      
+        cropped_img_grayscale = self.grayscale()[y:height+y, x:width+x]
+        cropped_template_grayscale = template_store.region(template_name, x, y, width, height)
+
         # Calculate SSIM
         ssim_score = ssim(cropped_template_grayscale, cropped_img_grayscale)
 
@@ -161,13 +238,28 @@ class ImageWrapper:
         gray_template = load_template_grayscale(template_name)
 
         # Convert the image to grayscale
-        gray_image = cv2.cvtColor(self._imageArray, cv2.COLOR_BGR2GRAY)
+        gray_image = self.grayscale()
 
         # Calculate SSIM
         ssim_score = ssim(gray_template, gray_image)
 
         return ssim_score
-    
+
+    def best_template_match(self, candidates, fast_reject_scale: float = None, fast_reject_threshold: float = 0.0):
+        """
+        Compares the image against many templates in one batched SSIM pass.
+
+        Parameters:
+            candidates (list): (template_name, region) pairs, where region is (x, y, width, height) or None for the whole template.
+            fast_reject_scale (float): Optional downscale factor for a coarse pass that rejects candidates scoring
+                below fast_reject_threshold before the full resolution comparison.
+
+        Returns:
+            A tuple of the best matching candidate and its SSIM score, or (None, None) if every candidate was rejected.
+        """
+        return template_store.best_match(self.grayscale(), candidates,
+                                         fast_reject_scale=fast_reject_scale, fast_reject_threshold=fast_reject_threshold)
+
     # Pixel-by-Pixel Comparison
     def compare_grayscale_to_template(self, template_name):
         """
@@ -176,7 +268,7 @@ class ImageWrapper:
         gray_template = load_template_grayscale(template_name)
 
         # Convert the image to grayscale
-        gray_image = cv2.cvtColor(self._imageArray, cv2.COLOR_BGR2GRAY)
+        gray_image = self.grayscale()
 
         # Calculate the element-wise difference
         diff = np.abs(gray_template - gray_image)
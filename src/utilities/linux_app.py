@@ -1,81 +1,171 @@
 import utilities.config as config
+import cv2
 import logging
-import os
+import numpy as np
 import pyscreenshot as ImageGrab
+from PIL import Image
 from Xlib import X
 from Xlib.display import Display
-from Xlib.protocol.event import ClientMessage
-from Xlib.protocol.request import QueryTree
+
+from utilities.xshm_capture import XShmAttachError, XShmCapture
 
 class RunningApplication():
     def __init__(self, app_name):
          self.window_id = None
          self.app_name = app_name
+         # A single X connection is kept open for the life of the application. Opening a new Display
+         # per call costs a socket connect and handshake on every frame.
+         self.display = Display()
+         self.capture_backend = None
+         self.use_xshm = config.CAPTURE_USE_XSHM
+
+         # Window state cached from X events (see _poll_window_events) so the capture loop does not
+         # need synchronous round trips to learn the window size or whether it still has focus.
+         self.window_x = None
+         self.window_y = None
+         self.window_width = None
+         self.window_height = None
+         self.has_focus = False
+         self.needs_raise = True
+
          self.find_window_by_name(app_name)
          self.activate_window()
 
     def activate(self):
-        self.activate_window()
+        """
+        Ensures the window is focused and on top. Only talks to the X server if an event reported that
+        the window lost focus, moved, or was destroyed since the last call.
+        """
+        self._poll_window_events()
+        if not self.window_id:
+            logging.debug(f"{self.app_name} window is gone, searching for it again.")
+            if not self.find_window_by_name(self.app_name):
+                logging.warning(f"{self.app_name} window not found, searching again on the next activation.")
+                return
+        if self.needs_raise or not self.has_focus:
+            self.activate_window()
 
     def is_app_active(self) -> bool:
-        if (not self.app):
-            raise ValueError("app must be set, try running find_app before calling is_app_active_frontmost")
-        
-        d = Display()
-
-        # Get the currently focused window
-        focused_window = d.get_input_focus().focus
+        if (not self.window_id):
+            raise ValueError("window_id must be set, try running find_window_by_name before calling is_app_active")
 
-        if focused_window == self.window_id:
-            return True
-        
-        return False
+        self._poll_window_events()
+        return self.has_focus
 
     def find_window_by_name(self, window_name):
-        display = Display()
-        root = display.screen().root
+        root = self.display.screen().root
         window_id = None
 
+        def matches(win):
+            name = win.get_wm_name()
+            if name != None and name.startswith(window_name):
+                win_state = win.get_wm_state()
+                logging.debug(f"{name} - {win.id} - {win_state}")
+                # Will return the first found window with a non-empty state
+                # May return the wrong id if multiple windows are associated with the application
+                return bool(win_state)
+            return False
+
         # This function recursively searches for a window with the given name
         def search(win):
             nonlocal window_id
-            if win.get_wm_name() != None and win.get_wm_name().startswith(window_name):
-                logging.debug(f"{win.get_wm_name()} - {win.id} - {win.get_wm_state()}")
-                win_state = win.get_wm_state()
-                if (win_state):
-                    # Will return the first found window with a non-empty state
-                    # May return the wrong id if multiple windows are associated with the application
-                    window_id = win.id
-                    return
+            if matches(win):
+                window_id = win.id
+                return
             for w in win.query_tree().children:
                 if window_id is not None:
                     return
                 search(w)
 
-        search(root)
+        # EWMH window managers publish their managed top-level windows on the root window, which avoids
+        # walking the whole tree. Fall back to the recursive search if the property is missing.
+        client_list = root.get_full_property(self.display.intern_atom('_NET_CLIENT_LIST'), X.AnyPropertyType)
+        if client_list is not None:
+            for client_id in client_list.value:
+                client = self.display.create_resource_object('window', client_id)
+                if matches(client):
+                    window_id = client.id
+                    break
+        if window_id is None:
+            search(root)
+
         self.window_id = window_id
+        self._close_capture_backend()
+        if window_id:
+            self._watch_window()
         return window_id
 
+    def _watch_window(self):
+        """Subscribes to geometry, focus and destruction events for the window and seeds the cached state."""
+        window = self.display.create_resource_object('window', self.window_id)
+        window.change_attributes(event_mask=X.StructureNotifyMask | X.FocusChangeMask)
+
+        geom = window.get_geometry()
+        self.window_x, self.window_y = geom.x, geom.y
+        self.window_width, self.window_height = geom.width, geom.height
+        self.has_focus = self.display.get_input_focus().focus == self.window_id
+        self.needs_raise = True
+
+    def _poll_window_events(self):
+        """Drains queued X events without blocking and applies them to the cached window state."""
+        while self.display.pending_events():
+            self._handle_window_event(self.display.next_event())
+
+    def _handle_window_event(self, event):
+        if self.window_id is None or getattr(event, 'window', None) is None or event.window.id != self.window_id:
+            return
+
+        if event.type == X.ConfigureNotify:
+            if (event.x, event.y) != (self.window_x, self.window_y):
+                self.needs_raise = True
+            self.window_x, self.window_y = event.x, event.y
+            self.window_width, self.window_height = event.width, event.height
+        elif event.type == X.FocusIn:
+            self.has_focus = True
+        elif event.type == X.FocusOut:
+            # Focus moving to one of our own child windows, or a temporary keyboard grab, is not a loss of focus
+            if event.detail != X.NotifyInferior and event.mode == X.NotifyNormal:
+                self.has_focus = False
+        elif event.type == X.DestroyNotify:
+            logging.warning(f"Window {self.window_id} for {self.app_name} was destroyed.")
+            self.window_id = None
+            self.has_focus = False
+            self._close_capture_backend()
+
     def activate_window(self):
         if (not self.window_id):
             raise ValueError("window_id must be set, try running find_window_by_name before activate_window")
-        
-        d = Display()
-        window = d.create_resource_object('window', self.window_id)
 
-        d.set_input_focus(window, X.RevertToParent, X.CurrentTime)
-        window.configure(stack_mode=X.Above)
-
-        d.sync()
-
-    def get_image_from_window(self):
-        if (not self.window_id):
-            raise ValueError("window_id must be set, try running find_window_by_name before capture. Note: please activate the window.") 
+        window = self.display.create_resource_object('window', self.window_id)
 
-        d = Display()
-        window = d.create_resource_object('window', self.window_id)
+        self.display.set_input_focus(window, X.RevertToParent, X.CurrentTime)
+        window.configure(stack_mode=X.Above)
 
-        # Get window geometry including frame
+        self.display.sync()
+
+        # Confirm the window manager actually handed over focus; later changes arrive as FocusIn/FocusOut
+        self.has_focus = self.display.get_input_focus().focus == self.window_id
+        self.needs_raise = False
+
+    def _get_capture_backend(self):
+        """
+        Returns the XShm capture backend for the current window, creating it on first use.
+        Returns None if MIT-SHM is unavailable (or disabled), in which case captures fall back to pyscreenshot.
+        """
+        if self.capture_backend is None and self.use_xshm:
+            try:
+                self.capture_backend = XShmCapture(self.window_id)
+            except RuntimeError as error:
+                logging.warning(f"XShm capture unavailable, falling back to pyscreenshot: {error}")
+                self.use_xshm = False
+        return self.capture_backend
+
+    def _close_capture_backend(self):
+        if self.capture_backend is not None:
+            self.capture_backend.close()
+            self.capture_backend = None
+
+    def _grab_with_pyscreenshot(self, window) -> np.ndarray:
         geom = window.get_geometry()
         frame = window.query_tree().parent.get_geometry()
 
@@ -92,14 +182,45 @@ class RunningApplication():
 
         # Capture the specific screen area
         screenshot = ImageGrab.grab(bbox=(x, y, x + width, y + height))
+        return np.asarray(screenshot.convert('RGB'))
 
-        
-        # Resize the image to 540p resolution (960x540)
-        final_image = None
-        if (config.APP_RESIZE_REQUIRED):
-            resized_image = screenshot.resize((960, 540))
-            final_image = resized_image
-        else:
-            final_image = screenshot
+    def capture_window(self) -> np.ndarray:
+        """
+        Captures the window and returns it as an RGB numpy array, resized to 540p (960x540) if APP_RESIZE_REQUIRED.
 
-        return final_image
\ No newline at end of file
+        Returns:
+            np.ndarray: A (height, width, 3) RGB array owned by the caller.
+        """
+        if (not self.window_id):
+            raise ValueError("window_id must be set, try running find_window_by_name before capture. Note: please activate the window.")
+
+        self._poll_window_events()
+        if (not self.window_id):
+            raise RuntimeError(f"The {self.app_name} window was destroyed.")
+
+        backend = self._get_capture_backend()
+        if backend is not None:
+            try:
+                # BGRA view over the shared segment. Resizing and colour conversion read straight from it,
+                # so no intermediate copy of the full frame is made.
+                bgra = backend.grab(self.window_width, self.window_height)
+            except XShmAttachError as error:
+                logging.warning(f"XShm capture unavailable, falling back to pyscreenshot: {error}")
+                self._close_capture_backend()
+                self.use_xshm = False
+            else:
+                if config.APP_RESIZE_REQUIRED:
+                    bgra = cv2.resize(bgra, (960, 540), interpolation=cv2.INTER_AREA)
+                return cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB)
+
+        window = self.display.create_resource_object('window', self.window_id)
+        screenshot = self._grab_with_pyscreenshot(window)
+        if config.APP_RESIZE_REQUIRED:
+            screenshot = cv2.resize(screenshot, (960, 540), interpolation=cv2.INTER_AREA)
+        return screenshot
+
+    def get_image_from_window(self):
+        """
+        Returns a PIL Image of the window, resized to 540p resolution (960x540) if APP_RESIZE_REQUIRED.
+        """
+        return Image.fromarray(self.capture_window())
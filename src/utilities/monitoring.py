@@ -9,4 +9,33 @@ class Statistics:
         self.start = time.time()
 
     def get_time(self):
-        return time.time() - self.start
\ No newline at end of file
+        return time.time() - self.start
+
+# startup
+# Frameworks that dominate import time and memory. The startup report lists which of them were imported.
+HEAVY_MODULES = ("tensorflow", "torch", "ultralytics", "skimage", "cv2")
+
+class StartupReport:
+    """
+    Records how long each phase of startup takes, measured from when this module was first imported.
+    Call `mark(phase)` at the end of each phase, then log `report()`.
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._last = self.start
+        self.phases = []
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self) -> str:
+        import sys
+        phases = ", ".join(f"{phase}: {seconds:.2f}s" for phase, seconds in self.phases)
+        imported = [name for name in HEAVY_MODULES if name in sys.modules]
+        return (f"Startup took {self._last - self.start:.2f}s ({phases}). "
+                f"Heavy modules imported: {', '.join(imported) if imported else 'none'}. "
+                f"Run with `python -X importtime` for a per-module breakdown.")
+
+startup_report = StartupReport()
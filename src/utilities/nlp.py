@@ -1,5 +1,54 @@
-import time
+import json
 import re
+from typing import Optional
+
+# orjson is optional. It decodes the same JSON several times faster than the standard library, and its
+# JSONDecodeError subclasses json.JSONDecodeError, so callers handle errors from either decoder the same way.
+try:
+    import orjson
+
+    def decode_json(text: str):
+        return orjson.loads(text)
+except ImportError:
+    decode_json = json.loads
+
+class StateMatcher:
+    """
+    Extracts a state from free text with a table of regular expressions, in a single regex call.
+
+    The table is checked in order, and the first pattern found in the text wins, exactly as looping over the table
+    with `re.search` would. Every pattern is compiled into one alternation of lookaheads at construction, so the
+    regex engine tries the patterns in table order from the start of the text, and `lastgroup` names the winner.
+    Leading and trailing `.*` in the patterns are dropped, as they make no difference to where a pattern is found.
+
+    With `anchored=True`, patterns are only looked for on the first line, matching `re.match` with the table's
+    `.*`-prefixed patterns.
+    """
+    def __init__(self, mappings: dict, default: Optional[str] = None, flags: int = re.IGNORECASE, anchored: bool = False):
+        self.mappings = dict(mappings)
+        self.default = default
+        self._states = {}
+        alternatives = []
+        # The lookahead scans the text, either across lines or only the first line
+        prefix = ".*?" if anchored else r"[\s\S]*?"
+        for index, (pattern, state) in enumerate(self.mappings.items()):
+            group = f"_{index}"
+            self._states[group] = state
+            alternatives.append(f"(?={prefix}(?:{self._strip_wildcards(pattern)}))(?P<{group}>)")
+        self._regex = re.compile(r"\A(?:" + "|".join(alternatives) + ")", flags) if alternatives else None
+
+    @staticmethod
+    def _strip_wildcards(pattern: str) -> str:
+        if pattern.startswith(".*"):
+            pattern = pattern[2:]
+        if pattern.endswith(".*") and not pattern.endswith("\\.*"):
+            pattern = pattern[:-2]
+        return pattern
+
+    def match(self, text: str) -> Optional[str]:
+        """The state of the first pattern in the table found in the text, or the default if none is."""
+        found = self._regex.match(text) if self._regex is not None else None
+        return self._states[found.lastgroup] if found else self.default
 
 # Sample state mappings
 state_mappings = {
@@ -10,31 +59,9 @@ state_mappings = {
     r".*full-time.*": "IN-MENU-FULL-TIME"
 }
 
+# The mappings are matched from the start of the text, like re.match. No match returns None.
+state_matcher = StateMatcher(state_mappings, anchored=True)
+
 # Function to extract state from text
 def extract_state_from_text(text):
-    for pattern, state in state_mappings.items():
-        if re.match(pattern, text, re.IGNORECASE):
-            return state
-    return None  # Default or error state if no match is found
-
-# Evaluate performance
-test_texts = ["The game is currently in the main menu", "Selecting opponent in squad battles", "Half-time menu", "In match", "Full-time menu"]
-expected_states = ["IN-MENU", "IN-MENU-SQUAD-BATTLES-OPPONENT-SELECT", "IN-MENU-HALF-TIME", "IN-MATCH", "IN-MENU-FULL-TIME"]
-
-# Measure accuracy
-correct_predictions = 0
-for text, expected in zip(test_texts, expected_states):
-    predicted = extract_state_from_text(text)
-    if predicted == expected:
-        correct_predictions += 1
-accuracy = correct_predictions / len(test_texts)
-print(f"Accuracy: {accuracy * 100:.2f}%")
-
-# Measure speed
-start_time = time.time()
-for _ in range(1000):
-    for text in test_texts:
-        extract_state_from_text(text)
-end_time = time.time()
-average_time = (end_time - start_time) / (1000 * len(test_texts))
-print(f"Average processing time: {average_time * 1000:.2f} ms")
+    return state_matcher.match(text)
@@ -0,0 +1,190 @@
+import logging
+import os
+import re
+import time
+
+import cv2
+import numpy as np
+
+from utilities.video_recorder import MJPEG, MP4, read_index
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+SEGMENT_EXTENSIONS = (f".{MJPEG}", f".{MP4}")
+
+REALTIME = "realtime"
+FIXED = "fixed"
+FAST = "fast"
+
+# Screenshots are saved as e.g. new-screenshot1739124955.0942311.png
+_timestamp_pattern = re.compile(r"(\d{9,}(?:\.\d+)?)")
+
+def _timestamp_from_filename(path: str) -> float:
+    match = _timestamp_pattern.search(os.path.basename(path))
+    return float(match.group(1)) if match else os.path.getmtime(path)
+
+def _decode_image(path: str) -> np.ndarray:
+    bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise ValueError(f"Unable to decode image {path}")
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+def _decode_jpeg(data) -> np.ndarray:
+    return cv2.cvtColor(cv2.imdecode(np.asarray(data), cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB)
+
+class _Mp4Reader:
+    """
+    Decodes the frames of an mp4 segment on demand. Replays read frames in order, so the capture is only
+    repositioned when a frame other than the next one is requested, and it is released after the last frame.
+    """
+    def __init__(self, path: str, frame_count: int):
+        self.path = path
+        self.frame_count = frame_count
+        self._capture = None
+        self._next_frame = 0
+
+    def read(self, frame_number: int) -> np.ndarray:
+        if self._capture is None:
+            self._capture = cv2.VideoCapture(self.path)
+            self._next_frame = 0
+        if frame_number != self._next_frame:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        succeeded, bgr = self._capture.read()
+        self._next_frame = frame_number + 1
+        if self._next_frame >= self.frame_count:
+            self._capture.release()
+            self._capture = None
+        if not succeeded:
+            raise ValueError(f"Frame {frame_number} could not be read from {self.path}")
+        return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+class ReplayApplication:
+    """
+    A capture source that replays recorded frames through the same interface as RunningApplication,
+    so the whole capture/inference/control stack can run without the game.
+
+    Sources can be a single image, a directory of screenshots (.png/.jpg/.webp/.npy) or recorded video
+    segments (see SegmentedVideoRecorder). By default frames are memory-mapped or read from disk and decoded on
+    demand, so a long session doesn't have to fit in memory; `preload=True` decodes every frame up front. Original capture timestamps are kept and exposed as `last_source_timestamp`.
+
+    Pacing:
+        "realtime": reproduces the original gaps between capture timestamps (gaps longer than
+            `max_gap_seconds` are shortened, so pauses between sessions don't stall playback).
+        "fixed": plays at `fps` frames per second.
+        "fast": returns frames as fast as they are requested.
+    """
+    def __init__(self, frames: list, timestamps: list, pacing: str = REALTIME, fps: float = 30.0, loop: bool = True,
+                 max_gap_seconds: float = 1.0):
+        if pacing not in (REALTIME, FIXED, FAST):
+            raise ValueError(f"Unsupported replay pacing: {pacing}, expected one of: {REALTIME}, {FIXED}, {FAST}")
+        if not frames:
+            raise ValueError("A replay needs at least one frame")
+        self.app_name = "replay"
+        self.frames = frames
+        self.timestamps = timestamps
+        self.pacing = pacing
+        self.fps = fps
+        self.loop = loop
+        self.max_gap_seconds = max_gap_seconds
+
+        self.position = 0
+        self.last_source_timestamp = None
+        self._due = None
+
+    @classmethod
+    def from_path(cls, path: str, preload: bool = False, **kwargs):
+        """
+        Builds a replay from an image file, a .npy file, a recorded segment, or a directory containing any of them.
+        Frames are ordered by their original capture timestamps.
+        """
+        if os.path.isdir(path):
+            paths = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+        else:
+            paths = [path]
+
+        entries = []
+        for file_path in paths:
+            entries.extend(cls._load_entries(file_path, preload))
+        entries.sort(key=lambda entry: entry[0])
+        logger.info(f"Loaded {len(entries)} frames to replay from {path}")
+
+        return cls([frame for _, frame in entries], [timestamp for timestamp, _ in entries], **kwargs)
+
+    @staticmethod
+    def _load_entries(path: str, preload: bool) -> list:
+        """Returns (timestamp, frame) pairs for a file, where frame is an array or a zero-argument loader."""
+        extension = os.path.splitext(path)[1].lower()
+        if extension in IMAGE_EXTENSIONS:
+            frame = _decode_image(path) if preload else (lambda: _decode_image(path))
+            return [(_timestamp_from_filename(path), frame)]
+        if extension == ".npy":
+            return [(_timestamp_from_filename(path), np.load(path, mmap_mode=None if preload else 'r'))]
+        if extension == f".{MJPEG}":
+            index = read_index(path)
+            data = np.memmap(path, dtype=np.uint8, mode='r')
+            entries = []
+            for record in index:
+                start, end = int(record["offset"]), int(record["offset"] + record["length"])
+                jpeg = data[start:end]
+                frame = _decode_jpeg(jpeg) if preload else (lambda jpeg=jpeg: _decode_jpeg(jpeg))
+                entries.append((float(record["timestamp"]), frame))
+            return entries
+        if extension == f".{MP4}":
+            index = read_index(path)
+            reader = _Mp4Reader(path, len(index))
+            if not preload:
+                return [(float(record["timestamp"]), lambda frame_number=frame_number: reader.read(frame_number))
+                        for frame_number, record in enumerate(index)]
+            entries = []
+            for frame_number, record in enumerate(index):
+                entries.append((float(record["timestamp"]), reader.read(frame_number)))
+            return entries
+        return []
+
+    def activate(self):
+        pass
+
+    def is_app_active(self) -> bool:
+        return True
+
+    def _wait_until_due(self, index: int):
+        now = time.monotonic()
+        if self.pacing == FAST or self._due is None:
+            self._due = now
+            return
+
+        if self.pacing == FIXED or len(self.frames) == 1:
+            interval = 1.0 / self.fps
+        else:
+            interval = self.timestamps[index] - self.timestamps[index - 1] if index > 0 else 0.0
+            interval = min(max(interval, 0.0), self.max_gap_seconds)
+
+        self._due += interval
+        if self._due > now:
+            time.sleep(self._due - now)
+        else:
+            # Running behind; don't try to catch up with a burst of frames
+            self._due = now
+
+    def capture_window(self) -> np.ndarray:
+        """
+        Returns the next frame as an RGB array, sleeping as needed to honour the pacing.
+
+        Raises:
+            EOFError: When the replay is exhausted and `loop` is False.
+        """
+        if self.position >= len(self.frames):
+            if not self.loop:
+                raise EOFError("Replay finished")
+            self.position = 0
+
+        index = self.position
+        self._wait_until_due(index)
+
+        frame = self.frames[index]
+        if callable(frame):
+            frame = frame()
+        self.position += 1
+        self.last_source_timestamp = self.timestamps[index]
+        return np.asarray(frame)
@@ -0,0 +1,185 @@
+import io
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop-oldest"
+DROP_NEWEST = "drop-newest"
+
+def _to_bgr(image: np.ndarray, keep_alpha: bool) -> np.ndarray:
+    """Converts an RGB(A) frame to the BGR(A) channel order OpenCV encoders expect."""
+    if image.ndim == 2:
+        return image
+    if image.shape[-1] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_RGBA2BGRA if keep_alpha else cv2.COLOR_RGBA2BGR)
+    return cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+
+class PngEncoder:
+    extension = "png"
+
+    def __init__(self, compression: int = 1):
+        # OpenCV's scale is 0-9. Low levels are several times faster than PIL's default of 6 for a modest size increase.
+        self.params = [cv2.IMWRITE_PNG_COMPRESSION, compression]
+
+    def encode(self, image: np.ndarray) -> bytes:
+        return cv2.imencode(".png", _to_bgr(image, keep_alpha=True), self.params)[1].tobytes()
+
+class JpegEncoder:
+    extension = "jpg"
+
+    def __init__(self, quality: int = 90):
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+
+    def encode(self, image: np.ndarray) -> bytes:
+        return cv2.imencode(".jpg", _to_bgr(image, keep_alpha=False), self.params)[1].tobytes()
+
+class WebpEncoder:
+    extension = "webp"
+
+    def __init__(self, quality: int = 90):
+        # Quality above 100 selects lossless WebP
+        self.params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+
+    def encode(self, image: np.ndarray) -> bytes:
+        return cv2.imencode(".webp", _to_bgr(image, keep_alpha=True), self.params)[1].tobytes()
+
+class NpyEncoder:
+    """Stores the raw RGB(A) array. Costs almost no CPU, at the price of uncompressed files."""
+    extension = "npy"
+
+    def encode(self, image: np.ndarray) -> bytes:
+        buffer = io.BytesIO()
+        np.save(buffer, image, allow_pickle=False)
+        return buffer.getvalue()
+
+ENCODERS = {
+    "png": PngEncoder,
+    "jpeg": JpegEncoder,
+    "jpg": JpegEncoder,
+    "webp": WebpEncoder,
+    "npy": NpyEncoder,
+}
+
+def create_encoder(name: str, quality: int = 90):
+    """Creates an encoder by name: png, jpeg, webp or npy."""
+    name = name.lower()
+    if name not in ENCODERS:
+        raise ValueError(f"Unsupported screenshot encoder: {name}, expected one of: {', '.join(ENCODERS)}")
+    if name in ("jpeg", "jpg", "webp"):
+        return ENCODERS[name](quality)
+    return ENCODERS[name]()
+
+class ScreenshotArchiver:
+    """
+    Encodes and writes screenshots on a pool of worker threads, off the asyncio event loop.
+
+    The queue is bounded. When it is full, the drop policy decides whether the oldest queued frame
+    ("drop-oldest") or the frame being submitted ("drop-newest") is discarded, so a slow disk costs
+    frames instead of latency or memory. OpenCV's encoders release the GIL, so threads encode in parallel.
+
+    Metrics: `queue_depth()`, `frames_submitted`, `frames_written`, `frames_dropped`, `bytes_written`,
+    and `encode_seconds` (total time spent encoding).
+    """
+    def __init__(self, directory: str, encoder, max_queue_size: int = 32, workers: int = 2, drop_policy: str = DROP_OLDEST):
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unsupported drop policy: {drop_policy}, expected {DROP_OLDEST} or {DROP_NEWEST}")
+        self.directory = directory
+        self.encoder = encoder
+        self.max_queue_size = max_queue_size
+        self.drop_policy = drop_policy
+
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+        self.encode_seconds = 0.0
+
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._workers = [
+            threading.Thread(target=self._run, name=f"ScreenshotArchiver-{i}", daemon=True) for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def queue_depth(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def submit(self, image: np.ndarray, filename_stem: str) -> bool:
+        """
+        Queues a frame to be written as `<directory>/<filename_stem>.<extension>`.
+
+        The frame is copied on submit, because capture frames are views into a ring buffer that will be reused.
+
+        Returns:
+            bool: False if the frame was dropped because the queue was full (drop-newest policy) or the archiver is closed.
+        """
+        path = os.path.join(self.directory, f"{filename_stem}.{self.encoder.extension}")
+        return self._enqueue(lambda: (np.array(image, copy=True), path))
+
+    def _enqueue(self, make_item) -> bool:
+        """Applies the drop policy and queues the item built by `make_item`, which is only called if the item is kept."""
+        with self._condition:
+            if self._closed:
+                return False
+            self.frames_submitted += 1
+            if len(self._queue) >= self.max_queue_size:
+                self.frames_dropped += 1
+                if self.drop_policy == DROP_NEWEST:
+                    return False
+                self._queue.popleft()
+            self._queue.append(make_item())
+            self._condition.notify()
+        return True
+
+    def _process(self, item):
+        """
+        Encodes and writes one queued item on a worker thread.
+
+        Returns:
+            tuple: (bytes written, seconds spent encoding)
+        """
+        image, path = item
+        before_encode = time.perf_counter()
+        data = self.encoder.encode(image)
+        encode_seconds = time.perf_counter() - before_encode
+        with open(path, 'wb') as out_file:
+            out_file.write(data)
+        return len(data), encode_seconds
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                item = self._queue.popleft()
+
+            try:
+                bytes_written, encode_seconds = self._process(item)
+                with self._condition:
+                    self.frames_written += 1
+                    self.bytes_written += bytes_written
+                    self.encode_seconds += encode_seconds
+            except Exception as argument:
+                logger.error(f"Failed to archive screenshot: {argument}")
+
+    def close(self, timeout: float = None):
+        """Stops accepting frames, drains the queue and waits for the workers to finish."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
@@ -1,11 +1,13 @@
 import asyncio
-import torch
+import logging
+import time
 
 from asyncio import Event, Queue
 from collections import deque
 from threading import Lock
-from inference.yolo_object_detector import YoloObjectDetector
+from inference.model_registry import create_yolo_detector, model_registry, yolo_detector_key
 from utilities import config
+from utilities.capture_rate_governor import CaptureRateGovernor
 
 # TODO: Split file into package. Each class requires it's own file.
 
@@ -64,6 +66,9 @@ class ThreadSafeDeque:
 class SharedProgramData:
     """
     A multiprocessing-safe singleton using CUDA preloading.
+
+    Models are not loaded on construction. `start_model_loading()` loads them on a background thread once the
+    event loop runs, so capture can start straight away, and `wait_for_models()` lets handlers wait until they are ready.
     """
     _instance = None
 
@@ -73,20 +78,84 @@ class SharedProgramData:
             cls._instance.latest_screenshot = Queue(maxsize=1)
             cls._instance.inference_completed_event = Event()
             cls._instance.exit_event = Event()
-
-            # Initialize CUDA once in the main process
-            if torch.cuda.is_available():
-                print("[Main] Initializing CUDA once...")
-                torch.cuda.init()
-                torch.cuda.synchronize()
-
-            # Load YOLO model into CUDA memory only once
-            print("[Main] Loading YOLO model onto GPU...")
-            # TODO: Test and evaluate whether having the initialize code in here is necessary
-            cls._instance.rush_detection_model = YoloObjectDetector(config.HF_RUSH_DETECTION_PATH, config.HF_RUSH_DETECTION_FILENAME)
-            if torch.cuda.is_available():
-                cls._instance.rush_detection_model.model.to("cuda")  # Load onto GPU
-                torch.cuda.synchronize()
-                print("[Main] YOLO model loaded and CUDA ready.")
+            # Shared by the capture worker, capture handler and inference pipeline to pace captures
+            cls._instance.capture_rate_governor = None
+            if config.CAPTURE_RATE_GOVERNOR_ENABLED:
+                if config.CAPTURE_IMAGE_THREAD_DELAY_SECONDS:
+                    logging.getLogger(__name__).warning(
+                        "CAPTURE_RATE_GOVERNOR_ENABLED is set, so CAPTURE_IMAGE_THREAD_DELAY_SECONDS is ignored.")
+                cls._instance.capture_rate_governor = CaptureRateGovernor(config.CAPTURE_MIN_FPS, config.CAPTURE_MAX_FPS)
+
+            cls._instance.rush_detection_model = None
+            # Set instead of rush_detection_model when the detector runs in worker processes
+            cls._instance.rush_worker_pool = None
+            cls._instance.models_ready = Event()
+            cls._instance.model_loading_task = None
+            cls._instance.model_loading_error = None
+            cls._instance._model_lock = Lock()
 
         return cls._instance
+
+    def load_models(self):
+        """Loads the models synchronously, if they are not loaded yet. Used by background loading."""
+        with self._model_lock:
+            if self.rush_detection_model is not None or self.rush_worker_pool is not None:
+                return
+            logger = logging.getLogger(__name__)
+            before_load = time.perf_counter()
+            if config.INFERENCE_WORKER_PROCESSES > 0:
+                # Each worker process loads its own copy of the detector
+                from inference.inference_worker_pool import InferenceWorkerPool
+                self.rush_worker_pool = InferenceWorkerPool(config.INFERENCE_WORKER_PROCESSES).start()
+            else:
+                self._load_rush_detection_model()
+            logger.info(f"Models loaded in {time.perf_counter() - before_load:.2f} seconds.")
+
+    def _load_rush_detection_model(self):
+        import torch
+
+        # Initialize CUDA once in the main process
+        if torch.cuda.is_available():
+            print("[Main] Initializing CUDA once...")
+            torch.cuda.init()
+            torch.cuda.synchronize()
+
+        # Load YOLO model into CUDA memory only once. The detector is registered in the model registry and
+        # never released, so RushInference shares this instance and it is never evicted.
+        print("[Main] Loading YOLO model onto GPU...")
+        from inference.yolo_object_detector import YoloObjectDetector
+        self.rush_detection_model = model_registry.acquire(
+            yolo_detector_key(config.HF_RUSH_DETECTION_PATH, config.HF_RUSH_DETECTION_FILENAME),
+            lambda: create_yolo_detector(config.HF_RUSH_DETECTION_PATH, config.HF_RUSH_DETECTION_FILENAME),
+            YoloObjectDetector.warmup
+        )
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+            print("[Main] YOLO model loaded and CUDA ready.")
+
+    def start_model_loading(self):
+        """Starts loading the models on a background thread. Must be called from the running event loop."""
+        if self.model_loading_task is None:
+            self.model_loading_task = asyncio.get_running_loop().create_task(self._load_models_in_background())
+        return self.model_loading_task
+
+    async def _load_models_in_background(self):
+        try:
+            await asyncio.to_thread(self.load_models)
+        except Exception as argument:
+            logging.getLogger(__name__).error(f"Model loading failed: {argument}")
+            self.model_loading_error = argument
+        finally:
+            self.models_ready.set()
+
+    async def wait_for_models(self):
+        """
+        Waits until background model loading has finished. Returns immediately if loading was never started.
+
+        Raises:
+            Exception: The error that model loading failed with.
+        """
+        if self.model_loading_task is not None:
+            await self.models_ready.wait()
+        if self.model_loading_error is not None:
+            raise self.model_loading_error
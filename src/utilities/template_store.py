@@ -0,0 +1,179 @@
+import os
+import threading
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+# Constants matching skimage.metrics.structural_similarity's defaults for uint8 images:
+# a 7x7 uniform window, sample covariance, K1=0.01, K2=0.03 and a data range of 255.
+SSIM_WINDOW_SIZE = 7
+_DATA_RANGE = 255.0
+_C1 = (0.01 * _DATA_RANGE) ** 2
+_C2 = (0.03 * _DATA_RANGE) ** 2
+# cv2.blur handles at most this many channels in one call
+_MAX_CHANNELS = 512
+
+def batched_ssim(images: np.ndarray, templates: np.ndarray) -> np.ndarray:
+    """
+    Computes the mean SSIM between pairs of equally sized grayscale images in one vectorized pass.
+
+    Args:
+        images (np.ndarray): (H, W) or (H, W, N) stack of images.
+        templates (np.ndarray): (H, W) or (H, W, N) stack of templates, compared channel by channel with `images`.
+
+    Returns:
+        np.ndarray: N SSIM scores. Matches skimage's `structural_similarity` with default arguments for uint8 inputs.
+    """
+    x = np.asarray(images, dtype=np.float32)
+    y = np.asarray(templates, dtype=np.float32)
+    if x.ndim == 2:
+        x = x[..., np.newaxis]
+    if y.ndim == 2:
+        y = y[..., np.newaxis]
+    x, y = np.broadcast_arrays(x, y)
+    height, width, count = x.shape
+    if height < SSIM_WINDOW_SIZE or width < SSIM_WINDOW_SIZE:
+        raise ValueError(f"Images must be at least {SSIM_WINDOW_SIZE}x{SSIM_WINDOW_SIZE} for SSIM, got {width}x{height}")
+
+    if count > _MAX_CHANNELS:
+        return np.concatenate([
+            batched_ssim(x[..., start:start + _MAX_CHANNELS], y[..., start:start + _MAX_CHANNELS])
+            for start in range(0, count, _MAX_CHANNELS)
+        ])
+
+    def mean_filter(array):
+        filtered = cv2.blur(np.ascontiguousarray(array), (SSIM_WINDOW_SIZE, SSIM_WINDOW_SIZE), borderType=cv2.BORDER_REFLECT)
+        return filtered.reshape(height, width, count)
+
+    window_pixels = SSIM_WINDOW_SIZE * SSIM_WINDOW_SIZE
+    covariance_norm = window_pixels / (window_pixels - 1)
+
+    ux, uy = mean_filter(x), mean_filter(y)
+    vx = covariance_norm * (mean_filter(x * x) - ux * ux)
+    vy = covariance_norm * (mean_filter(y * y) - uy * uy)
+    vxy = covariance_norm * (mean_filter(x * y) - ux * uy)
+
+    numerator = (2 * ux * uy + _C1) * (2 * vxy + _C2)
+    denominator = (ux * ux + uy * uy + _C1) * (vx + vy + _C2)
+    ssim_map = numerator / denominator
+
+    # Like skimage, ignore the border where the window overlaps the padding
+    pad = (SSIM_WINDOW_SIZE - 1) // 2
+    return ssim_map[pad:height - pad, pad:width - pad].mean(axis=(0, 1), dtype=np.float64)
+
+def ssim(image: np.ndarray, template: np.ndarray) -> float:
+    """Mean SSIM between two equally sized grayscale images."""
+    return float(batched_ssim(image, template)[0])
+
+class TemplateStore:
+    """
+    Loads grayscale templates from disk once and keeps them, and any cropped regions of them, in memory.
+
+    A frame can be compared against many (template, region) candidates in one call with `compare()` or
+    `best_match()`. Candidates with equally sized regions are stacked and scored in a single SSIM pass.
+    Cached templates and regions are read-only.
+    """
+    def __init__(self, directory: str = "screenshots"):
+        self.directory = directory
+        self._templates = {}
+        self._regions = {}
+        self._lock = threading.Lock()
+
+    def get(self, template_name: str) -> np.ndarray:
+        """Returns the grayscale template, loading it from disk on first use."""
+        template = self._templates.get(template_name)
+        if template is None:
+            path = os.path.join(self.directory, template_name)
+            bgr = cv2.imread(path)
+            if bgr is None:
+                raise FileNotFoundError(f"Unable to load template {path}")
+            template = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+            template.flags.writeable = False
+            with self._lock:
+                template = self._templates.setdefault(template_name, template)
+        return template
+
+    def region(self, template_name: str, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """Returns a cropped region of the template as a contiguous array, cropping it on first use."""
+        key = (template_name, x, y, width, height)
+        region = self._regions.get(key)
+        if region is None:
+            region = np.ascontiguousarray(self.get(template_name)[y:y + height, x:x + width])
+            region.flags.writeable = False
+            with self._lock:
+                region = self._regions.setdefault(key, region)
+        return region
+
+    def preload(self, template_names):
+        """Loads templates ahead of time, so the first comparison doesn't pay for disk access."""
+        for template_name in template_names:
+            self.get(template_name)
+
+    def compare(self, grayscale_image: np.ndarray, candidates, fast_reject_scale: float = None,
+                fast_reject_threshold: float = 0.0) -> np.ndarray:
+        """
+        Scores a grayscale frame against many templates with SSIM.
+
+        Args:
+            grayscale_image (np.ndarray): The frame, the same size as the templates.
+            candidates (list): (template_name, region) pairs, where region is (x, y, width, height) or None
+                for the whole template. The same region of the frame is compared.
+            fast_reject_scale (float): If set, candidates are first scored on copies downscaled by this factor,
+                and only those scoring at least `fast_reject_threshold` are scored at full resolution.
+
+        Returns:
+            np.ndarray: One score per candidate. Rejected candidates score NaN.
+        """
+        scores = np.full(len(candidates), np.nan)
+        remaining = list(range(len(candidates)))
+
+        if fast_reject_scale:
+            def downscale(array):
+                size = (max(SSIM_WINDOW_SIZE, round(array.shape[1] * fast_reject_scale)),
+                        max(SSIM_WINDOW_SIZE, round(array.shape[0] * fast_reject_scale)))
+                return cv2.resize(array, size, interpolation=cv2.INTER_AREA)
+            coarse_scores = self._score(grayscale_image, candidates, remaining, downscale)
+            remaining = [index for index in remaining if coarse_scores[index] >= fast_reject_threshold]
+
+        full_scores = self._score(grayscale_image, candidates, remaining)
+        scores[remaining] = full_scores[remaining]
+        return scores
+
+    def best_match(self, grayscale_image: np.ndarray, candidates, **kwargs):
+        """
+        Returns the (template_name, region) candidate that best matches the frame and its SSIM score,
+        or (None, None) if every candidate was rejected. Keyword arguments are passed to `compare()`.
+        """
+        scores = self.compare(grayscale_image, candidates, **kwargs)
+        if np.all(np.isnan(scores)):
+            return None, None
+        best = int(np.nanargmax(scores))
+        return candidates[best], float(scores[best])
+
+    def _score(self, grayscale_image: np.ndarray, candidates, indices, transform=None) -> np.ndarray:
+        scores = np.full(len(candidates), np.nan)
+
+        # Group candidates by region size, so each group is one stacked SSIM call
+        groups = defaultdict(lambda: ([], [], []))
+        for index in indices:
+            template_name, region = candidates[index]
+            if region is None:
+                template = self.get(template_name)
+                image = grayscale_image
+            else:
+                x, y, width, height = region
+                template = self.region(template_name, x, y, width, height)
+                image = grayscale_image[y:y + height, x:x + width]
+            if image.shape != template.shape:
+                raise ValueError(f"Frame region {image.shape} does not match template {template_name} {template.shape}")
+            if transform:
+                image, template = transform(image), transform(template)
+            group_indices, images, templates = groups[template.shape]
+            group_indices.append(index)
+            images.append(image)
+            templates.append(template)
+
+        for group_indices, images, templates in groups.values():
+            scores[group_indices] = batched_ssim(np.stack(images, axis=-1), np.stack(templates, axis=-1))
+        return scores
@@ -0,0 +1,171 @@
+import logging
+import os
+import time
+
+import cv2
+import numpy as np
+
+from utilities.screenshot_archiver import DROP_OLDEST, JpegEncoder, ScreenshotArchiver
+
+logger = logging.getLogger(__name__)
+
+# One fixed-size record per frame in a segment's `.idx` sidecar, so the index can be read with np.fromfile.
+# `frame` is the frame number within the segment and `timestamp` the wall-clock capture time.
+# `offset`/`length` locate the JPEG bytes inside an MJPEG segment; they are 0 for MP4 segments.
+INDEX_DTYPE = np.dtype([
+    ("frame", "<u4"),
+    ("timestamp", "<f8"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+])
+
+MJPEG = "mjpeg"
+MP4 = "mp4"
+
+def index_path(segment_path: str) -> str:
+    return f"{segment_path}.idx"
+
+def read_index(segment_path: str) -> np.ndarray:
+    """Reads the frame index sidecar of a recorded segment as a structured array of INDEX_DTYPE."""
+    return np.fromfile(index_path(segment_path), dtype=INDEX_DTYPE)
+
+def read_frame(segment_path: str, frame_number: int, index: np.ndarray = None) -> np.ndarray:
+    """
+    Random-access read of a single frame from a recorded segment.
+
+    Args:
+        segment_path (str): Path to the .mjpeg or .mp4 segment.
+        frame_number (int): Frame number within the segment.
+        index (np.ndarray): The segment's index, if already loaded.
+
+    Returns:
+        np.ndarray: The frame as an RGB array.
+    """
+    if segment_path.endswith(f".{MJPEG}"):
+        record = (read_index(segment_path) if index is None else index)[frame_number]
+        with open(segment_path, 'rb') as segment:
+            segment.seek(int(record["offset"]))
+            data = segment.read(int(record["length"]))
+        bgr = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    else:
+        capture = cv2.VideoCapture(segment_path)
+        try:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            succeeded, bgr = capture.read()
+        finally:
+            capture.release()
+        if not succeeded:
+            raise IndexError(f"Frame {frame_number} could not be read from {segment_path}")
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+class SegmentedVideoRecorder(ScreenshotArchiver):
+    """
+    Records captured frames into time-segmented video files instead of one image file per frame.
+
+    Each segment gets a `.idx` sidecar (see INDEX_DTYPE) so notebooks can seek straight to a frame.
+    The "mjpeg" container is a plain concatenation of JPEG frames, which makes every frame independently
+    decodable at a known byte offset. The "mp4" container uses OpenCV's VideoWriter and is much smaller,
+    but frames are located by frame number and decoding may need to start from a keyframe.
+
+    Frames are queued and written by a single background thread, with the same bounded queue, drop policy
+    and metrics as ScreenshotArchiver.
+    """
+    def __init__(self, directory: str, segment_seconds: float = 60, container: str = MJPEG, fps: float = 30,
+                 quality: int = 90, max_queue_size: int = 64, drop_policy: str = DROP_OLDEST):
+        if container not in (MJPEG, MP4):
+            raise ValueError(f"Unsupported video container: {container}, expected {MJPEG} or {MP4}")
+        self.segment_seconds = segment_seconds
+        self.container = container
+        self.fps = fps
+        self.segments_written = []
+
+        self._segment_path = None
+        self._segment_file = None
+        self._video_writer = None
+        self._index_file = None
+        self._segment_start = None
+        self._segment_shape = None
+        self._segment_frames = 0
+
+        # A single worker keeps frames in order within a segment
+        super().__init__(directory, JpegEncoder(quality), max_queue_size=max_queue_size, workers=1, drop_policy=drop_policy)
+
+    def submit(self, image: np.ndarray, filename_stem: str = None, *, capture_time: float = None) -> bool:
+        """
+        Queues a frame to be appended to the current segment.
+
+        Takes the same arguments as ScreenshotArchiver.submit, so either can be used. Segments are named after their
+        first frame's capture time, so `filename_stem` is not used; `capture_time` defaults to now.
+
+        Returns:
+            bool: False if the frame was dropped because the queue was full (drop-newest policy) or the recorder is closed.
+        """
+        capture_time = capture_time if capture_time is not None else time.time()
+        return self._enqueue(lambda: (np.array(image, copy=True), capture_time))
+
+    def _open_segment(self, image: np.ndarray, capture_time: float):
+        self._close_segment()
+
+        self._segment_path = os.path.join(self.directory, f"recording-{int(capture_time * 1000)}.{self.container}")
+        if self.container == MJPEG:
+            self._segment_file = open(self._segment_path, 'wb')
+        else:
+            height, width = image.shape[:2]
+            self._video_writer = cv2.VideoWriter(self._segment_path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, (width, height))
+            if not self._video_writer.isOpened():
+                raise RuntimeError(f"Unable to open video writer for {self._segment_path}")
+        self._index_file = open(index_path(self._segment_path), 'wb')
+        self._segment_start = capture_time
+        self._segment_shape = image.shape
+        self._segment_frames = 0
+        logger.info(f"Recording new segment {self._segment_path}")
+
+    def _close_segment(self):
+        if self._segment_path is None:
+            return
+        if self._segment_file:
+            self._segment_file.close()
+        if self._video_writer:
+            self._video_writer.release()
+        self._index_file.close()
+        self.segments_written.append(self._segment_path)
+        self._segment_path = self._segment_file = self._video_writer = self._index_file = None
+
+    def _process(self, item):
+        image, capture_time = item
+        if self._segment_path is None \
+            or image.shape != self._segment_shape \
+            or capture_time - self._segment_start >= self.segment_seconds:
+            self._open_segment(image, capture_time)
+
+        record = np.zeros(1, dtype=INDEX_DTYPE)
+        record["frame"] = self._segment_frames
+        record["timestamp"] = capture_time
+
+        before_encode = time.perf_counter()
+        if self.container == MJPEG:
+            data = self.encoder.encode(image)
+            encode_seconds = time.perf_counter() - before_encode
+            record["offset"] = self._segment_file.tell()
+            record["length"] = len(data)
+            self._segment_file.write(data)
+            bytes_written = len(data)
+        else:
+            if image.ndim == 2:
+                # The writer was opened for colour frames
+                code = cv2.COLOR_GRAY2BGR
+            else:
+                code = cv2.COLOR_RGBA2BGR if image.shape[-1] == 4 else cv2.COLOR_RGB2BGR
+            bgr = cv2.cvtColor(image, code)
+            self._video_writer.write(bgr)
+            encode_seconds = time.perf_counter() - before_encode
+            bytes_written = 0
+
+        self._index_file.write(record.tobytes())
+        self._segment_frames += 1
+        return bytes_written + INDEX_DTYPE.itemsize, encode_seconds
+
+    def close(self, timeout: float = None):
+        """Drains the queue and finalizes the current segment and its index."""
+        super().close(timeout)
+        self._close_segment()
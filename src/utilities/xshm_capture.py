@@ -0,0 +1,258 @@
+import ctypes
+import ctypes.util
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Constants from X11/X.h and sys/ipc.h
+ZPixmap = 2
+AllPlanes = ctypes.c_ulong(-1).value
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+# shmat returns (void *) -1 on failure
+SHMAT_FAILED = ctypes.c_void_p(-1).value
+
+class XImage(ctypes.Structure):
+    """The leading (public) fields of Xlib's XImage structure."""
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+    ]
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("resourceid", ctypes.c_ulong),
+        ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte),
+        ("request_code", ctypes.c_ubyte),
+        ("minor_code", ctypes.c_ubyte),
+    ]
+
+class XShmAttachError(RuntimeError):
+    """The X server could not attach the shared segment, e.g. because the display is remote or forwarded."""
+
+XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+
+_libraries = None
+
+def _load_libraries():
+    """Loads and declares the libX11, libXext and libc functions used by XShmCapture, once per process."""
+    global _libraries
+    if _libraries is not None:
+        return _libraries
+
+    x11_path = ctypes.util.find_library("X11")
+    xext_path = ctypes.util.find_library("Xext")
+    if not x11_path or not xext_path:
+        raise RuntimeError("libX11 and libXext are required for XShm capture")
+
+    x11 = ctypes.CDLL(x11_path)
+    xext = ctypes.CDLL(xext_path)
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XOpenDisplay.restype = ctypes.c_void_p
+    x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDefaultVisual.restype = ctypes.c_void_p
+    x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDestroyImage.argtypes = [ctypes.POINTER(XImage)]
+    x11.XSetErrorHandler.argtypes = [XErrorHandler]
+    x11.XSetErrorHandler.restype = ctypes.c_void_p
+
+    xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+    xext.XShmCreateImage.argtypes = [
+        ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p,
+        ctypes.POINTER(XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint
+    ]
+    xext.XShmCreateImage.restype = ctypes.POINTER(XImage)
+    xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+    xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(XShmSegmentInfo)]
+    xext.XShmGetImage.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XImage), ctypes.c_int, ctypes.c_int, ctypes.c_ulong
+    ]
+
+    libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+    libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    libc.shmat.restype = ctypes.c_void_p
+    libc.shmdt.argtypes = [ctypes.c_void_p]
+    libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    _libraries = (x11, xext, libc)
+    return _libraries
+
+# Xlib's default error handler terminates the process, which is not acceptable if the captured
+# window disappears mid-grab. Record the last error instead and let the caller raise.
+_last_x_error = None
+
+@XErrorHandler
+def _record_x_error(display, event):
+    global _last_x_error
+    _last_x_error = event.contents.error_code
+    return 0
+
+class XShmCapture:
+    """
+    Captures a single X11 window through the MIT-SHM extension.
+
+    One X connection and one shared-memory segment are kept for the life of the object. The segment is
+    only reallocated when the requested size changes, so steady-state grabs do not allocate.
+    """
+    def __init__(self, window_id: int, display_name: str = None):
+        self.window_id = window_id
+        self._x11, self._xext, self._libc = _load_libraries()
+
+        self._display = self._x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self._display:
+            raise RuntimeError("Unable to open X display for XShm capture")
+        if not self._xext.XShmQueryExtension(self._display):
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
+            raise RuntimeError("The X server does not support the MIT-SHM extension")
+        self._x11.XSetErrorHandler(_record_x_error)
+
+        screen = self._x11.XDefaultScreen(self._display)
+        self._visual = self._x11.XDefaultVisual(self._display, screen)
+        self._depth = self._x11.XDefaultDepth(self._display, screen)
+
+        self._shminfo = None
+        self._ximage = None
+        self._frame = None
+        self.size = None
+
+    def _allocate(self, width: int, height: int):
+        """Creates the XImage and shared-memory segment for the given size, releasing any previous ones."""
+        global _last_x_error
+        self._release()
+
+        shminfo = XShmSegmentInfo()
+        ximage = self._xext.XShmCreateImage(
+            self._display, self._visual, self._depth, ZPixmap, None, ctypes.byref(shminfo), width, height
+        )
+        if not ximage:
+            raise RuntimeError("XShmCreateImage failed")
+
+        segment_size = ximage.contents.bytes_per_line * ximage.contents.height
+        shminfo.shmid = self._libc.shmget(IPC_PRIVATE, segment_size, IPC_CREAT | 0o600)
+        if shminfo.shmid < 0:
+            self._x11.XDestroyImage(ximage)
+            raise RuntimeError(f"shmget failed with errno {ctypes.get_errno()}")
+
+        shminfo.shmaddr = self._libc.shmat(shminfo.shmid, None, 0)
+        if shminfo.shmaddr in (None, SHMAT_FAILED):
+            errno = ctypes.get_errno()
+            self._libc.shmctl(shminfo.shmid, IPC_RMID, None)
+            self._x11.XDestroyImage(ximage)
+            raise RuntimeError(f"shmat failed with errno {errno}")
+        ximage.contents.data = shminfo.shmaddr
+        shminfo.readOnly = 0
+        _last_x_error = None
+        attached = self._xext.XShmAttach(self._display, ctypes.byref(shminfo))
+        # Errors are reported asynchronously, so wait for the server to process the attach
+        self._x11.XSync(self._display, 0)
+
+        # Mark the segment for removal now; it is freed once both this process and the X server detach,
+        # so a crash can not leak it.
+        self._libc.shmctl(shminfo.shmid, IPC_RMID, None)
+
+        if not attached or _last_x_error is not None:
+            error = _last_x_error
+            self._libc.shmdt(shminfo.shmaddr)
+            ximage.contents.data = None
+            self._x11.XDestroyImage(ximage)
+            raise XShmAttachError(f"XShmAttach failed (X error {error})")
+
+        if ximage.contents.bits_per_pixel != 32:
+            self._shminfo, self._ximage = shminfo, ximage
+            self._release()
+            raise RuntimeError(f"Unsupported XShm pixel format: {ximage.contents.bits_per_pixel} bits per pixel")
+
+        # A numpy view over the shared segment. Rows may be padded, so slice back to the window width.
+        bytes_per_line = ximage.contents.bytes_per_line
+        buffer = (ctypes.c_ubyte * segment_size).from_address(shminfo.shmaddr)
+        frame = np.ctypeslib.as_array(buffer).reshape(height, bytes_per_line // 4, 4)
+
+        self._shminfo = shminfo
+        self._ximage = ximage
+        self._frame = frame[:, :width]
+        self.size = (width, height)
+        logger.debug(f"Allocated {segment_size} byte XShm segment for a {width}x{height} capture")
+
+    def _release(self):
+        if self._ximage is not None:
+            self._xext.XShmDetach(self._display, ctypes.byref(self._shminfo))
+            self._x11.XSync(self._display, 0)
+            self._libc.shmdt(self._shminfo.shmaddr)
+            # The data pointer belongs to the shared segment, so stop XDestroyImage from freeing it.
+            self._ximage.contents.data = None
+            self._x11.XDestroyImage(self._ximage)
+        self._ximage = None
+        self._shminfo = None
+        self._frame = None
+        self.size = None
+
+    def grab(self, width: int, height: int) -> np.ndarray:
+        """
+        Grabs the window contents into the shared-memory segment.
+
+        Args:
+            width (int): The width of the window in pixels.
+            height (int): The height of the window in pixels.
+
+        Returns:
+            np.ndarray: A (height, width, 4) BGRA view over the shared segment. The view is not copied and
+            will be overwritten by the next grab, so copy or convert it before grabbing again.
+        """
+        global _last_x_error
+        if self._display is None:
+            raise RuntimeError("XShmCapture has been closed")
+        if self.size != (width, height):
+            self._allocate(width, height)
+
+        _last_x_error = None
+        succeeded = self._xext.XShmGetImage(self._display, self.window_id, self._ximage, 0, 0, AllPlanes)
+        if not succeeded or _last_x_error is not None:
+            raise RuntimeError(f"XShmGetImage failed for window {self.window_id} (X error {_last_x_error})")
+
+        return self._frame
+
+    def close(self):
+        if self._display is None:
+            return
+        self._release()
+        self._x11.XCloseDisplay(self._display)
+        self._display = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from inference.batching_detector import BatchingObjectDetector
+
+class FakeResult:
+    def __init__(self, image):
+        self.value = int(image[0, 0, 0])
+
+class FakeModel:
+    def __init__(self, fail=False):
+        self.batch_sizes = []
+        self.fail = fail
+
+    def predict(self, source, conf, verbose):
+        if self.fail:
+            raise RuntimeError("predict failed")
+        self.batch_sizes.append(len(source))
+        return [FakeResult(image) for image in source]
+
+def make_detector(model):
+    detector = MagicMock()
+    detector.model = model
+    detector.conf_threshold = 0.25
+    detector.parse_results = lambda results: [result.value for result in results]
+    return detector
+
+def frame(value):
+    return np.full((8, 8, 4), value, dtype=np.uint8)
+
+class TestBatchingObjectDetector(unittest.TestCase):
+    def test_concurrent_requests_share_batches_and_get_their_own_results(self):
+        model = FakeModel()
+        batching = BatchingObjectDetector(make_detector(model), max_batch_size=4, max_wait_ms=50)
+
+        async def run():
+            results = await asyncio.gather(*(batching.detect_objects(frame(value)) for value in range(6)))
+            await batching.close()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(results, [[value] for value in range(6)])
+        self.assertEqual(model.batch_sizes, [4, 2])
+        self.assertEqual(batching.batches_run, 2)
+        self.assertEqual(batching.mean_batch_size(), 3)
+
+    def test_each_request_uses_its_own_parser(self):
+        batching = BatchingObjectDetector(make_detector(FakeModel()), max_wait_ms=10)
+
+        async def run():
+            results = await asyncio.gather(
+                batching.detect_objects(frame(1)),
+                batching.detect_objects(frame(2), parse_results_delegate=lambda results: {"ball": results[0].value})
+            )
+            await batching.close()
+            return results
+
+        self.assertEqual(asyncio.run(run()), [[1], {"ball": 2}])
+
+    def test_single_request_is_flushed_after_max_wait(self):
+        model = FakeModel()
+        batching = BatchingObjectDetector(make_detector(model), max_batch_size=8, max_wait_ms=5)
+
+        async def run():
+            result = await asyncio.wait_for(batching.detect_objects(frame(7)), timeout=1)
+            await batching.close()
+            return result
+
+        self.assertEqual(asyncio.run(run()), [7])
+        self.assertEqual(model.batch_sizes, [1])
+
+    def test_predict_errors_reach_every_caller(self):
+        batching = BatchingObjectDetector(make_detector(FakeModel(fail=True)), max_wait_ms=10)
+
+        async def run():
+            results = await asyncio.gather(batching.detect_objects(frame(1)), batching.detect_objects(frame(2)),
+                                           return_exceptions=True)
+            await batching.close()
+            return results
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in asyncio.run(run())))
+
+if __name__ == '__main__':
+    unittest.main()
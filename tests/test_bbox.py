@@ -1,6 +1,10 @@
 # test_bbox.py
 import unittest
-from utilities.bbox import is_point_in_bbox
+
+import numpy as np
+
+from utilities.bbox import (box_areas, box_centers, box_iom, box_iou, is_point_in_bbox, nms, nms_iom,
+                            pairwise_distances, points_in_boxes, xywh_to_xyxy)
 
 class TestIsPointInBbox(unittest.TestCase):
 
@@ -44,5 +48,50 @@ class TestIsPointInBbox(unittest.TestCase):
         bbox = (0, 0, 10, 10)
         self.assertFalse(is_point_in_bbox(point, bbox))
 
+class TestVectorizedGeometry(unittest.TestCase):
+    BOXES = np.array([(0, 0, 10, 10), (5, 5, 15, 15), (2, 2, 4, 4)])
+
+    def test_points_in_boxes_matches_is_point_in_bbox(self):
+        points = [(5, 5), (0, 5), (10, 10), (11, 5), (5, -1), (3, 3), (15, 15)]
+        mask = points_in_boxes(points, self.BOXES)
+        self.assertEqual(mask.shape, (len(points), len(self.BOXES)))
+        for point_index, point in enumerate(points):
+            for box_index, bbox in enumerate(self.BOXES):
+                self.assertEqual(mask[point_index, box_index], is_point_in_bbox(point, bbox))
+
+    def test_empty_inputs(self):
+        self.assertEqual(points_in_boxes([], self.BOXES).shape, (0, 3))
+        self.assertEqual(box_iou(self.BOXES, []).shape, (3, 0))
+        self.assertEqual(len(nms([], [])), 0)
+
+    def test_areas_centers_and_xywh(self):
+        np.testing.assert_array_equal(box_areas(self.BOXES), [100, 100, 4])
+        np.testing.assert_array_equal(box_centers(self.BOXES), [(5, 5), (10, 10), (3, 3)])
+        np.testing.assert_array_equal(xywh_to_xyxy([(1, 2, 3, 4)]), [(1, 2, 4, 6)])
+
+    def test_iou_and_iom(self):
+        iou = box_iou(self.BOXES, self.BOXES)
+        np.testing.assert_allclose(np.diag(iou), 1)
+        self.assertAlmostEqual(iou[0, 1], 25 / 175)
+        self.assertAlmostEqual(iou[0, 2], 4 / 100)
+        iom = box_iom(self.BOXES, self.BOXES)
+        # The small box is nested in the first box: low IoU, but an IoM of 1
+        self.assertAlmostEqual(iom[0, 2], 1)
+        self.assertAlmostEqual(iom[2, 0], 1)
+        self.assertAlmostEqual(iom[0, 1], 25 / 100)
+        self.assertEqual(box_iou([(0, 0, 0, 0)], [(0, 0, 0, 0)])[0, 0], 0)
+
+    def test_nms_iom_drops_nested_boxes(self):
+        scores = [0.9, 0.8, 0.7]
+        np.testing.assert_array_equal(nms(self.BOXES, scores, 0.5), [0, 1, 2])
+        np.testing.assert_array_equal(nms_iom(self.BOXES, scores, 0.5), [0, 1])
+        np.testing.assert_array_equal(nms_iom(self.BOXES, [0.1, 0.8, 0.7]), [1, 2])
+        # Boxes of different classes don't suppress each other
+        np.testing.assert_array_equal(nms_iom(self.BOXES, scores, 0.5, class_ids=[0, 0, 1]), [0, 1, 2])
+
+    def test_pairwise_distances(self):
+        distances = pairwise_distances([(0, 0), (3, 4)], [(0, 0), (6, 8), (3, 0)])
+        np.testing.assert_allclose(distances, [[0, 10, 3], [5, 5, 4]])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
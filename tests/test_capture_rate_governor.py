@@ -0,0 +1,72 @@
+import threading
+import time
+import unittest
+
+from utilities.capture_rate_governor import CaptureRateGovernor
+
+class TestCaptureRateGovernor(unittest.TestCase):
+    def test_first_capture_is_immediate(self):
+        governor = CaptureRateGovernor(min_fps=2, max_fps=50)
+        self.assertEqual(governor.next_delay(), 0.0)
+        self.assertEqual(governor.target_fps(), 50)
+
+    def test_capture_is_scheduled_to_finish_when_inference_becomes_free(self):
+        governor = CaptureRateGovernor(min_fps=1, max_fps=100, smoothing=1.0)
+        governor.inference_latency = 0.2
+        governor.record_capture(10.0, 10.05)
+        governor._inference_started = 10.0
+
+        # Inference is expected to be free at 10.2, and the capture takes 0.05s
+        self.assertAlmostEqual(governor.next_delay(now=10.05), 0.1)
+        self.assertAlmostEqual(governor.target_fps(), 5.0)
+
+    def test_drops_stretch_the_interval(self):
+        governor = CaptureRateGovernor(min_fps=1, max_fps=100, smoothing=1.0)
+        governor.inference_latency = 0.2
+        governor.record_published(dropped=True)
+        self.assertAlmostEqual(governor.target_fps(), 2.5)
+
+        governor.record_published(dropped=False)
+        self.assertAlmostEqual(governor.target_fps(), 5.0)
+
+    def test_delay_respects_fps_bounds(self):
+        governor = CaptureRateGovernor(min_fps=2, max_fps=10, smoothing=1.0)
+        governor.record_capture(10.0, 10.01)
+
+        # Inference is idle, so capture as soon as max_fps allows
+        self.assertAlmostEqual(governor.next_delay(now=10.01), 0.09)
+
+        # A very slow inference never delays capture past min_fps
+        governor.inference_latency = 5.0
+        governor._inference_started = 10.0
+        self.assertAlmostEqual(governor.next_delay(now=10.01), 0.49)
+
+    def test_achieved_fps_and_measured_latency(self):
+        governor = CaptureRateGovernor(smoothing=1.0)
+        governor.record_capture(0.0, 0.01)
+        governor.record_capture(0.1, 0.11)
+        self.assertAlmostEqual(governor.achieved_fps(), 10.0)
+        self.assertAlmostEqual(governor.capture_latency, 0.01)
+
+        governor.inference_started()
+        time.sleep(0.02)
+        governor.inference_finished()
+        self.assertGreaterEqual(governor.inference_latency, 0.02)
+
+    def test_wait_returns_early_when_inference_finishes(self):
+        governor = CaptureRateGovernor(min_fps=1, max_fps=1000, smoothing=1.0)
+        governor.inference_latency = 0.9
+        governor.record_capture(time.monotonic(), time.monotonic())
+        governor.inference_started()
+
+        threading.Timer(0.05, governor.inference_finished).start()
+        start = time.monotonic()
+        governor.wait(threading.Event())
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_invalid_bounds_raise(self):
+        with self.assertRaises(ValueError):
+            CaptureRateGovernor(min_fps=30, max_fps=10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+from controllers.game_strategy_controller import GameStrategyController
+from inference.detection_set import DetectionSet
+from inference.rush_inference import parse_rush_detection_set, parse_rush_model_results
+
+NAMES = {0: "ball", 1: "user-controlled-player", 2: "teammate", 3: "opponent"}
+
+def make_results():
+    boxes = torch.tensor([
+        [100.7, 50.2, 120.9, 70.8, 0.90, 2],
+        [600.5, 300.0, 620.0, 322.4, 0.10, 0],  # ball, kept at any confidence
+        [10.0, 10.0, 30.0, 40.0, 0.20, 3],      # low confidence opponent, dropped
+        [400.0, 200.0, 430.0, 260.0, 0.30, 1],  # user controlled player, kept at any confidence
+        [700.0, 100.0, 720.0, 150.0, 0.60, 3],
+    ])
+    return [Results(np.zeros((540, 960, 3), dtype=np.uint8), "frame.png", NAMES, boxes=boxes)]
+
+class TestDetectionSet(unittest.TestCase):
+    def test_parse_rush_model_results_keeps_the_dict_format(self):
+        detections = parse_rush_model_results(make_results())
+        self.assertEqual([detection["class_name"] for detection in detections],
+                         ["teammate", "ball", "user-controlled-player", "opponent"])
+        self.assertEqual(detections[0]["points"], {"x": 100, "y": 50, "width": 20, "height": 20})
+        self.assertEqual(detections[1]["class_id"], 0)
+        self.assertAlmostEqual(detections[1]["confidence"], 0.1, places=6)
+        self.assertIsInstance(detections[0]["points"]["x"], int)
+
+    def test_views(self):
+        detections = parse_rush_detection_set(make_results())
+        self.assertEqual(len(detections.by_class("opponent")), 1)
+        self.assertEqual(len(detections.by_class("ball", "opponent")), 2)
+        self.assertEqual([d["class_name"] for d in detections.top_k(2)], ["teammate", "opponent"])
+        self.assertIs(detections.filter(detections.conf > 0.5).names, detections.names)
+        self.assertEqual(len(detections.by_class("referee")), 0)
+
+    def test_dict_round_trip(self):
+        detections = parse_rush_model_results(make_results())
+        self.assertEqual(DetectionSet.from_dicts(detections).to_dicts(), detections)
+        self.assertEqual(len(DetectionSet.from_dicts([])), 0)
+
+    def test_update_strategy_accepts_both_formats(self):
+        results = make_results()
+        for detections in (parse_rush_model_results(results), parse_rush_detection_set(results)):
+            strategy = GameStrategyController()
+            asyncio.run(strategy.update_strategy(detections, 1280))
+            self.assertEqual(strategy.get_strategic_intent(), "FAST_SPRINT_FORWARD")
+
+        strategy = GameStrategyController()
+        asyncio.run(strategy.update_strategy(DetectionSet.empty(NAMES), 1280))
+        self.assertIsNone(strategy.get_strategic_intent())
+
+if __name__ == '__main__':
+    unittest.main()
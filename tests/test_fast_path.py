@@ -4,6 +4,7 @@ import asyncio
 from controllers.game_strategy_controller import GameStrategyController
 from controllers.game_flow_controller import GameFlowController
 from game_state.game_state import GameState
+from inference.detection_set import DetectionSet
 
 class TestFastPath(unittest.IsolatedAsyncioTestCase):
     async def test_chase_ball_logic(self):
@@ -47,5 +48,19 @@ class TestFastPath(unittest.IsolatedAsyncioTestCase):
             # We expect 2 actions: Move Left + Sprint
             self.assertEqual(len(actions), 2)
 
+    async def test_detection_sets_and_dicts_agree(self):
+        strategy = GameStrategyController()
+        for x, intent in ((100, "FAST_MOVE_LEFT"), (630, "FAST_SPRINT_FORWARD"), (1100, "FAST_MOVE_RIGHT")):
+            detections = [{"class_name": "ball", "class_id": 0, "points": {"x": x, "y": 300, "width": 20, "height": 20}, "confidence": 0.9}]
+            await strategy.update_strategy(detections, 1280)
+            self.assertEqual(strategy.get_strategic_intent(), intent)
+            await strategy.update_strategy(DetectionSet.from_dicts(detections), 1280)
+            self.assertEqual(strategy.get_strategic_intent(), intent)
+
+    async def test_malformed_ball_detection_raises(self):
+        strategy = GameStrategyController()
+        with self.assertRaises(KeyError):
+            await strategy.update_strategy([{"class_name": "ball", "points": {"width": 20}}], 1280)
+
 if __name__ == '__main__':
     unittest.main()
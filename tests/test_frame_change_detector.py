@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from utilities.frame_change_detector import FrameChangeDetector, difference_hash, hamming_distance
+
+def make_frame(seed=0, noise=0):
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, size=(270, 480, 3), dtype=np.uint8)
+    if noise:
+        jitter = rng.integers(-noise, noise + 1, size=frame.shape)
+        frame = np.clip(frame.astype(np.int16) + jitter, 0, 255).astype(np.uint8)
+    return frame
+
+class TestFrameChangeDetector(unittest.TestCase):
+    def test_first_frame_is_changed(self):
+        detector = FrameChangeDetector()
+        self.assertFalse(detector.is_unchanged(make_frame()))
+
+    def test_identical_frame_is_unchanged(self):
+        detector = FrameChangeDetector()
+        frame = make_frame()
+        detector.is_unchanged(frame)
+        self.assertTrue(detector.is_unchanged(frame.copy()))
+        self.assertEqual(detector.frames_checked, 2)
+        self.assertEqual(detector.frames_unchanged, 1)
+        self.assertAlmostEqual(detector.skipped_ratio(), 0.5)
+
+    def test_sensor_noise_is_unchanged(self):
+        detector = FrameChangeDetector()
+        detector.is_unchanged(make_frame(seed=1))
+        self.assertTrue(detector.is_unchanged(make_frame(seed=1, noise=3)))
+
+    def test_different_frame_is_changed(self):
+        detector = FrameChangeDetector()
+        detector.is_unchanged(make_frame(seed=1))
+        self.assertFalse(detector.is_unchanged(make_frame(seed=2)))
+
+    def test_rgba_frames_are_supported(self):
+        detector = FrameChangeDetector()
+        frame = np.dstack([make_frame(), np.full((270, 480), 255, dtype=np.uint8)])
+        detector.is_unchanged(frame)
+        self.assertTrue(detector.is_unchanged(frame))
+
+    def test_max_consecutive_unchanged_forces_refresh(self):
+        detector = FrameChangeDetector(max_consecutive_unchanged=2)
+        frame = make_frame()
+        results = [detector.is_unchanged(frame) for _ in range(5)]
+        self.assertEqual(results, [False, True, True, False, True])
+
+    def test_dhash_method(self):
+        detector = FrameChangeDetector(threshold=4, method="dhash")
+        detector.is_unchanged(make_frame(seed=1))
+        self.assertTrue(detector.is_unchanged(make_frame(seed=1, noise=2)))
+        self.assertFalse(detector.is_unchanged(make_frame(seed=2)))
+
+    def test_unknown_method_raises(self):
+        with self.assertRaises(ValueError):
+            FrameChangeDetector(method="ssim")
+
+    def test_difference_hash_is_stable(self):
+        frame = make_frame(seed=3)
+        self.assertEqual(hamming_distance(difference_hash(frame), difference_hash(frame.copy())), 0)
+
+if __name__ == '__main__':
+    unittest.main()
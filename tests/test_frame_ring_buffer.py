@@ -0,0 +1,109 @@
+import unittest
+
+import numpy as np
+
+from utilities.capture_worker import CaptureWorker
+from utilities.frame_ring_buffer import FrameRingBuffer
+
+FRAME_SHAPE = (4, 6, 3)
+
+def make_frame(value):
+    return np.full(FRAME_SHAPE, value, dtype=np.uint8)
+
+class TestFrameRingBuffer(unittest.TestCase):
+    def setUp(self):
+        self.ring = FrameRingBuffer(3, FRAME_SHAPE)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_empty_buffer_returns_none(self):
+        self.assertIsNone(self.ring.acquire_latest())
+
+    def test_acquire_latest_returns_newest_frame(self):
+        self.ring.write(make_frame(1), capture_time=10.0)
+        sequence = self.ring.write(make_frame(2), capture_time=11.0)
+
+        frame = self.ring.acquire_latest()
+        self.assertEqual(frame.sequence, sequence)
+        self.assertEqual(frame.capture_time, 11.0)
+        self.assertTrue(np.all(frame.image == 2))
+        frame.release()
+
+    def test_frame_is_a_view_into_shared_memory(self):
+        self.ring.write(make_frame(5))
+        frame = self.ring.acquire_latest()
+        self.assertTrue(np.shares_memory(frame.image, self.ring.frames))
+        frame.release()
+
+    def test_pinned_slot_is_not_overwritten(self):
+        self.ring.write(make_frame(1))
+        frame = self.ring.acquire_latest()
+        for value in range(2, 10):
+            self.ring.write(make_frame(value))
+        self.assertTrue(np.all(frame.image == 1))
+        frame.release()
+
+    def test_write_drops_frame_when_all_slots_pinned(self):
+        frames = []
+        for value in range(3):
+            self.ring.write(make_frame(value))
+            frames.append(self.ring.acquire_latest())
+        self.assertIsNone(self.ring.write(make_frame(9)))
+        self.assertEqual(self.ring.frames_dropped, 1)
+
+        frames[0].release()
+        self.assertIsNotNone(self.ring.write(make_frame(9)))
+        for frame in frames[1:]:
+            frame.release()
+
+    def test_attach_by_name(self):
+        self.ring.write(make_frame(7), capture_time=3.0)
+        attached = FrameRingBuffer(3, FRAME_SHAPE, name=self.ring.name)
+        frame = attached.acquire_latest()
+        self.assertEqual(frame.capture_time, 3.0)
+        self.assertTrue(np.all(frame.image == 7))
+        frame.release()
+        del frame
+        attached.close()
+
+    def test_shape_mismatch_raises(self):
+        with self.assertRaises(ValueError):
+            self.ring.write(np.zeros((2, 2, 3), dtype=np.uint8))
+
+class TestCaptureWorker(unittest.IsolatedAsyncioTestCase):
+    async def test_frames_are_published_to_the_event_loop(self):
+        captured = iter(range(1, 1000))
+        worker = CaptureWorker(lambda: make_frame(next(captured)), slots=4, delay_seconds=0.001)
+        worker.start()
+        try:
+            first = await worker.wait_for_frame(timeout=2)
+            second = await worker.wait_for_frame(timeout=2)
+            self.assertIsNotNone(first)
+            self.assertIsNotNone(second)
+            self.assertGreater(second.sequence, first.sequence)
+            first.release()
+            second.release()
+        finally:
+            worker.stop()
+
+    async def test_frames_keep_the_source_timestamp(self):
+        worker = CaptureWorker(lambda: make_frame(1), slots=4, delay_seconds=0.001, timestamp_func=lambda: 1739124957.5)
+        worker.start()
+        try:
+            frame = await worker.wait_for_frame(timeout=2)
+            self.assertEqual(frame.capture_time, 1739124957.5)
+            frame.release()
+        finally:
+            worker.stop()
+
+    async def test_wait_for_frame_times_out(self):
+        worker = CaptureWorker(lambda: (_ for _ in ()).throw(RuntimeError("no window")), delay_seconds=0.01)
+        worker.start()
+        try:
+            self.assertIsNone(await worker.wait_for_frame(timeout=0.05))
+        finally:
+            worker.stop()
+
+if __name__ == '__main__':
+    unittest.main()
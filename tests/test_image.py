@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from utilities.image import ImageWrapper
+
+class TestImageWrapper(unittest.TestCase):
+    def setUp(self):
+        self.rgba = np.random.default_rng(0).integers(0, 256, (54, 96, 4), dtype=np.uint8)
+
+    def test_array_is_not_copied_and_pil_is_built_lazily(self):
+        image = ImageWrapper(self.rgba)
+        self.assertIs(image._imageArray, self.rgba)
+        self.assertIsNone(image._pil_image)
+        self.assertEqual(image._image.size, (96, 54))
+        self.assertEqual((image.width, image.height), (96, 54))
+
+    def test_pil_input_builds_the_array_on_demand(self):
+        image = ImageWrapper(Image.fromarray(self.rgba))
+        self.assertIsNone(image._array)
+        np.testing.assert_array_equal(image._imageArray, self.rgba)
+
+    def test_derived_views_are_memoized(self):
+        image = ImageWrapper(self.rgba)
+        rgb = image.rgb()
+        np.testing.assert_array_equal(rgb, self.rgba[..., :3])
+        self.assertIs(image.rgb(), rgb)
+        self.assertIs(image.grayscale(), image.grayscale())
+        self.assertIs(image.resized(48, 27), image.resized(48, 27))
+        self.assertEqual(image.resized(48, 27).shape, (27, 48, 3))
+        self.assertFalse(rgb.flags.writeable)
+
+    def test_rgb_view_shares_the_buffer_of_an_rgb_frame(self):
+        frame = np.ascontiguousarray(self.rgba[..., :3])
+        image = ImageWrapper(frame)
+        self.assertTrue(np.shares_memory(image.rgb(), frame))
+        self.assertIs(image.resized(96, 54), image.rgb())
+
+    def test_crop_matches_pil_crop(self):
+        image = ImageWrapper(self.rgba)
+        expected = np.asarray(Image.fromarray(self.rgba).convert("RGB").crop((10, 5, 40, 30)))
+        np.testing.assert_array_equal(image.crop(10, 5, 40, 30), expected)
+
+    def test_resize_invalidates_cached_views(self):
+        image = ImageWrapper(self.rgba)
+        image.rgb()
+        image.resize(48, 27)
+        self.assertEqual(image.rgb().shape, (27, 48, 3))
+        self.assertEqual(image._imageArray.shape, (27, 48, 4))
+
+    def test_slots(self):
+        image = ImageWrapper(self.rgba)
+        with self.assertRaises(AttributeError):
+            image.unexpected = True
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from inference.image_classification_inference import ImageClassifier, converted_model_path, default_device
+from utilities import config
+from utilities.image import ImageWrapper
+
+class TestImageClassifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import tensorflow as tf
+        cls.tf = tf
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.keras_path = os.path.join(cls.directory.name, "menu_vs_match_model.h5")
+        tf.keras.utils.set_random_seed(0)
+        model = tf.keras.Sequential([
+            tf.keras.Input((48, 27, 3)),
+            tf.keras.layers.Conv2D(4, 3, activation="relu"),
+            tf.keras.layers.GlobalAveragePooling2D(),
+            tf.keras.layers.Dense(2, activation="softmax"),
+        ])
+        model.save(cls.keras_path)
+        cls.frame = ImageWrapper(np.random.default_rng(0).integers(0, 256, (54, 96, 4), dtype=np.uint8))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.exports = tempfile.TemporaryDirectory()
+        self.addCleanup(self.exports.cleanup)
+        patcher = patch.object(config, "MODEL_EXPORT_DIR", self.exports.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create(self, backend):
+        def download(repo, filename):
+            path = os.path.join(self.directory.name, filename)
+            if not os.path.exists(path):
+                from huggingface_hub.utils import EntryNotFoundError
+                raise EntryNotFoundError(filename)
+            return path
+        with patch("inference.image_classification_inference.hf_hub_download", side_effect=download):
+            return ImageClassifier("repo", "menu_vs_match_model.h5", ["IN_MATCH", "IN_MENU"], target_resolution=(48, 27), backend=backend)
+
+    def expected_predictions(self):
+        model = self.tf.keras.models.load_model(self.keras_path, compile=False)
+        batch = self.frame.resized(27, 48).astype(np.float32)[np.newaxis] / 255.
+        return model.predict(batch, verbose=0)
+
+    def test_keras_backend_matches_original_preprocessing(self):
+        classifier = self.create("keras")
+        classifier.warmup()
+        label, predictions = asyncio.run(classifier.classify_image(self.frame))
+        np.testing.assert_allclose(predictions, self.expected_predictions(), rtol=1e-5)
+        self.assertEqual(label, ["IN_MATCH", "IN_MENU"][int(np.argmax(predictions))])
+
+    def test_tflite_backend_converts_once_and_matches_keras(self):
+        runtime = types.ModuleType("tflite_runtime.interpreter")
+        runtime.Interpreter = self.tf.lite.Interpreter
+        with patch.dict(sys.modules, {"tflite_runtime": types.ModuleType("tflite_runtime"), "tflite_runtime.interpreter": runtime}):
+            classifier = self.create("tflite")
+            self.assertEqual(classifier.modelpath, converted_model_path(self.keras_path, "tflite"))
+            self.assertTrue(classifier.modelpath.startswith(self.exports.name))
+            _, predictions = asyncio.run(classifier.classify_image(self.frame))
+        np.testing.assert_allclose(predictions, self.expected_predictions(), rtol=1e-4, atol=1e-6)
+
+    def test_device_is_the_one_the_backend_runs_on(self):
+        self.assertEqual(default_device("tflite"), "cpu")
+        self.assertEqual(default_device("onnx"), "cpu")
+        with patch.object(self.tf.config, "list_physical_devices", return_value=["GPU:0"]):
+            self.assertEqual(default_device("keras"), "gpu")
+        with patch.object(self.tf.config, "list_physical_devices", return_value=[]):
+            self.assertEqual(default_device("keras"), "cpu")
+
+    def test_unsupported_backend_raises(self):
+        with self.assertRaises(ValueError):
+            ImageClassifier("repo", "model.h5", [], backend="coreml")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+
+from controllers.game_strategy_controller import GameStrategyController
+from game_state.game_state import GameState
+from inference.image_inference_pipeline import ImageInferencePipeline
+from utilities import config
+from utilities.capture_rate_governor import CaptureRateGovernor
+from utilities.image import ImageWrapper
+
+def frame(value=0):
+    image = np.full((36, 64, 3), 100, dtype=np.uint8)
+    # A small object moving, like the ball in a match
+    image[10:12, value:value + 2] = 255
+    return ImageWrapper(image)
+
+class TestFrameSkipping(unittest.TestCase):
+    def create_pipeline(self, skip_unchanged=True):
+        with patch.object(config, "INFERENCE_SKIP_UNCHANGED_FRAMES", skip_unchanged):
+            return ImageInferencePipeline(GameStrategyController(), SimpleNamespace(latest_screenshot=None, exit_event=None))
+
+    def test_unchanged_menu_frames_are_skipped(self):
+        pipeline = self.create_pipeline()
+        self.assertFalse(pipeline.frame_unchanged(frame(0)))
+        self.assertTrue(pipeline.frame_unchanged(frame(20)))
+
+    def test_match_frames_are_never_skipped(self):
+        pipeline = self.create_pipeline()
+        pipeline.game.game_state_tracker.set_game_state(GameState.IN_MATCH)
+        self.assertFalse(pipeline.frame_unchanged(frame(0)))
+        self.assertFalse(pipeline.frame_unchanged(frame(20)))
+        self.assertEqual(pipeline.change_detector.frames_checked, 0)
+
+    def test_disabled_skipping_infers_every_frame(self):
+        pipeline = self.create_pipeline(skip_unchanged=False)
+        self.assertIsNone(pipeline.change_detector)
+        self.assertFalse(pipeline.frame_unchanged(frame(0)))
+        self.assertFalse(pipeline.frame_unchanged(frame(0)))
+
+class TestCaptureRateGovernorReporting(unittest.IsolatedAsyncioTestCase):
+    async def run_pipeline(self, image, process_image):
+        queue = asyncio.Queue()
+        queue.put_nowait(image)
+        stop_event = asyncio.Event()
+        shared_data = SimpleNamespace(latest_screenshot=queue, exit_event=stop_event, inference_completed_event=asyncio.Event(),
+                                      capture_rate_governor=CaptureRateGovernor())
+        pipeline = ImageInferencePipeline(GameStrategyController(), shared_data)
+        async def stop_after_frame(*args):
+            stop_event.set()
+            await process_image(*args)
+        pipeline.process_image = stop_after_frame
+        with patch.object(asyncio, "sleep", AsyncMock(side_effect=lambda seconds: stop_event.set())):
+            await asyncio.wait_for(pipeline.start(), timeout=2)
+        return shared_data.capture_rate_governor
+
+    async def test_inference_finishes_when_processing_fails(self):
+        governor = await self.run_pipeline(frame(), AsyncMock(side_effect=RuntimeError("model failed")))
+        self.assertIsNone(governor._inference_started)
+        self.assertIsNotNone(governor.inference_latency)
+
+    async def test_inference_finishes_for_a_missing_image(self):
+        governor = await self.run_pipeline(None, AsyncMock())
+        self.assertIsNone(governor._inference_started)
+        self.assertIsNotNone(governor.inference_latency)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from game_state.game_state import GameState
+from game_state.game_state_tracker import GameStateTracker
+from inference.inference_graph import InferenceGraph
+from inference.inference_step import InferenceStep
+
+class RecordingStep(InferenceStep):
+    def __init__(self, name, calls, result=None):
+        super().__init__()
+        self.name = name
+        self.calls = calls
+        self.result = result
+
+    async def infer(self, image, game):
+        self.calls.append(self.name)
+        return self.result
+
+class SleepingStep(InferenceStep):
+    """Blocks like a model's predict call, either on a thread (async) or directly (sync)."""
+    def __init__(self, seconds, use_thread=True):
+        super().__init__()
+        self.seconds = seconds
+        if not use_thread:
+            self.infer = self.infer_sync
+
+    async def infer(self, image, game):
+        await asyncio.to_thread(time.sleep, self.seconds)
+        return self.seconds
+
+    def infer_sync(self, image, game):
+        time.sleep(self.seconds)
+        return self.seconds
+
+class TestInferenceGraph(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.game = MagicMock()
+        self.game.game_state_tracker = GameStateTracker()
+
+    def build(self, rush_detections):
+        graph = InferenceGraph()
+        graph.add("game_state", RecordingStep("game_state", self.calls), depends_on=["rush"],
+                  gate=lambda context: len(context.results["rush"]) == 0)
+        graph.add("rush", RecordingStep("rush", self.calls, rush_detections))
+        graph.add("menu_state", RecordingStep("menu_state", self.calls), depends_on=["game_state"],
+                  gate=lambda context: context.game_state == GameState.IN_MENU)
+        return graph.compile()
+
+    def test_steps_run_in_dependency_order(self):
+        report = asyncio.run(self.build([]).run(MagicMock(), self.game))
+        self.assertEqual(self.calls, ["rush", "game_state", "menu_state"])
+        self.assertEqual(report.steps_run, self.calls)
+        self.assertEqual(set(report.timings), set(self.calls))
+        self.assertEqual(report.results["rush"], [])
+
+    def test_closed_gate_skips_the_rest_of_the_lane(self):
+        report = asyncio.run(self.build([{"class_name": "ball"}]).run(MagicMock(), self.game))
+        self.assertEqual(self.calls, ["rush"])
+        self.assertEqual(report.steps_skipped, ["game_state", "menu_state"])
+
+    def test_gates_see_game_state(self):
+        self.game.game_state_tracker.set_game_state(GameState.IN_MATCH)
+        report = asyncio.run(self.build([]).run(MagicMock(), self.game))
+        self.assertEqual(report.steps_skipped, ["menu_state"])
+
+    def test_graph_is_reused_across_frames(self):
+        graph = self.build([])
+        asyncio.run(graph.run(MagicMock(), self.game))
+        asyncio.run(graph.run(MagicMock(), self.game))
+        self.assertEqual(self.calls, ["rush", "game_state", "menu_state"] * 2)
+
+    def test_independent_steps_run_concurrently(self):
+        graph = InferenceGraph() \
+            .add("minimap", SleepingStep(0.2)) \
+            .add("scoreclock", SleepingStep(0.2, use_thread=False)) \
+            .add("rush", SleepingStep(0.2)) \
+            .add("join", RecordingStep("join", self.calls), depends_on=["minimap", "scoreclock", "rush"])
+
+        before = time.perf_counter()
+        report = asyncio.run(graph.run(MagicMock(), self.game))
+        self.assertLess(time.perf_counter() - before, 0.5)
+        self.assertEqual(report.steps_run, ["minimap", "scoreclock", "rush", "join"])
+        self.assertEqual(report.results["scoreclock"], 0.2)
+
+    def test_failing_step_is_raised_after_its_wave(self):
+        class FailingStep(InferenceStep):
+            async def infer(self, image, game):
+                raise RuntimeError("model failed")
+
+        graph = InferenceGraph().add("fails", FailingStep()).add("slow", SleepingStep(0.05))
+        with self.assertRaises(RuntimeError):
+            asyncio.run(graph.run(MagicMock(), self.game))
+
+    def test_invalid_graphs_are_rejected(self):
+        with self.assertRaises(ValueError):
+            InferenceGraph().add("a", RecordingStep("a", self.calls), depends_on=["missing"]).compile()
+        with self.assertRaises(ValueError):
+            InferenceGraph() \
+                .add("a", RecordingStep("a", self.calls), depends_on=["b"]) \
+                .add("b", RecordingStep("b", self.calls), depends_on=["a"]) \
+                .compile()
+        with self.assertRaises(ValueError):
+            InferenceGraph().add("a", RecordingStep("a", self.calls)).add("a", RecordingStep("a", self.calls))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import time
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from inference.inference_worker_pool import InferenceWorkerPool
+from utilities.image import ImageWrapper
+
+NAMES = {0: "ball", 1: "user-controlled-player"}
+
+SLOW = 255
+FAILING = 254
+
+class FakeModel:
+    """
+    Detects one ball at x = the frame's first pixel value, reporting the frame's size and the worker's pid.
+    Frames starting with SLOW take half a second, and frames starting with FAILING raise.
+    """
+    names = NAMES
+
+    def predict(self, source, conf, verbose):
+        if source[0, 0, 0] == SLOW:
+            time.sleep(0.5)
+        elif source[0, 0, 0] == FAILING:
+            raise ValueError("prediction failed")
+        height, width = source.shape[:2]
+        data = np.array([[source[0, 0, 0], float(os.getpid()), width, height, 0.9, 0]], dtype=np.float32)
+        return [SimpleNamespace(boxes=SimpleNamespace(data=data))]
+
+def load_fake_detector():
+    return SimpleNamespace(model=FakeModel(), conf_threshold=0.25)
+
+def fail_to_load():
+    raise FileNotFoundError("no weights")
+
+def frame(value, height=36, width=64):
+    return ImageWrapper(np.full((height, width, 4), value, dtype=np.uint8))
+
+class TestInferenceWorkerPool(unittest.TestCase):
+    def test_frames_are_inferred_in_the_worker_processes(self):
+        pool = InferenceWorkerPool(2, model_factory=load_fake_detector).start()
+        try:
+            async def run():
+                return await asyncio.gather(*(pool.detect(frame(value)) for value in range(6)))
+
+            results = asyncio.run(run())
+        finally:
+            pool.close()
+
+        self.assertEqual([int(detections.xyxy[0, 0]) for detections in results], list(range(6)))
+        self.assertEqual([detections[0]["class_name"] for detections in results], ["ball"] * 6)
+        worker_pids = {int(detections.xyxy[0, 1]) for detections in results}
+        self.assertEqual(len(worker_pids), 2)
+        self.assertNotIn(os.getpid(), worker_pids)
+        self.assertEqual(pool.frames_processed, 6)
+
+    def test_larger_frames_grow_the_shared_memory(self):
+        pool = InferenceWorkerPool(1, model_factory=load_fake_detector).start()
+        try:
+            async def run():
+                return [await pool.detect(frame(value, height, width))
+                        for value, (height, width) in enumerate(((36, 64), (72, 128), (18, 32)))]
+
+            results = asyncio.run(run())
+        finally:
+            pool.close()
+
+        self.assertEqual([tuple(detections.xyxy[0, 2:].astype(int)) for detections in results], [(64, 36), (128, 72), (32, 18)])
+        self.assertEqual([int(detections.xyxy[0, 0]) for detections in results], [0, 1, 2])
+
+    def test_dead_workers_are_replaced(self):
+        pool = InferenceWorkerPool(1, model_factory=load_fake_detector).start()
+        try:
+            async def run():
+                await pool.detect(frame(1))
+                pool._workers[0].process.kill()
+                pool._workers[0].process.join()
+                with self.assertRaises(RuntimeError):
+                    await pool.detect(frame(2))
+                return await pool.detect(frame(3))
+
+            detections = asyncio.run(run())
+        finally:
+            pool.close()
+        self.assertEqual(int(detections.xyxy[0, 0]), 3)
+
+    def test_cancelled_requests_return_the_worker(self):
+        pool = InferenceWorkerPool(1, model_factory=load_fake_detector).start()
+        try:
+            async def run():
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(pool.detect(frame(SLOW)), timeout=0.1)
+                # Waits for the worker to finish the abandoned frame, and gets its own detections
+                return await asyncio.wait_for(pool.detect(frame(7)), timeout=5)
+
+            detections = asyncio.run(run())
+        finally:
+            pool.close()
+        self.assertEqual(int(detections.xyxy[0, 0]), 7)
+
+    def test_prediction_errors_keep_the_worker(self):
+        pool = InferenceWorkerPool(1, model_factory=load_fake_detector).start()
+        try:
+            async def run():
+                with self.assertRaisesRegex(RuntimeError, "prediction failed"):
+                    await pool.detect(frame(FAILING))
+                # A larger frame replaces the shared memory the failed frame was read from
+                return await pool.detect(frame(3, 72, 128))
+
+            detections = asyncio.run(run())
+            worker_process = pool._workers[0].process
+        finally:
+            pool.close()
+        self.assertEqual(int(detections.xyxy[0, 0]), 3)
+        self.assertEqual(worker_process.exitcode, 0)
+
+    def test_model_loading_errors_are_raised_on_start(self):
+        pool = InferenceWorkerPool(1, model_factory=fail_to_load)
+        with self.assertRaisesRegex(RuntimeError, "no weights"):
+            pool.start()
+        self.assertEqual(pool._workers, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from Xlib import X
+
+from utilities.linux_app import RunningApplication
+
+WINDOW_ID = 42
+
+class TestLinuxRunningApplicationWindowCache(unittest.TestCase):
+    def setUp(self):
+        self.display = MagicMock()
+        self.events = []
+        self.display.pending_events.side_effect = lambda: len(self.events)
+        self.display.next_event.side_effect = lambda: self.events.pop(0)
+        self.display.get_input_focus.return_value.focus = WINDOW_ID
+
+        root = self.display.screen.return_value.root
+        root.id = WINDOW_ID
+        root.get_full_property.return_value = None
+        root.get_wm_name.return_value = "Moonlight"
+        root.get_wm_state.return_value = {"state": 1}
+
+        window = self.display.create_resource_object.return_value
+        window.get_geometry.return_value = SimpleNamespace(x=0, y=0, width=1920, height=1080)
+
+        with patch('utilities.linux_app.Display', return_value=self.display):
+            self.app = RunningApplication("Moonlight")
+        self.display.set_input_focus.reset_mock()
+
+    def queue_event(self, event_type, **fields):
+        self.events.append(SimpleNamespace(type=event_type, window=SimpleNamespace(id=WINDOW_ID), **fields))
+
+    def test_activate_skips_round_trips_when_focused(self):
+        self.app.activate()
+        self.display.set_input_focus.assert_not_called()
+        self.display.sync.assert_called_once()  # Only the initial activation
+
+    def test_focus_out_triggers_reactivation(self):
+        self.queue_event(X.FocusOut, detail=X.NotifyNonlinear, mode=X.NotifyNormal)
+        self.app.activate()
+        self.display.set_input_focus.assert_called_once()
+
+    def test_focus_out_to_inferior_is_ignored(self):
+        self.queue_event(X.FocusOut, detail=X.NotifyInferior, mode=X.NotifyNormal)
+        self.app.activate()
+        self.assertTrue(self.app.has_focus)
+        self.display.set_input_focus.assert_not_called()
+
+    def test_configure_notify_updates_geometry(self):
+        self.queue_event(X.ConfigureNotify, x=0, y=0, width=1280, height=720)
+        self.app.activate()
+        self.assertEqual((self.app.window_width, self.app.window_height), (1280, 720))
+        self.display.set_input_focus.assert_not_called()
+
+    def test_move_triggers_reraise(self):
+        self.queue_event(X.ConfigureNotify, x=100, y=50, width=1920, height=1080)
+        self.app.activate()
+        self.display.set_input_focus.assert_called_once()
+
+    def test_destroy_notify_searches_for_window_again(self):
+        self.queue_event(X.DestroyNotify)
+        with patch.object(self.app, 'find_window_by_name', wraps=self.app.find_window_by_name) as find:
+            self.app.activate()
+            find.assert_called_once_with("Moonlight")
+        self.assertEqual(self.app.window_id, WINDOW_ID)
+
+    def test_missing_window_is_searched_for_on_the_next_activation(self):
+        self.queue_event(X.DestroyNotify)
+        root = self.display.screen.return_value.root
+        root.get_wm_name.return_value = "Terminal"
+        root.query_tree.return_value.children = []
+        self.app.activate()
+        self.assertIsNone(self.app.window_id)
+        self.display.set_input_focus.assert_not_called()
+
+        root.get_wm_name.return_value = "Moonlight"
+        self.app.activate()
+        self.assertEqual(self.app.window_id, WINDOW_ID)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import threading
+import unittest
+
+from inference.model_registry import ModelKey, ModelRegistry
+
+class FakeModel:
+    def __init__(self, size_bytes=100):
+        self.size_bytes = size_bytes
+        self.warmed_up = False
+
+    def memory_bytes(self):
+        return self.size_bytes
+
+    def warmup(self):
+        self.warmed_up = True
+
+def key(name):
+    return ModelKey("repo", name, "fake", "cpu")
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.loads = []
+
+    def loader(self, name, size_bytes=100):
+        def load():
+            self.loads.append(name)
+            return FakeModel(size_bytes)
+        return load
+
+    def test_model_is_loaded_and_warmed_up_once(self):
+        registry = ModelRegistry()
+        with registry.lease(key("a"), self.loader("a"), FakeModel.warmup) as first:
+            self.assertTrue(first.warmed_up)
+        with registry.lease(key("a"), self.loader("a"), FakeModel.warmup) as second:
+            self.assertIs(second, first)
+        self.assertEqual(self.loads, ["a"])
+        self.assertEqual(registry.loaded_bytes(), 100)
+
+    def test_keys_differ_by_backend_and_device(self):
+        registry = ModelRegistry()
+        cpu = registry.acquire(ModelKey("repo", "a", "fake", "cpu"), self.loader("a"))
+        cuda = registry.acquire(ModelKey("repo", "a", "fake", "cuda"), self.loader("a"))
+        self.assertIsNot(cpu, cuda)
+
+    def test_least_recently_used_idle_models_are_evicted_over_budget(self):
+        registry = ModelRegistry(memory_budget_bytes=250)
+        with registry.lease(key("a"), self.loader("a")):
+            pass
+        with registry.lease(key("b"), self.loader("b")):
+            pass
+        with registry.lease(key("c"), self.loader("c")):
+            pass
+
+        self.assertFalse(registry.is_loaded(key("a")))
+        self.assertTrue(registry.is_loaded(key("b")))
+        self.assertTrue(registry.is_loaded(key("c")))
+        self.assertEqual(registry.evictions, 1)
+
+        # An evicted model is loaded again on its next use
+        with registry.lease(key("a"), self.loader("a")):
+            pass
+        self.assertEqual(self.loads, ["a", "b", "c", "a"])
+
+    def test_models_in_use_are_never_evicted(self):
+        registry = ModelRegistry(memory_budget_bytes=150)
+        pinned = registry.acquire(key("pinned"), self.loader("pinned"))
+        with registry.lease(key("b"), self.loader("b")):
+            self.assertTrue(registry.is_loaded(key("pinned")))
+            self.assertTrue(registry.is_loaded(key("b")))
+        self.assertTrue(registry.is_loaded(key("pinned")))
+        self.assertFalse(registry.is_loaded(key("b")))
+        self.assertIs(registry.acquire(key("pinned"), self.loader("pinned")), pinned)
+
+    def test_concurrent_acquires_load_once(self):
+        registry = ModelRegistry()
+        results = []
+        def acquire():
+            results.append(registry.acquire(key("a"), self.loader("a")))
+        threads = [threading.Thread(target=acquire) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.loads, ["a"])
+        self.assertEqual(len({id(model) for model in results}), 1)
+
+    def test_failed_load_is_not_cached(self):
+        registry = ModelRegistry()
+        def failing_loader():
+            raise RuntimeError("download failed")
+        with self.assertRaises(RuntimeError):
+            registry.acquire(key("a"), failing_loader)
+        self.assertFalse(registry.is_loaded(key("a")))
+        self.assertIsInstance(registry.acquire(key("a"), self.loader("a")), FakeModel)
+
+    def test_release_without_acquire_raises(self):
+        with self.assertRaises(KeyError):
+            ModelRegistry().release(key("a"))
+
+if __name__ == '__main__':
+    unittest.main()
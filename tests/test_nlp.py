@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import re
+import unittest
+from unittest.mock import Mock
+
+from inference.ollama_inference import get_dict_value_nlp_fallback, nlp_response_mappings
+from utilities.nlp import StateMatcher, extract_state_from_text, state_mappings
+
+TEXTS = [
+    "The game is currently in the main menu",
+    "Selecting opponent in squad battles",
+    "Half-time menu",
+    "In match",
+    "Full-time menu",
+    "The match in progress shows the main menu button",  # two patterns found, the first in the table wins
+    "Nothing to see here",
+    "first line\nnow at HALF-TIME",
+    '{"match-status": "IN-MENU", "in-menu-status": "SQUAD-BATTLES-OPPONENT-SELECTION"}',
+    "",
+]
+
+def search_table(mappings, text, default):
+    for pattern, state in mappings.items():
+        if re.search(pattern, text, re.IGNORECASE):
+            return state
+    return default
+
+def match_table(mappings, text):
+    for pattern, state in mappings.items():
+        if re.match(pattern, text, re.IGNORECASE):
+            return state
+    return None
+
+class TestStateMatcher(unittest.TestCase):
+    def test_matches_the_first_pattern_in_table_order_like_searching_each_pattern(self):
+        matcher = StateMatcher(nlp_response_mappings, default="UNKNOWN")
+        for text in TEXTS:
+            self.assertEqual(matcher.match(text), search_table(nlp_response_mappings, text, "UNKNOWN"), text)
+        self.assertEqual(matcher.match("The match in progress shows the main menu button"), "IN-MENU")
+
+    def test_anchored_matching_is_like_re_match(self):
+        for text in TEXTS:
+            self.assertEqual(extract_state_from_text(text), match_table(state_mappings, text), text)
+        self.assertIsNone(extract_state_from_text("first line\nnow at HALF-TIME"))
+        self.assertEqual(extract_state_from_text("Selecting opponent in squad battles"), "IN-MENU-SQUAD-BATTLES-OPPONENT-SELECT")
+
+    def test_empty_table_returns_the_default(self):
+        self.assertEqual(StateMatcher({}, default="UNKNOWN").match("main menu"), "UNKNOWN")
+
+    def test_nlp_fallback_uses_the_matcher(self):
+        logger = Mock(spec=logging.Logger)
+        self.assertEqual(asyncio.run(get_dict_value_nlp_fallback(logger, None, "match-status", "It is half-time")), "IN-MENU-HALF-TIME")
+        self.assertEqual(asyncio.run(get_dict_value_nlp_fallback(logger, {"match-status": None}, "match-status", "gibberish")), "UNKNOWN")
+        self.assertEqual(asyncio.run(get_dict_value_nlp_fallback(logger, {"match-status": "IN-MATCH"}, "match-status", "main menu")), "IN-MATCH")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import asyncio
+import base64
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from aiohttp import web
+from PIL import Image
+
+from inference.ollama_inference import OllamaClient
+from utilities.app_io import get_prompt
+from utilities.image import ImageWrapper
+
+class StubOllama:
+    """A local stand-in for Ollama's /api/generate, recording the image sizes it receives."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.peers = set()
+        self.image_sizes = []
+        self.active = 0
+        self.max_active = 0
+        self.runner = None
+        self.url = None
+
+    async def generate(self, request):
+        self.peers.add(request.transport.get_extra_info("peername"))
+        payload = await request.json()
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            image = Image.open(io.BytesIO(base64.b64decode(payload["images"][0])))
+            self.image_sizes.append(image.size)
+            answer = f"answer {len(self.image_sizes)}"
+            await asyncio.sleep(self.delay)
+            return web.json_response({"model": payload["model"], "response": answer, "done": True})
+        finally:
+            self.active -= 1
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/api/generate", self.generate)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/api/generate"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.runner.cleanup()
+
+def frame(seed):
+    return ImageWrapper(np.random.default_rng(seed).integers(0, 255, (360, 640, 3), dtype=np.uint8))
+
+class TestOllamaClient(unittest.TestCase):
+    def test_requests_share_a_session_and_respect_the_concurrency_limit(self):
+        async def run():
+            async with StubOllama(delay=0.05) as stub:
+                client = OllamaClient(stub.url, "llava", max_concurrency=2)
+                responses = await asyncio.gather(*(client.infer(frame(seed), "Menu or match?") for seed in range(6)))
+                await client.aclose()
+                return stub, client, responses
+
+        stub, client, responses = asyncio.run(run())
+        self.assertEqual(len({response["response"] for response in responses}), 6)
+        self.assertEqual(stub.max_active, 2)
+        self.assertLessEqual(len(stub.peers), 2)
+        self.assertEqual(client.requests, 6)
+        self.assertEqual(stub.image_sizes[0], (640, 360))
+
+    def test_static_screens_are_answered_from_the_cache(self):
+        async def run():
+            async with StubOllama(delay=0.02) as stub:
+                client = OllamaClient(stub.url, "llava")
+                # Concurrent and repeated questions about the same screen make one model call
+                first = await asyncio.gather(client.infer(frame(0), "Menu or match?"), client.infer(frame(0), "Menu or match?"))
+                again = await client.infer(frame(0), "Menu or match?")
+                other_prompt = await client.infer(frame(0), "Is there a minimap?")
+                other_screen = await client.infer(frame(1), "Menu or match?")
+                await client.aclose()
+                return stub, client, first, again, other_prompt, other_screen
+
+        stub, client, first, again, other_prompt, other_screen = asyncio.run(run())
+        self.assertEqual(first[0], first[1])
+        self.assertEqual(again, first[0])
+        self.assertNotEqual(other_prompt, first[0])
+        self.assertNotEqual(other_screen, first[0])
+        self.assertEqual(client.requests, 3)
+        self.assertEqual(client.cache_hits, 2)
+        self.assertEqual(len(stub.image_sizes), 3)
+
+    def test_regions_send_only_the_crop(self):
+        async def run():
+            async with StubOllama() as stub:
+                client = OllamaClient(stub.url, "llava")
+                await client.infer(frame(0), "Is the score visible?", region=(10, 20, 200, 50))
+                await client.aclose()
+                return stub
+
+        self.assertEqual(asyncio.run(run()).image_sizes, [(200, 50)])
+
+    def test_cache_is_bounded(self):
+        async def run():
+            async with StubOllama() as stub:
+                client = OllamaClient(stub.url, "llava", cache_size=2)
+                for seed in (0, 1, 2, 0):
+                    await client.infer(frame(seed), "Menu or match?")
+                await client.aclose()
+                return client
+
+        client = asyncio.run(run())
+        self.assertEqual(client.requests, 4)
+        self.assertEqual(len(client._cache), 2)
+
+class TestGetPrompt(unittest.TestCase):
+    def test_prompts_are_read_once(self):
+        working_directory = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, "prompts"))
+            prompt_path = os.path.join(directory, "prompts", "test-prompt.txt")
+            with open(prompt_path, "w") as file:
+                file.write("Menu or match?")
+            os.chdir(directory)
+            try:
+                get_prompt.cache_clear()
+                self.assertEqual(get_prompt("test-prompt.txt"), "Menu or match?")
+                os.remove(prompt_path)
+                self.assertEqual(get_prompt("test-prompt.txt"), "Menu or match?")
+            finally:
+                os.chdir(working_directory)
+                get_prompt.cache_clear()
+
+if __name__ == '__main__':
+    unittest.main()
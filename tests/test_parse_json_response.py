@@ -66,7 +66,7 @@ class TestParseJsonResponse(unittest.TestCase):
     def test_general_exception(self):
         json_str = json.dumps({"match-status": "IN-MATCH"})
         mock_exception = Exception("Some error")
-        with patch('json.loads', side_effect=mock_exception):
+        with patch('inference.ollama_inference.decode_json', side_effect=mock_exception):
             result = asyncio.run(parse_json_response(self.logger, json_str))
             self.assertIsNone(result)
             self.logger.error.assert_any_call(f"Error processing the json string: {json_str}")
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from utilities.replay_app import ReplayApplication
+from utilities.video_recorder import SegmentedVideoRecorder
+
+def make_frame(value):
+    return np.full((18, 32, 3), value, dtype=np.uint8)
+
+class TestReplayApplication(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_screenshot(self, timestamp, value, extension="png"):
+        path = os.path.join(self.directory.name, f"new-screenshot{timestamp}.{extension}")
+        if extension == "npy":
+            np.save(path, make_frame(value))
+        else:
+            cv2.imwrite(path, make_frame(value))
+        return path
+
+    def test_directory_is_replayed_in_timestamp_order(self):
+        self.write_screenshot(1739124957.5, 30)
+        self.write_screenshot(1739124955.0, 10)
+        self.write_screenshot(1739124956.25, 20, extension="npy")
+
+        for preload in (True, False):
+            app = ReplayApplication.from_path(self.directory.name, preload=preload, pacing="fast", loop=False)
+            values = [int(app.capture_window()[0, 0, 0]) for _ in range(3)]
+            self.assertEqual(values, [10, 20, 30])
+            self.assertEqual(app.last_source_timestamp, 1739124957.5)
+            with self.assertRaises(EOFError):
+                app.capture_window()
+
+    def test_single_image_loops(self):
+        path = self.write_screenshot(1739124955.0, 42)
+        app = ReplayApplication.from_path(path, pacing="fast")
+        for _ in range(3):
+            self.assertEqual(app.capture_window().shape, (18, 32, 3))
+
+    def test_recorded_segment_keeps_original_timestamps(self):
+        recorder = SegmentedVideoRecorder(self.directory.name, quality=100)
+        for i in range(3):
+            recorder.submit(make_frame(i * 50), capture_time=500.0 + i)
+        recorder.close()
+
+        app = ReplayApplication.from_path(recorder.segments_written[0], pacing="fast", loop=False)
+        self.assertEqual(app.timestamps, [500.0, 501.0, 502.0])
+        self.assertLess(abs(int(app.capture_window()[0, 0, 0]) - 0), 3)
+
+    def test_mp4_segments_are_decoded_on_demand(self):
+        recorder = SegmentedVideoRecorder(self.directory.name, container="mp4")
+        for i in range(4):
+            recorder.submit(make_frame(i * 60), capture_time=500.0 + i)
+        recorder.close()
+
+        for preload in (False, True):
+            app = ReplayApplication.from_path(recorder.segments_written[0], preload=preload, pacing="fast")
+            self.assertEqual(callable(app.frames[0]), not preload)
+            # Twice through, so the lazy reader reopens the segment after its last frame
+            values = [int(app.capture_window()[0, 0, 0]) for _ in range(8)]
+            for value, expected in zip(values, [0, 60, 120, 180] * 2):
+                self.assertLess(abs(value - expected), 8)
+
+    def test_fixed_pacing(self):
+        app = ReplayApplication([make_frame(1)] * 4, [0, 0, 0, 0], pacing="fixed", fps=50)
+        start = time.monotonic()
+        for _ in range(4):
+            app.capture_window()
+        # The first frame is immediate, the next three are 20ms apart
+        self.assertGreaterEqual(time.monotonic() - start, 0.055)
+
+    def test_realtime_pacing_caps_long_gaps(self):
+        app = ReplayApplication([make_frame(1)] * 2, [0.0, 3600.0], pacing="realtime", max_gap_seconds=0.01)
+        start = time.monotonic()
+        app.capture_window()
+        app.capture_window()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_invalid_pacing_raises(self):
+        with self.assertRaises(ValueError):
+            ReplayApplication([make_frame(1)], [0.0], pacing="slow")
+
+if __name__ == '__main__':
+    unittest.main()
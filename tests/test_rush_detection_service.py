@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import aiohttp
+import numpy as np
+import torch
+from aiohttp import web
+from ultralytics.engine.results import Results
+
+from inference.batching_detector import BatchingObjectDetector
+from inference.rush_detection_service import RushDetectionService, decode_upload
+from inference.rush_webservice_client import RushWebserviceClient, encode_frame
+from utilities.image import ImageWrapper
+
+NAMES = {0: "ball", 1: "user-controlled-player", 2: "teammate", 3: "opponent"}
+
+class FakeRushModel:
+    """Detects one teammate whose x coordinate is the frame's first pixel value."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batch_sizes = []
+        self.threads = set()
+
+    def predict(self, source, conf, verbose):
+        self.batch_sizes.append(len(source))
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return [
+            Results(image, "frame.png", NAMES, boxes=torch.tensor([[float(image[0, 0, 0]), 10.0, 40.0, 30.0, 0.9, 2]]))
+            for image in source
+        ]
+
+def make_worker(model, max_batch_size=8, max_wait_ms=20):
+    detector = MagicMock()
+    detector.model = model
+    detector.conf_threshold = 0.25
+    return BatchingObjectDetector(detector, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+def frame(value):
+    return ImageWrapper(np.full((48, 64, 3), value, dtype=np.uint8))
+
+async def serve(service, **app_options):
+    runner = web.AppRunner(service.create_app(**app_options))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+class TestRushDetectionService(unittest.TestCase):
+    def test_concurrent_clients_are_batched_and_get_their_own_detections(self):
+        model = FakeRushModel(delay=0.02)
+        service = RushDetectionService([make_worker(model)])
+
+        async def run():
+            runner, base_url = await serve(service)
+            clients = [RushWebserviceClient(f"{base_url}/predict", encoding=encoding) for encoding in ("raw", "png", "jpeg-95")]
+            results = await asyncio.gather(*(clients[value % 3].detect(frame(value)) for value in range(6)))
+            for client in clients:
+                await client.aclose()
+            await runner.cleanup()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual([detections[0]["points"]["x"] for detections in results], list(range(6)))
+        self.assertEqual([detections[0]["class_name"] for detections in results], ["teammate"] * 6)
+        self.assertEqual(sum(model.batch_sizes), 6)
+        self.assertLess(len(model.batch_sizes), 6)
+
+        metrics = service.metrics()
+        self.assertEqual(metrics["requests"], 6)
+        self.assertEqual(metrics["errors"], 0)
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertEqual(metrics["workers"][0]["batches_run"], len(model.batch_sizes))
+        self.assertGreaterEqual(metrics["batch_seconds"]["mean"], 0.02)
+
+    def test_requests_are_spread_over_the_worker_pool(self):
+        models = [FakeRushModel(delay=0.05), FakeRushModel(delay=0.05)]
+        service = RushDetectionService([make_worker(model, max_batch_size=1, max_wait_ms=0) for model in models])
+
+        async def run():
+            await asyncio.gather(*(service.detect(frame(value).rgb()) for value in range(4)))
+            await service.close()
+
+        asyncio.run(run())
+        self.assertEqual([sum(model.batch_sizes) for model in models], [2, 2])
+
+    def test_metrics_health_and_bad_uploads(self):
+        service = RushDetectionService([make_worker(FakeRushModel())])
+
+        async def run():
+            runner, base_url = await serve(service)
+            async with aiohttp.ClientSession() as session:
+                data = aiohttp.FormData()
+                data.add_field("file", b"not an image", filename="frame.jpg", content_type="image/jpeg")
+                async with session.post(f"{base_url}/predict", data=data) as response:
+                    bad_upload = response.status
+                async with session.get(f"{base_url}/health") as response:
+                    health = await response.json()
+                async with session.get(f"{base_url}/metrics") as response:
+                    metrics = await response.json()
+            await runner.cleanup()
+            return bad_upload, health, metrics
+
+        bad_upload, health, metrics = asyncio.run(run())
+        self.assertEqual(bad_upload, 400)
+        self.assertEqual(health, {"status": "ok", "workers": 1})
+        self.assertEqual(metrics["requests"], 1)
+        self.assertEqual(metrics["errors"], 1)
+
+    def test_full_size_raw_and_png_frames_are_accepted(self):
+        service = RushDetectionService([make_worker(FakeRushModel())])
+        # Noise compresses badly, so the PNG is about as large as the raw frame (6 MB)
+        image = np.random.default_rng(0).integers(0, 255, (1080, 1920, 3), dtype=np.uint8)
+        image[0, 0, 0] = 7
+
+        async def run(**app_options):
+            runner, base_url = await serve(service, **app_options)
+            statuses = []
+            async with aiohttp.ClientSession() as session:
+                for encoding, content_type in (("raw", "application/x-npy"), ("png", "image/png")):
+                    payload = encode_frame(image, encoding)
+                    self.assertGreater(len(payload), 2**20)
+                    data = aiohttp.FormData()
+                    data.add_field("file", payload, filename=f"frame.{encoding}", content_type=content_type)
+                    async with session.post(f"{base_url}/predict", data=data) as response:
+                        statuses.append((response.status, await response.json() if response.status == 200 else None))
+            await runner.cleanup()
+            return statuses
+
+        statuses = asyncio.run(run())
+        self.assertEqual([status for status, _ in statuses], [200, 200])
+        self.assertEqual([detections[0]["points"]["x"] for _, detections in statuses], [7, 7])
+        # aiohttp's default limit rejects them
+        service = RushDetectionService([make_worker(FakeRushModel())])
+        self.assertEqual([status for status, _ in asyncio.run(run(max_upload_mb=1))], [413, 413])
+
+    def test_decode_upload(self):
+        rgb = np.random.default_rng(0).integers(0, 255, (8, 8, 3), dtype=np.uint8)
+        np.testing.assert_array_equal(decode_upload(encode_frame(rgb, "raw"), "application/x-npy"), rgb)
+        np.testing.assert_array_equal(decode_upload(encode_frame(rgb, "png"), "image/png"), rgb)
+        with self.assertRaises(ValueError):
+            decode_upload(encode_frame(rgb.astype(np.float32), "raw"), "application/x-npy")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import asyncio
+import io
+import threading
+import unittest
+
+import httpx
+import numpy as np
+from aiohttp import web
+from PIL import Image
+
+from inference.rush_webservice_client import RushWebserviceClient, encode_frame
+from utilities.image import ImageWrapper
+
+DETECTIONS = [{"class_name": "ball", "class_id": 0, "points": {"x": 1, "y": 2, "width": 3, "height": 4}, "confidence": 0.5}]
+
+class StubRushService:
+    """A local stand-in for the rush detection service, recording what it receives."""
+    def __init__(self, delays=None, status=200, rejected=()):
+        self.delays = delays or {}
+        self.status = status
+        self.rejected = rejected
+        self.peers = set()
+        self.uploads = []
+        self.runner = None
+        self.url = None
+
+    async def predict(self, request):
+        self.peers.add(request.transport.get_extra_info("peername"))
+        field = (await request.post())["file"]
+        contents = field.file.read()
+        if field.content_type == "application/x-npy":
+            shape = np.load(io.BytesIO(contents)).shape
+        else:
+            shape = np.asarray(Image.open(io.BytesIO(contents))).shape
+        self.uploads.append((field.filename, shape))
+        await asyncio.sleep(self.delays.get(field.filename, 0))
+        if self.status != 200:
+            return web.Response(status=self.status, text="unavailable")
+        if field.filename in self.rejected:
+            return web.Response(status=415, text="unsupported image")
+        return web.json_response(DETECTIONS)
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/predict", self.predict)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/predict"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.runner.cleanup()
+
+def frame():
+    return ImageWrapper(np.random.default_rng(0).integers(0, 255, (36, 64, 4), dtype=np.uint8))
+
+class TestRushWebserviceClient(unittest.TestCase):
+    def test_frames_reuse_one_connection_and_parse_detections(self):
+        async def run():
+            async with StubRushService() as service:
+                client = RushWebserviceClient(service.url, encoding="jpeg-85")
+                results = [await client.detect(frame()) for _ in range(5)]
+                await client.aclose()
+                return service, client, results
+
+        service, client, results = asyncio.run(run())
+        self.assertEqual(len(service.peers), 1)
+        self.assertEqual([len(detections) for detections in results], [1] * 5)
+        self.assertEqual(results[0].to_dicts(), DETECTIONS)
+        self.assertEqual(service.uploads[0], ("frame.jpg", (36, 64, 3)))
+        stats = client.latency_stats()
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["failures"], 0)
+        self.assertGreater(stats["p95"], 0)
+
+    def test_auto_encoding_settles_on_the_cheapest_measured_encoding(self):
+        async def run():
+            async with StubRushService(delays={"frame.png": 0.05, "frame.npy": 0.05}) as service:
+                client = RushWebserviceClient(service.url, encodings=("raw", "png", "jpeg-85"), probe_interval=0)
+                for _ in range(6):
+                    await client.detect(frame())
+                await client.aclose()
+                return service, client
+
+        service, client = asyncio.run(run())
+        filenames = [filename for filename, shape in service.uploads]
+        # Every candidate is measured once, then the cheapest is used
+        self.assertEqual(filenames[:3], ["frame.npy", "frame.png", "frame.jpg"])
+        self.assertEqual(filenames[3:], ["frame.jpg"] * 3)
+        self.assertEqual(client.current_encoding(), "jpeg-85")
+        self.assertEqual([shape for filename, shape in service.uploads], [(36, 64, 3)] * 6)
+
+    def test_rejected_encodings_are_not_chosen_again(self):
+        async def run():
+            async with StubRushService(rejected=("frame.npy",)) as service:
+                client = RushWebserviceClient(service.url, encodings=("raw", "png"), probe_interval=0)
+                with self.assertRaisesRegex(Exception, "Web service error: 415"):
+                    await client.detect(frame())
+                for _ in range(4):
+                    await client.detect(frame())
+                await client.aclose()
+                return service, client
+
+        service, client = asyncio.run(run())
+        self.assertEqual([filename for filename, shape in service.uploads], ["frame.npy"] + ["frame.png"] * 4)
+        self.assertEqual(client.current_encoding(), "png")
+        self.assertEqual(client.failures, 1)
+
+    def test_probing_retries_the_least_recently_used_encoding(self):
+        client = RushWebserviceClient("http://unused", encodings=("png", "jpeg-85"), probe_interval=4)
+        for requests, name, seconds in ((1, "png", 0.5), (2, "jpeg-85", 0.1)):
+            cost = client._costs[name]
+            cost.encode_seconds, cost.request_seconds, cost.last_used = 0.0, seconds, requests
+        client.requests = 3
+        self.assertEqual(client._choose_encoding(), "jpeg-85")
+        client.requests = 4
+        self.assertEqual(client._choose_encoding(), "png")
+
+    def test_service_errors_and_timeouts_raise(self):
+        async def run():
+            async with StubRushService(status=503) as service:
+                client = RushWebserviceClient(service.url, encoding="png")
+                with self.assertRaisesRegex(Exception, "Web service error: 503"):
+                    await client.detect(frame())
+                await client.aclose()
+            async with StubRushService(delays={"frame.png": 1.0}) as service:
+                client = RushWebserviceClient(service.url, encoding="png", timeout=0.1)
+                with self.assertRaises(httpx.TimeoutException):
+                    await client.detect(frame())
+                await client.aclose()
+                return client
+
+        client = asyncio.run(run())
+        self.assertEqual(client.failures, 1)
+
+    def test_client_of_a_previous_event_loop_is_closed(self):
+        # The service runs on its own loop, so it outlives the two client loops
+        service_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=service_loop.run_forever, daemon=True)
+        thread.start()
+        service = asyncio.run_coroutine_threadsafe(StubRushService().__aenter__(), service_loop).result(timeout=5)
+        try:
+            client = RushWebserviceClient(service.url, encoding="png")
+            async def detect():
+                await client.detect(frame())
+                return client._client
+
+            first = asyncio.run(detect())
+            second = asyncio.run(detect())
+            self.assertIsNot(first, second)
+            self.assertTrue(first.is_closed)
+            self.assertFalse(second.is_closed)
+            self.assertEqual(client.failures, 0)
+        finally:
+            asyncio.run_coroutine_threadsafe(service.__aexit__(None, None, None), service_loop).result(timeout=5)
+            service_loop.call_soon_threadsafe(service_loop.stop)
+            thread.join()
+            service_loop.close()
+
+    def test_encode_frame_round_trips(self):
+        rgb = np.random.default_rng(1).integers(0, 255, (8, 8, 3), dtype=np.uint8)
+        np.testing.assert_array_equal(np.load(io.BytesIO(encode_frame(rgb, "raw"))), rgb)
+        np.testing.assert_array_equal(np.asarray(Image.open(io.BytesIO(encode_frame(rgb, "png")))), rgb)
+        with self.assertRaises(ValueError):
+            encode_frame(rgb, "webp")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import cv2
+import numpy as np
+
+from utilities.screenshot_archiver import (
+    DROP_NEWEST, DROP_OLDEST, JpegEncoder, NpyEncoder, PngEncoder, ScreenshotArchiver, WebpEncoder, create_encoder
+)
+
+def make_frame(channels=3):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(36, 64, channels), dtype=np.uint8)
+
+class BlockingEncoder:
+    """Encoder that waits until released, so tests can fill the queue deterministically."""
+    extension = "bin"
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def encode(self, image):
+        self.release.wait(5)
+        return bytes([int(image[0, 0, 0])])
+
+class TestEncoders(unittest.TestCase):
+    def test_png_round_trip_is_lossless(self):
+        frame = make_frame()
+        decoded = cv2.imdecode(np.frombuffer(PngEncoder().encode(frame), np.uint8), cv2.IMREAD_UNCHANGED)
+        np.testing.assert_array_equal(cv2.cvtColor(decoded, cv2.COLOR_BGR2RGB), frame)
+
+    def test_png_keeps_alpha(self):
+        frame = make_frame(channels=4)
+        decoded = cv2.imdecode(np.frombuffer(PngEncoder().encode(frame), np.uint8), cv2.IMREAD_UNCHANGED)
+        self.assertEqual(decoded.shape, frame.shape)
+
+    def test_jpeg_and_webp_decode(self):
+        for encoder in (JpegEncoder(), WebpEncoder()):
+            decoded = cv2.imdecode(np.frombuffer(encoder.encode(make_frame(4)), np.uint8), cv2.IMREAD_COLOR)
+            self.assertEqual(decoded.shape, (36, 64, 3))
+
+    def test_npy_round_trip(self):
+        import io
+        frame = make_frame()
+        np.testing.assert_array_equal(np.load(io.BytesIO(NpyEncoder().encode(frame))), frame)
+
+    def test_create_encoder(self):
+        self.assertIsInstance(create_encoder("JPEG", 70), JpegEncoder)
+        with self.assertRaises(ValueError):
+            create_encoder("gif")
+
+class TestScreenshotArchiver(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_frames_are_written(self):
+        archiver = ScreenshotArchiver(self.directory.name, PngEncoder(), workers=2)
+        for i in range(5):
+            archiver.submit(make_frame(), f"frame{i}")
+        archiver.close()
+
+        self.assertEqual(sorted(os.listdir(self.directory.name)), [f"frame{i}.png" for i in range(5)])
+        self.assertEqual(archiver.frames_written, 5)
+        self.assertEqual(archiver.bytes_written, sum(
+            os.path.getsize(os.path.join(self.directory.name, name)) for name in os.listdir(self.directory.name)
+        ))
+
+    def test_submit_copies_the_frame(self):
+        encoder = BlockingEncoder()
+        archiver = ScreenshotArchiver(self.directory.name, encoder, workers=1)
+        frame = np.full((2, 2, 3), 7, dtype=np.uint8)
+        archiver.submit(frame, "frame")
+        frame[:] = 0
+        encoder.release.set()
+        archiver.close()
+        with open(os.path.join(self.directory.name, "frame.bin"), 'rb') as saved:
+            self.assertEqual(saved.read(), bytes([7]))
+
+    def _fill(self, drop_policy):
+        encoder = BlockingEncoder()
+        archiver = ScreenshotArchiver(self.directory.name, encoder, max_queue_size=2, workers=1, drop_policy=drop_policy)
+        # The first frame is taken by the worker (blocked in encode), the next two fill the queue
+        archiver.submit(np.zeros((1, 1, 3), np.uint8), "frame0")
+        while archiver.queue_depth():
+            pass
+        accepted = [archiver.submit(np.zeros((1, 1, 3), np.uint8), f"frame{i}") for i in range(1, 4)]
+        self.assertEqual(archiver.queue_depth(), 2)
+        encoder.release.set()
+        archiver.close()
+        return archiver, accepted
+
+    def test_drop_oldest_policy(self):
+        archiver, accepted = self._fill(DROP_OLDEST)
+        self.assertEqual(accepted, [True, True, True])
+        self.assertEqual(archiver.frames_dropped, 1)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["frame0.bin", "frame2.bin", "frame3.bin"])
+
+    def test_drop_newest_policy(self):
+        archiver, accepted = self._fill(DROP_NEWEST)
+        self.assertEqual(accepted, [True, True, False])
+        self.assertEqual(archiver.frames_dropped, 1)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["frame0.bin", "frame1.bin", "frame2.bin"])
+
+    def test_submit_after_close_is_rejected(self):
+        archiver = ScreenshotArchiver(self.directory.name, NpyEncoder())
+        archiver.close()
+        self.assertFalse(archiver.submit(make_frame(), "late"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import asyncio
 import unittest
-from utilities.shared_thread_resources import SharedObject
+from unittest.mock import patch
+from utilities.shared_thread_resources import SharedObject, SharedProgramData
 
 class TestSharedObject(unittest.TestCase):
 
@@ -27,5 +28,41 @@ class TestSharedObject(unittest.TestCase):
         result = self.loop.run_until_complete(shared_obj.read_data())
         self.assertEqual(result, shared_obj.data)
 
+class TestSharedProgramDataModelLoading(unittest.TestCase):
+    def setUp(self):
+        self.shared_data = SharedProgramData()
+        # Each test runs its own event loop, and asyncio events bind to the first loop that waits on them
+        self.shared_data.models_ready = asyncio.Event()
+
+    def tearDown(self):
+        self.shared_data.model_loading_task = None
+        self.shared_data.model_loading_error = None
+
+    def test_construction_does_not_load_models(self):
+        self.assertIsNone(self.shared_data.rush_detection_model)
+
+    def test_wait_returns_immediately_when_loading_was_never_started(self):
+        asyncio.run(asyncio.wait_for(self.shared_data.wait_for_models(), timeout=1))
+
+    def test_models_load_in_the_background(self):
+        async def run():
+            self.shared_data.start_model_loading()
+            self.assertFalse(self.shared_data.models_ready.is_set())
+            await self.shared_data.wait_for_models()
+            return self.shared_data.models_ready.is_set()
+
+        with patch.object(SharedProgramData, "load_models") as load_models:
+            self.assertTrue(asyncio.run(run()))
+        load_models.assert_called_once()
+
+    def test_loading_errors_are_raised_to_waiters(self):
+        async def run():
+            self.shared_data.start_model_loading()
+            await self.shared_data.wait_for_models()
+
+        with patch.object(SharedProgramData, "load_models", side_effect=RuntimeError("download failed")):
+            with self.assertRaises(RuntimeError):
+                asyncio.run(run())
+
 if __name__ == '__main__':
     unittest.main()
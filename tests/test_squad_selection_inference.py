@@ -0,0 +1,53 @@
+import itertools
+import unittest
+
+from game_state.squad_battles_tracker import SquadBattlesTracker
+from inference.squad_selection_inference import SquadSelectionInference
+from utilities.bbox import is_point_in_bbox
+
+CLASS_NAMES = {0: "squad-played", 1: "squad-selected"}
+
+def evaluate_with_point_loop(class_names, detections) -> SquadBattlesTracker:
+    """The per-detection, per-point loop the vectorized evaluation replaced."""
+    tracker = SquadBattlesTracker()
+    for detection in detections:
+        for index, point in enumerate(SquadSelectionInference.GRID_POINTS.tolist()):
+            if is_point_in_bbox(point, detection['bbox']):
+                if detection['class'] == class_names[1]:
+                    tracker.current_col = index % 2
+                    tracker.current_row = -1 if index < 2 else (0 if index < 4 else 1)
+                elif detection['class'] == class_names[0] and index >= 2:
+                    tracker.grid[(index - 2) // 2][index % 2] = True
+    return tracker
+
+# One box around each tile of the grid, and one spanning the two bottom rows
+TILE_BOXES = [(40, 100, 110, 160), (190, 100, 250, 160), (40, 300, 110, 360),
+              (190, 300, 250, 360), (40, 440, 110, 500), (190, 440, 250, 500), (0, 300, 290, 500)]
+
+class TestSquadSelectionEvaluation(unittest.TestCase):
+    def assert_same_state(self, detections):
+        expected = evaluate_with_point_loop(CLASS_NAMES, detections)
+        actual = SquadSelectionInference().evaluate_squad_selection_menu_state_detections(CLASS_NAMES, detections)
+        self.assertEqual((actual.grid, actual.current_row, actual.current_col),
+                         (expected.grid, expected.current_row, expected.current_col), detections)
+
+    def test_no_detections(self):
+        tracker = SquadSelectionInference().evaluate_squad_selection_menu_state_detections(CLASS_NAMES, [])
+        self.assertEqual((tracker.grid, tracker.current_row, tracker.current_col), ([[False, False], [False, False]], 0, 0))
+
+    def test_matches_the_point_loop(self):
+        for selected_box, played_boxes in itertools.product(TILE_BOXES, itertools.combinations(TILE_BOXES, 2)):
+            detections = [{"class": "squad-played", "confidence": 0.9, "bbox": list(box)} for box in played_boxes]
+            detections.append({"class": "squad-selected", "confidence": 0.9, "bbox": list(selected_box)})
+            self.assert_same_state(detections)
+
+    def test_selected_tile_and_played_tiles(self):
+        detections = [{"class": "squad-selected", "confidence": 0.9, "bbox": list(TILE_BOXES[3])},
+                      {"class": "squad-played", "confidence": 0.9, "bbox": list(TILE_BOXES[2])},
+                      {"class": "squad-played", "confidence": 0.9, "bbox": list(TILE_BOXES[5])}]
+        tracker = SquadSelectionInference().evaluate_squad_selection_menu_state_detections(CLASS_NAMES, detections)
+        self.assertEqual((tracker.current_row, tracker.current_col), (0, 1))
+        self.assertEqual(tracker.grid, [[True, False], [False, True]])
+
+if __name__ == '__main__':
+    unittest.main()
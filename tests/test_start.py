@@ -0,0 +1,55 @@
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports start.py at module level, like any script built on it, and records every time its body runs.
+# Spawned workers import the script again as __mp_main__, so the module-level code runs once per worker as well.
+SCRIPT = textwrap.dedent("""
+    import asyncio
+    import os
+
+    import numpy as np
+
+    import start
+    from inference.inference_worker_pool import InferenceWorkerPool
+    from tests.test_inference_worker_pool import load_fake_detector
+
+    with open("imports.txt", "a") as imports:
+        imports.write(f"{os.getpid()}\\n")
+
+    if __name__ == "__main__":
+        pool = InferenceWorkerPool(2, model_factory=load_fake_detector).start()
+        try:
+            frame = np.full((36, 64, 3), 7, dtype=np.uint8)
+            detections = asyncio.run(pool.detect(frame))
+            print(int(detections.xyxy[0, 0]))
+        finally:
+            pool.close()
+""")
+
+class TestStartIsSafeToImport(unittest.TestCase):
+    def test_pool_spawned_from_a_script_importing_start(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "script.py"), "w") as script:
+                script.write(SCRIPT)
+            environment = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.join(ROOT, "src"), ROOT]),
+                               PYNPUT_BACKEND="dummy")
+            result = subprocess.run([sys.executable, "script.py"], cwd=directory, env=environment,
+                                    capture_output=True, text=True, timeout=300)
+
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(result.stdout.strip(), "7")
+            with open(os.path.join(directory, "imports.txt")) as imports:
+                # The parent and both workers ran the script's module-level code...
+                self.assertEqual(len(imports.read().split()), 3)
+            # ...but importing start did no setup: no log file, game window or signal handlers
+            self.assertEqual(glob.glob(os.path.join(directory, "start_*.log")), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -80,3 +80,29 @@ def test_gradient_propagation_verification():
         if param.requires_grad:
             assert param.grad is not None, f"Parameter {name} grad is None"
             assert torch.sum(torch.abs(param.grad)) > 0, f"Parameter {name} has zero gradient"
+
+
+def test_shared_backbone_runs_both_images_through_one_backbone():
+    """
+    Test 3: Shared Backbone Verification.
+    Verifies the shared-weights variant has one backbone, and matches running each image through it separately.
+    """
+    batch_size = 2
+    model = TacticalVisionNet(pretrained=False, shared_backbone=True)
+    model.eval()
+
+    dual_parameters = sum(param.numel() for param in TacticalVisionNet(pretrained=False).parameters())
+    shared_parameters = sum(param.numel() for param in model.parameters())
+    assert shared_parameters < dual_parameters * 0.6, "Shared backbone variant should hold a single ResNet18"
+
+    main_image = torch.randn(batch_size, 3, 224, 224)
+    minimap_image = torch.randn(batch_size, 3, 224, 224)
+
+    with torch.no_grad():
+        outputs = model(main_image, minimap_image)
+        fused_feats = torch.cat([model.backbone(main_image), model.backbone(minimap_image)], dim=1)
+        expected_ball = model.ball_head(model.fusion(fused_feats))
+
+    assert outputs["possession"].shape == (batch_size, 3)
+    assert outputs["ball"].shape == (batch_size, 2)
+    assert torch.allclose(outputs["ball"], expected_ball, atol=1e-5), "Batched backbone pass should match separate passes"
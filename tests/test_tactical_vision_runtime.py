@@ -0,0 +1,90 @@
+"""
+Tests for the TacticalVisionNet inference runtime: preprocessing, inference and export.
+"""
+
+import numpy as np
+import pytest
+import torch
+from torch import nn
+from inference.tactical_vision_net import TacticalVisionNet
+from inference.tactical_vision_runtime import IMAGENET_MEAN, IMAGENET_STD, TacticalVisionRuntime
+
+def make_crops(batch_size, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, (batch_size, 224, 224, 3), dtype=np.uint8)
+
+def reference_input(crops):
+    """The torchvision ToTensor + Normalize preprocessing the network was trained with."""
+    tensor = torch.from_numpy(crops).permute(0, 3, 1, 2).float() / 255
+    mean = torch.tensor(IMAGENET_MEAN).view(1, 3, 1, 1)
+    std = torch.tensor(IMAGENET_STD).view(1, 3, 1, 1)
+    return (tensor - mean) / std
+
+@pytest.fixture(scope="module")
+def model():
+    torch.manual_seed(0)
+    return TacticalVisionNet(pretrained=False).eval()
+
+def test_preprocess_matches_training_normalization():
+    runtime = TacticalVisionRuntime(TacticalVisionNet(pretrained=False, shared_backbone=True))
+    crops = make_crops(2)
+    tensor = runtime.preprocess(crops)
+
+    assert tensor.shape == (2, 3, 224, 224)
+    assert tensor.is_contiguous(memory_format=torch.channels_last), "Input should be channels_last"
+    assert torch.allclose(tensor, reference_input(crops), atol=1e-5)
+    assert runtime.preprocess(crops[0]).shape == (1, 3, 224, 224), "A single crop should become a batch of one"
+    with pytest.raises(ValueError):
+        runtime.preprocess(crops.astype(np.float32))
+
+def test_predict_matches_the_eager_model(model):
+    runtime = TacticalVisionRuntime(model)
+    main_crops, minimap_crops = make_crops(3, seed=1), make_crops(3, seed=2)
+    outputs = runtime.predict(main_crops, minimap_crops)
+
+    with torch.no_grad():
+        expected = model(reference_input(main_crops), reference_input(minimap_crops))
+    for name in ("possession", "zone", "ball"):
+        assert isinstance(outputs[name], np.ndarray)
+        np.testing.assert_allclose(outputs[name], expected[name].numpy(), atol=1e-4)
+
+    stats = runtime.latency_stats()
+    assert stats["calls"] == 1
+    assert stats["p95"] > 0
+
+def test_dynamic_quantization_replaces_linear_layers(model):
+    runtime = TacticalVisionRuntime(model, quantize=True)
+    assert not any(type(module) is nn.Linear for module in runtime.model.modules()), "Linear layers should be quantized"
+    outputs = runtime.predict(make_crops(2), make_crops(2, seed=3))
+    assert outputs["ball"].shape == (2, 2)
+    assert np.all((outputs["ball"] >= 0) & (outputs["ball"] <= 1))
+
+def test_torchscript_export_round_trip(model, tmp_path):
+    runtime = TacticalVisionRuntime(model)
+    path = runtime.export_torchscript(str(tmp_path / "tactical_vision.pt"))
+    loaded = TacticalVisionRuntime.from_torchscript(path)
+
+    main_crops, minimap_crops = make_crops(2, seed=4), make_crops(2, seed=5)
+    expected = runtime.predict(main_crops, minimap_crops)
+    outputs = loaded.predict(main_crops, minimap_crops)
+    for name in ("possession", "zone", "ball"):
+        np.testing.assert_allclose(outputs[name], expected[name], atol=1e-4)
+
+def test_onnx_export(model, tmp_path):
+    onnx = pytest.importorskip("onnx")
+    path = TacticalVisionRuntime(model).export_onnx(str(tmp_path / "tactical_vision.onnx"))
+    exported = onnx.load(path)
+    assert [node.name for node in exported.graph.input] == ["main_image", "minimap_image"]
+    assert [node.name for node in exported.graph.output] == ["possession", "zone", "ball"]
+
+def test_onnx_export_with_torch_before_the_dynamo_exporter(model, tmp_path, monkeypatch):
+    exported = []
+    # torch 2.2's signature, which has no `dynamo` keyword
+    def export(model, args, f, export_params=True, verbose=False, training=None, input_names=None,
+               output_names=None, operator_export_type=None, opset_version=None, do_constant_folding=True,
+               dynamic_axes=None):
+        exported.append((f, input_names, output_names))
+    monkeypatch.setattr(torch.onnx, "export", export)
+    path = str(tmp_path / "tactical_vision.onnx")
+    TacticalVisionRuntime(model).export_onnx(path)
+    assert exported == [(path, ["main_image", "minimap_image"], ["possession", "zone", "ball"])]
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+from skimage.metrics import structural_similarity
+
+from utilities.template_store import TemplateStore, batched_ssim, ssim
+
+def noisy(image, seed, amount=40):
+    noise = np.random.default_rng(seed).integers(-amount, amount, image.shape)
+    return np.clip(image.astype(np.int32) + noise, 0, 255).astype(np.uint8)
+
+class TestTemplateStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.templates = {}
+        for name in ("menu.png", "pause.png", "kickoff.png"):
+            gray = cv2.GaussianBlur(rng.integers(0, 256, (60, 100), dtype=np.uint8), (5, 5), 0)
+            cv2.imwrite(os.path.join(self.directory.name, name), cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+            self.templates[name] = gray
+        self.store = TemplateStore(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_ssim_matches_skimage(self):
+        frame = noisy(self.templates["menu.png"], 1)
+        expected = structural_similarity(self.templates["menu.png"], frame)
+        self.assertAlmostEqual(ssim(self.templates["menu.png"], frame), expected, places=4)
+
+        stacked = batched_ssim(np.dstack([frame, frame]), np.dstack([self.templates["menu.png"], self.templates["pause.png"]]))
+        self.assertAlmostEqual(stacked[0], expected, places=4)
+        self.assertAlmostEqual(stacked[1], structural_similarity(self.templates["pause.png"], frame), places=4)
+
+    def test_templates_and_regions_are_cached(self):
+        template = self.store.get("menu.png")
+        np.testing.assert_array_equal(template, self.templates["menu.png"])
+        self.assertIs(self.store.get("menu.png"), template)
+        self.assertFalse(template.flags.writeable)
+
+        region = self.store.region("menu.png", 10, 5, 30, 20)
+        self.assertEqual(region.shape, (20, 30))
+        self.assertIs(self.store.region("menu.png", 10, 5, 30, 20), region)
+
+    def test_missing_template_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.store.get("missing.png")
+
+    def test_best_match_over_templates_and_regions(self):
+        frame = noisy(self.templates["pause.png"], 2, amount=10)
+        candidates = [
+            ("menu.png", None),
+            ("pause.png", None),
+            ("kickoff.png", (0, 0, 50, 30)),
+            ("pause.png", (50, 30, 50, 30)),
+        ]
+        scores = self.store.compare(frame, candidates)
+        self.assertAlmostEqual(scores[2], structural_similarity(self.templates["kickoff.png"][:30, :50], frame[:30, :50]), places=4)
+
+        best, score = self.store.best_match(frame, candidates)
+        self.assertIn(best, candidates[1:2] + candidates[3:])
+        self.assertGreater(score, 0.5)
+
+    def test_fast_reject_skips_full_resolution_comparison(self):
+        frame = noisy(self.templates["kickoff.png"], 3, amount=10)
+        candidates = [("menu.png", None), ("kickoff.png", None)]
+        scores = self.store.compare(frame, candidates, fast_reject_scale=0.25, fast_reject_threshold=0.5)
+        self.assertTrue(np.isnan(scores[0]))
+        self.assertAlmostEqual(scores[1], structural_similarity(self.templates["kickoff.png"], frame), places=4)
+
+        self.assertEqual(self.store.best_match(frame, [("menu.png", None)], fast_reject_scale=0.25, fast_reject_threshold=0.5), (None, None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from utilities.video_recorder import INDEX_DTYPE, SegmentedVideoRecorder, read_frame, read_index
+
+def make_frame(value):
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    frame[..., 0] = value
+    frame[:, :8, 1] = 255 - value
+    return frame
+
+class TestSegmentedVideoRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, frames, **kwargs):
+        recorder = SegmentedVideoRecorder(self.directory.name, **kwargs)
+        for capture_time, frame in frames:
+            recorder.submit(frame, capture_time=capture_time)
+        recorder.close()
+        return recorder
+
+    def test_mjpeg_index_and_random_access(self):
+        frames = [(100.0 + i * 0.1, make_frame(i * 40)) for i in range(6)]
+        recorder = self.record(frames, quality=100)
+
+        self.assertEqual(len(recorder.segments_written), 1)
+        segment = recorder.segments_written[0]
+        index = read_index(segment)
+        self.assertEqual(index.dtype, INDEX_DTYPE)
+        np.testing.assert_array_equal(index["frame"], np.arange(6))
+        np.testing.assert_allclose(index["timestamp"], [t for t, _ in frames])
+        self.assertEqual(int(index["offset"][-1] + index["length"][-1]), os.path.getsize(segment))
+
+        for frame_number in (4, 1):
+            decoded = read_frame(segment, frame_number, index)
+            self.assertLess(np.abs(decoded.astype(int) - frames[frame_number][1]).mean(), 3)
+
+    def test_segments_roll_over_by_capture_time(self):
+        frames = [(float(t), make_frame(10)) for t in (0, 1, 2, 3, 4)]
+        recorder = self.record(frames, segment_seconds=2)
+        self.assertEqual([len(read_index(segment)) for segment in recorder.segments_written], [2, 2, 1])
+
+    def test_segments_roll_over_on_resolution_change(self):
+        frames = [(0.0, make_frame(10)), (0.1, np.zeros((24, 32, 3), dtype=np.uint8))]
+        recorder = self.record(frames)
+        self.assertEqual(len(recorder.segments_written), 2)
+
+    def test_mp4_container(self):
+        frames = [(float(i), make_frame(i * 40)) for i in range(4)]
+        recorder = self.record(frames, container="mp4", segment_seconds=60)
+        segment = recorder.segments_written[0]
+        self.assertTrue(segment.endswith(".mp4"))
+        self.assertEqual(len(read_index(segment)), 4)
+        self.assertEqual(read_frame(segment, 2).shape, (48, 64, 3))
+
+    def test_grayscale_frames(self):
+        gray = np.full((48, 64), 128, dtype=np.uint8)
+        for container in ("mjpeg", "mp4"):
+            recorder = self.record([(0.0, gray), (1.0, gray)], container=container)
+            decoded = read_frame(recorder.segments_written[-1], 1)
+            self.assertEqual(decoded.shape, (48, 64, 3))
+            self.assertLess(np.abs(decoded.astype(int) - 128).mean(), 8)
+
+    def test_accepts_the_archiver_arguments(self):
+        recorder = SegmentedVideoRecorder(self.directory.name)
+        before_submit = time.time()
+        self.assertTrue(recorder.submit(make_frame(10), "new-screenshot"))
+        recorder.close()
+        self.assertGreaterEqual(read_index(recorder.segments_written[0])["timestamp"][0], before_submit)
+
+    def test_unknown_container_raises(self):
+        with self.assertRaises(ValueError):
+            SegmentedVideoRecorder(self.directory.name, container="gif")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import ctypes
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from utilities import xshm_capture
+from utilities.xshm_capture import SHMAT_FAILED, XImage, XShmAttachError, XShmCapture
+
+WIDTH, HEIGHT = 6, 4
+# Rows padded to 8 pixels, as the X server may do
+BYTES_PER_LINE = 8 * 4
+
+class TestXShmCapture(unittest.TestCase):
+    def setUp(self):
+        self.x11, self.xext, self.libc = MagicMock(), MagicMock(), MagicMock()
+        self.x11.XOpenDisplay.return_value = 1
+        self.xext.XShmQueryExtension.return_value = 1
+        self.ximage = XImage(width=WIDTH, height=HEIGHT, bytes_per_line=BYTES_PER_LINE, bits_per_pixel=32)
+        self.xext.XShmCreateImage.return_value = ctypes.pointer(self.ximage)
+        self.libc.shmget.return_value = 7
+
+        # Stands in for the shared segment; XShmGetImage fills it with a known pattern
+        self.segment = (ctypes.c_ubyte * (BYTES_PER_LINE * HEIGHT))()
+        self.libc.shmat.return_value = ctypes.addressof(self.segment)
+        pixels = np.arange(BYTES_PER_LINE * HEIGHT, dtype=np.uint32).astype(np.uint8)
+        def get_image(*args):
+            ctypes.memmove(self.segment, pixels.ctypes.data, pixels.nbytes)
+            return 1
+        self.xext.XShmGetImage.side_effect = get_image
+        self.pixels = pixels.reshape(HEIGHT, BYTES_PER_LINE // 4, 4)[:, :WIDTH]
+
+        patcher = patch.object(xshm_capture, "_load_libraries", return_value=(self.x11, self.xext, self.libc))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, xshm_capture, "_last_x_error", None)
+
+    def test_grab_returns_a_view_without_row_padding(self):
+        capture = XShmCapture(42)
+        frame = capture.grab(WIDTH, HEIGHT)
+        self.assertEqual(frame.shape, (HEIGHT, WIDTH, 4))
+        np.testing.assert_array_equal(frame, self.pixels)
+        # The segment is marked for removal straight after attaching, and reused by later grabs of the same size
+        self.libc.shmctl.assert_called_once_with(7, xshm_capture.IPC_RMID, None)
+        capture.grab(WIDTH, HEIGHT)
+        self.xext.XShmCreateImage.assert_called_once()
+        capture.close()
+        self.libc.shmdt.assert_called_once()
+        self.x11.XCloseDisplay.assert_called_once()
+
+    def test_shmat_failure_raises_and_releases_the_segment(self):
+        self.libc.shmat.return_value = SHMAT_FAILED
+        capture = XShmCapture(42)
+        with self.assertRaisesRegex(RuntimeError, "shmat failed"):
+            capture.grab(WIDTH, HEIGHT)
+        self.libc.shmctl.assert_called_once_with(7, xshm_capture.IPC_RMID, None)
+        self.x11.XDestroyImage.assert_called_once()
+        self.xext.XShmAttach.assert_not_called()
+        self.xext.XShmGetImage.assert_not_called()
+
+    def test_attach_errors_are_raised_before_grabbing(self):
+        # The X server reports the error asynchronously, when the connection is synced
+        self.x11.XSync.side_effect = lambda *args: setattr(xshm_capture, "_last_x_error", 10)
+        with self.assertRaisesRegex(XShmAttachError, "X error 10"):
+            XShmCapture(42).grab(WIDTH, HEIGHT)
+        self.libc.shmdt.assert_called_once()
+        self.x11.XDestroyImage.assert_called_once()
+        self.xext.XShmGetImage.assert_not_called()
+
+    def test_shmget_failure_raises(self):
+        self.libc.shmget.return_value = -1
+        with self.assertRaisesRegex(RuntimeError, "shmget failed"):
+            XShmCapture(42).grab(WIDTH, HEIGHT)
+        self.libc.shmat.assert_not_called()
+
+    def test_failed_grab_raises(self):
+        self.xext.XShmGetImage.side_effect = None
+        self.xext.XShmGetImage.return_value = 0
+        with self.assertRaisesRegex(RuntimeError, "XShmGetImage failed"):
+            XShmCapture(42).grab(WIDTH, HEIGHT)
+
+    def test_missing_extension_raises(self):
+        self.xext.XShmQueryExtension.return_value = 0
+        with self.assertRaisesRegex(RuntimeError, "MIT-SHM"):
+            XShmCapture(42)
+        self.x11.XCloseDisplay.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
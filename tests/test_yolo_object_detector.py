@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from inference.yolo_object_detector import export_directory, exported_model_path, export_model, to_rgb_array
+
+class TestYoloExport(unittest.TestCase):
+    def test_export_paths(self):
+        directory = export_directory("/models/fc25-rush.pt", "/exports")
+        self.assertTrue(directory.startswith("/exports/fc25-rush-"))
+        self.assertEqual(exported_model_path("/models/fc25-rush.pt", "onnx", export_dir="/exports"), f"{directory}/fc25-rush.onnx")
+        self.assertEqual(exported_model_path("/models/fc25-rush.pt", "onnx", quantize=True, export_dir="/exports"),
+                         f"{directory}/fc25-rush-int8.onnx")
+        self.assertEqual(exported_model_path("/models/fc25-rush.pt", "openvino", export_dir="/exports"),
+                         f"{directory}/fc25-rush_openvino_model")
+        # Another revision of the same weights gets its own exports
+        self.assertNotEqual(export_directory("/other/fc25-rush.pt", "/exports"), directory)
+
+    def test_existing_export_is_reused(self):
+        with tempfile.TemporaryDirectory() as directory:
+            weights = os.path.join(directory, "fc25-rush.pt")
+            export_path = exported_model_path(weights, "onnx", export_dir=directory)
+            os.makedirs(os.path.dirname(export_path))
+            open(export_path, 'wb').close()
+            with patch("ultralytics.YOLO") as yolo:
+                self.assertEqual(export_model(weights, "onnx", export_dir=directory), export_path)
+                yolo.assert_not_called()
+
+    def test_export_is_written_to_the_export_directory(self):
+        with tempfile.TemporaryDirectory() as cache, tempfile.TemporaryDirectory() as exports:
+            # Like a HuggingFace snapshot: the weights are a symlink into the blob store
+            blob = os.path.join(cache, "blob")
+            with open(blob, 'wb') as blob_file:
+                blob_file.write(b"weights")
+            weights = os.path.join(cache, "fc25-rush.pt")
+            os.symlink(blob, weights)
+
+            def export(format, imgsz):
+                local_weights = yolo.call_args.args[0]
+                exported = os.path.splitext(local_weights)[0] + ".onnx"
+                open(exported, 'wb').close()
+                return exported
+            with patch("ultralytics.YOLO") as yolo:
+                yolo.return_value.export.side_effect = export
+                export_path = export_model(weights, "onnx", export_dir=exports)
+
+            self.assertEqual(export_path, exported_model_path(weights, "onnx", export_dir=exports))
+            self.assertTrue(os.path.exists(export_path))
+            local_weights = yolo.call_args.args[0]
+            self.assertTrue(local_weights.startswith(exports))
+            with open(local_weights, 'rb') as local_file:
+                self.assertEqual(local_file.read(), b"weights")
+            self.assertEqual(sorted(os.listdir(cache)), ["blob", "fc25-rush.pt"])
+
+    def test_unsupported_exports_raise(self):
+        with self.assertRaises(ValueError):
+            export_model("fc25-rush.pt", "torch")
+        with self.assertRaises(ValueError):
+            export_model("fc25-rush.pt", "openvino", quantize=True)
+
+    def test_to_rgb_array_drops_alpha(self):
+        self.assertEqual(to_rgb_array(np.zeros((4, 4, 4), dtype=np.uint8)).shape, (4, 4, 3))
+
+if __name__ == '__main__':
+    unittest.main()